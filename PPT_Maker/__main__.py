@@ -0,0 +1,5 @@
+import sys
+
+from PPT_Maker.cli import main
+
+sys.exit(main())
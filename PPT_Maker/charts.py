@@ -0,0 +1,419 @@
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from pptx.chart.data import Categories, CategoryChartData, XyChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.parts.chart import ChartPart
+
+from llm_service.metrics import count, span
+from PPT_Maker.incremental import fingerprint
+
+# Most points a chart series is rendered with. Longer data is downsampled so
+# the chart XML and its embedded workbook stay small; 0 turns this off.
+DEFAULT_MAX_CHART_POINTS = int(os.getenv("SLIDECRAFT_CHART_MAX_POINTS", "1000"))
+
+# Data of charts added without any.
+SAMPLE_CATEGORIES = ("A", "B", "C")
+SAMPLE_VALUES = (10, 20, 30)
+
+PARQUET_MAGIC = b"PAR1"
+
+# Whether charts embed an Excel workbook of their data. Without one, decks are
+# smaller and faster to build and charts display the same, but their data
+# cannot be edited in PowerPoint.
+DEFAULT_CHART_WORKBOOKS = os.getenv("SLIDECRAFT_CHART_WORKBOOKS", "1").lower() not in ("0", "false", "no", "off")
+
+# Upper bound on the generated chart parts kept for reuse; 0 disables the cache.
+CHART_CACHE_MAX_BYTES = int(os.getenv("SLIDECRAFT_CHART_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+
+class _FlatCategories(Categories):
+    """
+    Single-level categories whose Category.idx takes constant time. python-pptx
+    finds a category's index by scanning the categories before it, which makes
+    writing a long category axis quadratic.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._indices = {}
+
+    def add_category(self, label):
+        category = super().add_category(label)
+        self._indices[id(category)] = len(self._categories) - 1
+        return category
+
+    def index(self, category):
+        index = self._indices.get(id(category))
+        return super().index(category) if index is None else index
+
+
+class _CategoryChartData(CategoryChartData):
+    """
+    CategoryChartData building its categories as _FlatCategories.
+    """
+
+    @CategoryChartData.categories.setter
+    def categories(self, category_labels):
+        categories = _FlatCategories()
+        for label in category_labels:
+            categories.add_category(label)
+        self._categories = categories
+
+
+def load_chart_table(data):
+    """
+    Returns chart data as a pandas DataFrame.
+
+    :param data: A DataFrame or Series, CSV or Parquet file contents (bytes), a
+                 path to a .csv or .parquet file, a NumPy array (1-D: one series;
+                 2-D: x in the first column, one series per further column) or
+                 a dict of columns.
+    """
+    # pandas and NumPy are only loaded for slides that have chart data.
+    import pandas as pd
+
+    if isinstance(data, pd.DataFrame):
+        return data
+    if isinstance(data, pd.Series):
+        return data.to_frame(name=data.name or "Series 1")
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data)
+        if data[:4] == PARQUET_MAGIC:
+            return pd.read_parquet(io.BytesIO(data))
+        return pd.read_csv(io.BytesIO(data))
+    if isinstance(data, str):
+        if data.lower().endswith((".parquet", ".pq")):
+            return pd.read_parquet(data)
+        return pd.read_csv(data)
+
+    import numpy as np
+
+    if isinstance(data, np.ndarray):
+        if data.ndim == 1:
+            return pd.DataFrame({"Series 1": data})
+        columns = ["x"] + [f"Series {index}" for index in range(1, data.shape[1])]
+        return pd.DataFrame(data, columns=columns)
+    return pd.DataFrame(data)
+
+
+def table_digest(data):
+    """
+    Returns a SHA-256 hex digest of chart data given as a DataFrame, Series or
+    NumPy array, for slide fingerprints and the chart part cache.
+    """
+    import numpy as np
+    import pandas as pd
+
+    digest = hashlib.sha256()
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        columns = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+        digest.update(repr([str(column) for column in columns]).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    else:
+        data = np.ascontiguousarray(data)
+        digest.update(f"{data.dtype}{data.shape}".encode("utf-8"))
+        digest.update(data.tobytes() if data.dtype != object else repr(data.tolist()).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def lttb(x, y, threshold):
+    """
+    Returns the indices of at most ``threshold`` points of a line chosen by
+    Largest-Triangle-Three-Buckets: the first and last points, and from each
+    of ``threshold - 2`` equal buckets in between the point forming the largest
+    triangle with the previously kept point and the next bucket's average. The
+    kept points follow the line's visual shape, peaks included.
+
+    :param x: Float array of x positions, ascending.
+    :param y: Float array of values; NaNs are never preferred.
+    :param threshold: Number of points to keep; at least 3.
+    """
+    import numpy as np
+
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    bounds = (np.floor(np.arange(threshold - 1) * every) + 1).astype(np.int64)
+    bounds[-1] = n - 1
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    kept = 0
+    for bucket in range(threshold - 2):
+        start, end = bounds[bucket], bounds[bucket + 1]
+        next_end = bounds[bucket + 2] if bucket + 2 < len(bounds) else n
+        with np.errstate(invalid="ignore"):
+            average_x = x[end:next_end].mean()
+            average_y = np.nanmean(y[end:next_end]) if np.isfinite(y[end:next_end]).any() else y[kept]
+        area = np.abs((x[kept] - average_x) * (y[start:end] - y[kept])
+                      - (x[kept] - x[start:end]) * (average_y - y[kept]))
+        kept = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        indices[bucket + 1] = kept
+    return indices
+
+
+def bin_xy(x, y, max_points):
+    """
+    Reduces scatter points to at most ``max_points``: the data's bounding box
+    is divided into a grid of about ``max_points`` cells, and the points of each
+    occupied cell are replaced by their mean. Points with a NaN are dropped.
+
+    :return: (x, y) float arrays.
+    """
+    import numpy as np
+
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
+    if len(x) <= max_points:
+        return x, y
+    side = max(1, int(np.sqrt(max_points)))
+    cells = _grid_index(x, side) * side + _grid_index(y, side)
+    _, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+    return np.bincount(inverse, weights=x) / counts, np.bincount(inverse, weights=y) / counts
+
+
+def _grid_index(values, side):
+    import numpy as np
+
+    low, high = values.min(), values.max()
+    if high <= low:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.minimum(((values - low) / (high - low) * side).astype(np.int64), side - 1)
+
+
+def bucket_reduce(values, buckets, how="mean"):
+    """
+    Aggregates ``values`` into ``buckets`` runs of consecutive rows, ignoring NaNs.
+
+    :param how: 'mean' or 'sum'.
+    :return: (float array of aggregates, start index of each bucket).
+    """
+    import numpy as np
+
+    n = len(values)
+    starts = np.unique(np.floor(np.arange(buckets) * n / buckets).astype(np.int64))
+    finite = np.isfinite(values)
+    sums = np.add.reduceat(np.where(finite, values, 0.0), starts)
+    if how == "sum":
+        return sums, starts
+    counts = np.add.reduceat(finite.astype(np.int64), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan), starts
+
+
+def build_chart_data(chart_name, data=None, x=None, series=None, max_points=None):
+    """
+    Returns the python-pptx chart data of a chart from tabular data.
+
+    Categories (or scatter x values) come from column ``x``, or the first column
+    when the table has several; otherwise from the row numbers. Every numeric
+    column in ``series`` (default: all but ``x``) becomes a series. Longer data
+    is downsampled to ``max_points`` points per chart: line and area charts keep
+    each series' LTTB points, scatter charts bin the points on a grid, and other
+    charts average consecutive rows (pies add them up).
+
+    :param chart_name: XL_CHART_TYPE member name, e.g. 'LINE' or 'XY_SCATTER'.
+    :param data: Chart data in any form load_chart_table accepts, or None for sample data.
+    :param x: Name of the category / x column.
+    :param series: Names of the value columns.
+    :param max_points: Point budget; defaults to SLIDECRAFT_CHART_MAX_POINTS, 0 for no limit.
+    :return: A CategoryChartData, or an XyChartData for scatter charts.
+    """
+    scatter = chart_name.startswith("XY_")
+    if data is None:
+        return _sample_chart_data(scatter)
+
+    import numpy as np
+    import pandas as pd
+
+    table = load_chart_table(data)
+    if x is None and len(table.columns) > 1:
+        x = table.columns[0]
+    if series is None:
+        series = [column for column in table.columns
+                  if column != x and pd.api.types.is_numeric_dtype(table[column])]
+    if not series:
+        raise ValueError("Chart data has no numeric columns to plot.")
+    if max_points is None:
+        max_points = DEFAULT_MAX_CHART_POINTS
+
+    values = {name: table[name].to_numpy(dtype=np.float64, na_value=np.nan) for name in series}
+    labels = table[x] if x is not None else pd.Series(np.arange(1, len(table) + 1))
+    positions = _numeric_positions(labels)
+    if scatter:
+        chart_data = XyChartData()
+        for name in series:
+            xs, ys = positions, values[name]
+            if max_points and len(ys) > max_points:
+                xs, ys = bin_xy(xs, ys, max(1, max_points // len(series)))
+            else:
+                finite = np.isfinite(xs) & np.isfinite(ys)
+                xs, ys = xs[finite], ys[finite]
+            points = chart_data.add_series(str(name))
+            for point_x, point_y in zip(xs.tolist(), ys.tolist()):
+                points.add_data_point(point_x, point_y)
+        return chart_data
+
+    rows = len(table)
+    if max_points and rows > max_points:
+        if chart_name.startswith(("LINE", "AREA")):
+            per_series = max(3, max_points // len(series))
+            keep = np.unique(np.concatenate([lttb(positions, values[name], per_series) for name in series]))
+            labels = labels.iloc[keep]
+            values = {name: values[name][keep] for name in series}
+        else:
+            how = "sum" if chart_name.startswith(("PIE", "DOUGHNUT")) else "mean"
+            reduced = {name: bucket_reduce(values[name], max_points, how) for name in series}
+            starts = next(iter(reduced.values()))[1]
+            labels = labels.iloc[starts]
+            values = {name: aggregate for name, (aggregate, _) in reduced.items()}
+
+    chart_data = _CategoryChartData()
+    chart_data.categories = labels.tolist()
+    for name in series:
+        chart_data.add_series(str(name), _with_gaps(values[name]))
+    return chart_data
+
+
+def _numeric_positions(labels):
+    """
+    Returns float x positions of the labels: their values when numeric or
+    dates, otherwise their row positions.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(labels):
+        return labels.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+    if pd.api.types.is_numeric_dtype(labels) and not pd.api.types.is_bool_dtype(labels):
+        return labels.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.arange(len(labels), dtype=np.float64)
+
+
+def _with_gaps(values):
+    # NaNs become None, which python-pptx writes as a missing point.
+    import numpy as np
+
+    result = values.tolist()
+    for index in np.flatnonzero(~np.isfinite(values)).tolist():
+        result[index] = None
+    return result
+
+
+def _sample_chart_data(scatter=False):
+    if scatter:
+        chart_data = XyChartData()
+        points = chart_data.add_series("Series 1")
+        for index, value in enumerate(SAMPLE_VALUES, start=1):
+            points.add_data_point(index, value)
+        return chart_data
+    chart_data = _CategoryChartData()
+    chart_data.categories = list(SAMPLE_CATEGORIES)
+    chart_data.add_series("Series 1", SAMPLE_VALUES)
+    return chart_data
+
+
+class ChartPartCache:
+    """
+    LRU cache of generated chart parts (the chart XML and its embedded
+    workbook) keyed by chart type, the loaded data's contents and options,
+    bounded by their total size. Identical charts, such as every chart of sample data, are generated
+    once and only parsed for each further slide.
+    """
+
+    def __init__(self, max_bytes=CHART_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(chart_name, table, x, series, max_points, workbook):
+        """
+        :param table: The chart's data from load_chart_table, or None for sample data.
+        """
+        return fingerprint("chart", chart_name, None if table is None else table_digest(table), x, series,
+                           max_points, bool(workbook))
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_bytes <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= _parts_size(self._entries.pop(key))
+            self._entries[key] = value
+            self._size += _parts_size(value)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= _parts_size(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+def _parts_size(parts):
+    xml_bytes, xlsx_blob = parts
+    return len(xml_bytes) + len(xlsx_blob or b"")
+
+
+_cache = ChartPartCache()
+
+
+def get_chart_cache():
+    """
+    Returns the process-wide cache of generated chart parts.
+    """
+    return _cache
+
+
+def add_chart(shapes, chart_name, x, y, cx, cy, data=None, chart_x=None, series=None, max_points=None,
+              workbook=DEFAULT_CHART_WORKBOOKS):
+    """
+    Adds a chart of ``data`` (see build_chart_data) to a slide's shapes, like
+    python-pptx's add_chart, reusing the chart XML and workbook generated for
+    an identical earlier chart.
+
+    :param chart_name: XL_CHART_TYPE member name.
+    :param workbook: Embed an Excel workbook of the data, so it can be edited in
+                     PowerPoint. Without it the chart shows the same values.
+    :return: The chart's graphic frame shape.
+    :raises ValueError: If the data cannot be read or has no numeric columns.
+    :raises KeyError: If ``chart_x`` or ``series`` name a column the data lacks.
+    """
+    # Keyed on the table's contents, so a file edited in place is not served stale.
+    table = load_chart_table(data) if data is not None else None
+    key = _cache.make_key(chart_name, table, chart_x, series, max_points, workbook)
+    parts = _cache.get(key)
+    count("chart.parts", outcome="hit" if parts is not None else "miss")
+    if parts is None:
+        with span("render.chart_data"):
+            chart_data = build_chart_data(chart_name, table, x=chart_x, series=series, max_points=max_points)
+            parts = (chart_data.xml_bytes(getattr(XL_CHART_TYPE, chart_name)),
+                     chart_data.xlsx_blob if workbook else None)
+        _cache.set(key, parts)
+    xml_bytes, xlsx_blob = parts
+
+    package = shapes.part.package
+    chart_part = ChartPart.load(package.next_partname(ChartPart.partname_template), CT.DML_CHART, package,
+                                xml_bytes)
+    if xlsx_blob is not None:
+        chart_part.chart_workbook.update_from_xlsx_blob(xlsx_blob)
+    rId = shapes.part.relate_to(chart_part, RT.CHART)
+    graphic_frame = shapes._add_chart_graphicFrame(rId, x, y, cx, cy)
+    shapes._recalculate_extents()
+    return shapes._shape_factory(graphic_frame)
@@ -0,0 +1,197 @@
+"""
+Headless deck generation.
+
+    python -m PPT_Maker build spec.json -o out.pptx
+    python -m PPT_Maker build specs/ -o decks/ --jobs 8
+
+A spec is a JSON or YAML file holding the same ``sections_data`` structure the
+Streamlit apps build, plus the title slide fields::
+
+    {
+        "presentation_title": "Quarterly Review",
+        "description": "Results and outlook",
+        "author": "Jane Doe",
+        "template": "corporate.pptx",
+        "theme": "Dark",
+        "title_bg": "images/cover.jpg",
+        "common_content_bg": null,
+        "sections_data": [
+            {"section_title": "Results", "section_header_bg": null,
+             "slides": [{"layout": 1, "content": "Revenue grew 12%", "chart_type": "Line"}]}
+        ]
+    }
+
+Image fields ("title_bg", "common_content_bg", "section_header_bg" and a slide's
+"image") hold file paths, resolved relative to the spec file. So does a slide's
+"chart_data", a CSV or Parquet file plotted by its chart (see
+PPT_Maker.charts.build_chart_data; "chart_x" and "chart_series" pick the
+columns). Set "chart_workbooks": false for lightweight charts without an
+embedded workbook. A spec may also be a bare list of sections.
+"""
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PPT_Maker.charts import DEFAULT_CHART_WORKBOOKS
+from PPT_Maker.options import layout_options
+from PPT_Maker.rendering import create_presentation
+
+SPEC_EXTENSIONS = (".json", ".yaml", ".yml")
+
+
+def load_spec(spec_path):
+    """
+    Reads a JSON or YAML spec and resolves its image paths into bytes.
+
+    :param spec_path: Path to the spec file.
+    :return: A dict of create_presentation keyword arguments.
+    """
+    with open(spec_path, "r", encoding="utf-8") as spec_file:
+        if spec_path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("YAML specs require PyYAML: pip install pyyaml")
+            spec = yaml.safe_load(spec_file)
+        else:
+            spec = json.load(spec_file)
+    if isinstance(spec, list):
+        spec = {"sections_data": spec}
+
+    base_dir = os.path.dirname(os.path.abspath(spec_path))
+
+    def _read(path):
+        if not path:
+            return None
+        if isinstance(path, list):
+            return [_read(p) for p in path]
+        with open(os.path.join(base_dir, path), "rb") as image_file:
+            return image_file.read()
+
+    sections_data = []
+    for section in spec.get("sections_data", spec.get("sections", [])):
+        slides = []
+        for slide_data in section.get("slides", []):
+            slide_data = dict(slide_data)
+            slide_data["image"] = _read(slide_data.get("image"))
+            if isinstance(slide_data.get("chart_data"), str):
+                slide_data["chart_data"] = _read(slide_data["chart_data"])
+            # Layouts may be given by index or by the apps' option label.
+            layout = slide_data.get("layout", 6)
+            slide_data["layout"] = layout_options.get(layout, layout)
+            slides.append(slide_data)
+        sections_data.append({
+            "section_title": section.get("section_title", ""),
+            "section_header_bg": _read(section.get("section_header_bg")),
+            "slides": slides,
+        })
+
+    template = spec.get("template")
+    return {
+        "presentation_title": spec.get("presentation_title", "My Presentation"),
+        "description": spec.get("description", ""),
+        "author": spec.get("author", ""),
+        "title_bg_bytes": _read(spec.get("title_bg")),
+        "common_content_bg_bytes": _read(spec.get("common_content_bg")),
+        "sections_data": sections_data,
+        "template_file": os.path.join(base_dir, template) if template else None,
+        "theme_choice": spec.get("theme"),
+        "chart_workbooks": spec.get("chart_workbooks", DEFAULT_CHART_WORKBOOKS),
+    }
+
+
+def build_deck(spec_path, output_path, image_workers=None, section_workers=None):
+    """
+    Renders one spec to a PPTX file.
+
+    :param image_workers: Worker processes for image preparation; None uses the default.
+    :param section_workers: Worker processes for section rendering; None uses the default.
+    :return: The output path.
+    """
+    options = {}
+    if image_workers is not None:
+        options["image_workers"] = image_workers
+    if section_workers is not None:
+        options["section_workers"] = section_workers
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    return create_presentation(**load_spec(spec_path), output=output_path, **options)
+
+
+def build_decks(jobs, max_workers=None):
+    """
+    Renders many specs in parallel across a process pool.
+
+    :param jobs: List of (spec_path, output_path) pairs.
+    :param max_workers: Number of worker processes; defaults to the CPU count.
+    :return: A list of (spec_path, output_path, error) tuples in completion order,
+             where error is None on success.
+    """
+    results = []
+    if len(jobs) == 1:
+        spec_path, output_path = jobs[0]
+        try:
+            build_deck(spec_path, output_path)
+            results.append((spec_path, output_path, None))
+        except Exception as e:
+            results.append((spec_path, output_path, e))
+        return results
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Decks already run one per core, so each renders its sections and images in-process.
+        futures = {executor.submit(build_deck, spec_path, output_path, 1, 1): (spec_path, output_path)
+                   for spec_path, output_path in jobs}
+        for future in as_completed(futures):
+            spec_path, output_path = futures[future]
+            try:
+                future.result()
+                results.append((spec_path, output_path, None))
+            except Exception as e:
+                results.append((spec_path, output_path, e))
+    return results
+
+
+def _collect_jobs(inputs, output):
+    specs = []
+    for path in inputs:
+        if os.path.isdir(path):
+            specs.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith(SPEC_EXTENSIONS)
+            )
+        else:
+            specs.append(path)
+    if not specs:
+        raise SystemExit("No spec files found.")
+
+    if len(specs) == 1 and output and output.lower().endswith(".pptx"):
+        return [(specs[0], output)]
+    output_dir = output or "."
+    return [
+        (spec, os.path.join(output_dir, os.path.splitext(os.path.basename(spec))[0] + ".pptx"))
+        for spec in specs
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="slidecraft", description="Headless SlideCraft deck generation.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Render JSON/YAML specs to PPTX files.")
+    build.add_argument("inputs", nargs="+", help="Spec files or directories of specs.")
+    build.add_argument("-o", "--output",
+                       help="Output .pptx for a single spec, or output directory (default: current directory).")
+    build.add_argument("-j", "--jobs", type=int, default=None,
+                       help="Worker processes for parallel rendering (default: CPU count).")
+    args = parser.parse_args(argv)
+
+    jobs = _collect_jobs(args.inputs, args.output)
+    failures = 0
+    for spec_path, output_path, error in build_decks(jobs, max_workers=args.jobs):
+        if error is None:
+            print(f"{spec_path} -> {output_path}")
+        else:
+            failures += 1
+            print(f"{spec_path}: {error}", file=sys.stderr)
+    return 1 if failures else 0
@@ -0,0 +1,70 @@
+import os
+import time
+import tempfile
+
+# Where generated decks are written for download, and how long they are kept.
+DECK_OUTPUT_DIR = os.getenv("SLIDECRAFT_OUTPUT_DIR", os.path.join(tempfile.gettempdir(), "slidecraft-decks"))
+DECK_MAX_AGE_SECONDS = float(os.getenv("SLIDECRAFT_DECK_MAX_AGE", "3600"))
+# Decks saved without a destination stay in memory up to this size, then spill to disk.
+SPOOL_MAX_BYTES = int(os.getenv("SLIDECRAFT_SPOOL_MAX_BYTES", str(16 * 1024 * 1024)))
+
+
+def save_presentation(prs, output=None):
+    """
+    Saves a presentation without building the whole package in an in-memory buffer.
+
+    :param prs: The python-pptx Presentation.
+    :param output: Destination path or writable file object. When None, the deck is
+                   written to a SpooledTemporaryFile that moves to disk once it
+                   exceeds SPOOL_MAX_BYTES.
+    :return: The output as given, or the spooled file rewound to the start.
+    """
+    if output is None:
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, suffix=".pptx")
+        prs.save(spool)
+        spool.seek(0)
+        return spool
+    prs.save(output)
+    return output
+
+
+def new_deck_path(prefix="deck-"):
+    """
+    Returns a fresh .pptx path in the managed output directory, first removing
+    decks older than DECK_MAX_AGE_SECONDS.
+    """
+    os.makedirs(DECK_OUTPUT_DIR, exist_ok=True)
+    cleanup_old_decks()
+    fd, path = tempfile.mkstemp(suffix=".pptx", prefix=prefix, dir=DECK_OUTPUT_DIR)
+    os.close(fd)
+    return path
+
+
+def cleanup_old_decks(max_age=DECK_MAX_AGE_SECONDS):
+    """
+    Deletes decks in the managed output directory last modified more than
+    ``max_age`` seconds ago.
+
+    :return: The number of files removed.
+    """
+    if not os.path.isdir(DECK_OUTPUT_DIR):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(DECK_OUTPUT_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            # Already removed by another session, or still being written on Windows.
+            continue
+    return removed
+
+
+def read_deck(path):
+    """
+    Returns the bytes of a saved deck.
+    """
+    with open(path, "rb") as deck_file:
+        return deck_file.read()
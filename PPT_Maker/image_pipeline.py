@@ -0,0 +1,198 @@
+import io
+import os
+import atexit
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+
+EMU_PER_INCH = 914400
+
+# Resolution images are resampled to for their box on the slide.
+DEFAULT_IMAGE_DPI = int(os.getenv("SLIDECRAFT_IMAGE_DPI", "150"))
+JPEG_QUALITY = int(os.getenv("SLIDECRAFT_IMAGE_JPEG_QUALITY", "85"))
+DEFAULT_IMAGE_WORKERS = int(os.getenv("SLIDECRAFT_IMAGE_WORKERS", str(os.cpu_count() or 1)))
+# Below this much uncached input, process start-up costs more than it saves.
+POOL_MIN_BYTES = 4 * 1024 * 1024
+CACHE_MAX_BYTES = int(os.getenv("SLIDECRAFT_IMAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Images with at most this many colours are treated as graphics and kept lossless.
+GRAPHIC_MAX_COLORS = 256
+
+
+def prepare_image(image_bytes, width_emu, height_emu=None, dpi=DEFAULT_IMAGE_DPI):
+    """
+    Resamples an image to the pixel size of its box on the slide and re-encodes it.
+
+    The image is rotated according to its EXIF orientation, downscaled (never
+    upscaled) to fit the box at ``dpi``, and saved without metadata: as PNG if it
+    has transparency or few colours (screenshots, logos, diagrams), otherwise as
+    JPEG. If nothing was downscaled and re-encoding would not make the image
+    smaller, the original bytes are returned.
+
+    :param image_bytes: Source image bytes.
+    :param width_emu: Width of the box on the slide in EMU.
+    :param height_emu: Height of the box in EMU; None keeps the aspect ratio.
+    :param dpi: Target resolution in pixels per inch.
+    :return: Image bytes ready for add_picture.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image = ImageOps.exif_transpose(image)
+        max_width = max(1, round(width_emu / EMU_PER_INCH * dpi))
+        max_height = max(1, round(height_emu / EMU_PER_INCH * dpi)) if height_emu else None
+        # Fill the box: keep enough pixels on both axes for a stretched full-slide image.
+        scale = max_width / image.width
+        if max_height:
+            scale = max(scale, max_height / image.height)
+        resized = scale < 1
+        if resized:
+            image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                                 Image.LANCZOS)
+
+        output = io.BytesIO()
+        if _is_graphic(image):
+            if image.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+                image = image.convert("RGBA")
+            image.save(output, format="PNG", optimize=True)
+        else:
+            image.convert("RGB").save(output, format="JPEG", quality=JPEG_QUALITY,
+                                      optimize=True, progressive=True)
+    if not resized and output.tell() >= len(image_bytes):
+        return image_bytes
+    return output.getvalue()
+
+
+def _is_graphic(image):
+    if image.mode in ("P", "1"):
+        return True
+    if image.mode in ("RGBA", "LA"):
+        if image.getchannel("A").getextrema()[0] < 255:
+            return True
+    elif "transparency" in image.info:
+        return True
+    # getcolors returns None once the image has more distinct colours than the limit.
+    return image.getcolors(GRAPHIC_MAX_COLORS) is not None
+
+
+def _prepare_job(job):
+    return prepare_image(*job)
+
+
+class PreparedImageCache:
+    """
+    LRU cache of prepared images keyed by source hash, target box and DPI,
+    bounded by the total size of the prepared bytes.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(image_bytes, width_emu, height_emu, dpi):
+        return (hashlib.sha256(image_bytes).hexdigest(), width_emu, height_emu, dpi)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_cache = PreparedImageCache()
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def get_image_cache():
+    """
+    Returns the process-wide cache of prepared images.
+    """
+    return _cache
+
+
+def _get_executor(max_workers):
+    # One pool per process, grown to the largest size asked for so far. A pool
+    # being replaced still finishes the images already submitted to it.
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or max_workers > _executor_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=max_workers)
+            _executor_workers = max_workers
+        return _executor
+
+
+def shutdown_image_executor():
+    """
+    Stops the image worker processes. A later prepare_images call starts them again.
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        executor, _executor, _executor_workers = _executor, None, 0
+    if executor is not None:
+        executor.shutdown()
+
+
+atexit.register(shutdown_image_executor)
+
+
+def prepare_images(requests, dpi=DEFAULT_IMAGE_DPI, max_workers=DEFAULT_IMAGE_WORKERS):
+    """
+    Prepares many images, reusing cached results and spreading the rest over a
+    process pool.
+
+    :param requests: Iterable of (image_bytes, width_emu, height_emu) tuples.
+    :param dpi: Target resolution in pixels per inch.
+    :param max_workers: Worker processes; 1 prepares everything in this process. The
+                        pool is shared by every caller and sized for the largest request.
+    :return: A dict mapping each request tuple to its prepared bytes.
+    """
+    prepared = {}
+    pending = {}
+    for request in requests:
+        if request in prepared or request in pending:
+            continue
+        image_bytes, width_emu, height_emu = request
+        key = _cache.make_key(image_bytes, width_emu, height_emu, dpi)
+        cached = _cache.get(key)
+        if cached is not None:
+            prepared[request] = cached
+        else:
+            pending[request] = key
+    if not pending:
+        return prepared
+
+    jobs = [(image_bytes, width_emu, height_emu, dpi) for image_bytes, width_emu, height_emu in pending]
+    use_pool = (max_workers > 1 and len(jobs) > 1
+                and sum(len(job[0]) for job in jobs) >= POOL_MIN_BYTES)
+    if use_pool:
+        results = _get_executor(max_workers).map(_prepare_job, jobs)
+    else:
+        results = map(_prepare_job, jobs)
+    for (request, key), result in zip(pending.items(), results):
+        _cache.set(key, result)
+        prepared[request] = result
+    return prepared
@@ -0,0 +1,133 @@
+import os
+import json
+import uuid
+import hashlib
+from collections import OrderedDict
+
+# Slide fields that change what a rendered slide looks like. Images and chart
+# data are hashed separately so fingerprints stay cheap to compare and store.
+SLIDE_FINGERPRINT_FIELDS = ("layout", "content", "image_type", "chart_type", "chart_x", "chart_series",
+                            "chart_max_points", "font_size", "font_type", "improvement_tips")
+
+# Upper bound on the rendered slides kept per session.
+SLIDE_CACHE_MAX_BYTES = int(os.getenv("SLIDECRAFT_SLIDE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def fingerprint(*values):
+    """
+    Returns a SHA-256 hex digest of JSON-serialisable values. Bytes (such as
+    image data), DataFrames and NumPy arrays are reduced to their own SHA-256 first.
+    """
+    return hashlib.sha256(json.dumps(values, default=_encode, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _encode(value):
+    if isinstance(value, (bytes, bytearray)):
+        return "sha256:" + hashlib.sha256(value).hexdigest()
+    if type(value).__module__.split(".")[0] in ("numpy", "pandas"):
+        from PPT_Maker.charts import table_digest
+        return "sha256:" + table_digest(value)
+    return str(value)
+
+
+def slide_fingerprint(slide_data):
+    """
+    Fingerprints a slide dict from sections_data by its content, layout, images,
+    chart and font settings.
+    """
+    chart_data = slide_data.get("chart_data")
+    if isinstance(chart_data, str) and os.path.isfile(chart_data):
+        # A file may be rewritten under the same path, so use its contents.
+        with open(chart_data, "rb") as chart_file:
+            chart_data = chart_file.read()
+    return fingerprint([slide_data.get(field) for field in SLIDE_FINGERPRINT_FIELDS], slide_data.get("image"),
+                       chart_data)
+
+
+def rewrite_key(slide_data, provider, model, temperature):
+    """
+    Key of an AI rewrite: the original content and instructions plus the model.
+    """
+    return fingerprint("rewrite", slide_data.get("content", ""), slide_data.get("ai_prompt", ""),
+                       provider, model, temperature)
+
+
+def tips_key(content, provider, model, temperature):
+    """
+    Key of a slide's improvement tips: its final content plus the model.
+    """
+    return fingerprint("tips", content, provider, model, temperature)
+
+
+class RenderedSlideCache:
+    """
+    Rendered slides of earlier create_presentation calls, keyed by the fingerprint
+    of the slide and of everything else its rendering depends on. Each value is a
+    SlideSnapshot (see PPT_Maker.merge): the slide's XML and related parts,
+    detached from the scratch presentation it was rendered in.
+
+    Only slides used by the most recent deck are kept, and the least recently
+    used are dropped once the snapshots exceed ``max_bytes``.
+
+    :param max_bytes: Upper bound on the snapshots' total size; see SLIDECRAFT_SLIDE_CACHE_MAX_BYTES.
+    """
+
+    def __init__(self, max_bytes=SLIDE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._slides = OrderedDict()
+        self._size = 0
+
+    def __contains__(self, key):
+        return key in self._slides
+
+    def __len__(self):
+        return len(self._slides)
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key):
+        snapshot = self._slides.get(key)
+        if snapshot is not None:
+            self._slides.move_to_end(key)
+        return snapshot
+
+    def set(self, key, snapshot):
+        if key in self._slides:
+            self._size -= self._slides.pop(key).size
+        self._slides[key] = snapshot
+        self._size += snapshot.size
+        while self._size > self.max_bytes and self._slides:
+            _, evicted = self._slides.popitem(last=False)
+            self._size -= evicted.size
+
+    def retain(self, keys):
+        """
+        Drops every slide whose key is not in ``keys``.
+        """
+        keys = set(keys)
+        for key in [key for key in self._slides if key not in keys]:
+            self._size -= self._slides.pop(key).size
+
+    def clear(self):
+        self._slides.clear()
+        self._size = 0
+
+
+class SlideMemo:
+    """
+    Per-session memo of derived slide results: AI rewrites and improvement tips.
+    Stored in Streamlit session state so that regenerating a deck only recomputes
+    the slides whose fingerprint changed. Rendered slides are kept by the process
+    rendering the session's decks, under the memo's ``id`` (see PPT_Maker.jobs).
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.rewrites = {}
+        self.tips = {}
+
+    def clear(self):
+        self.rewrites.clear()
+        self.tips.clear()
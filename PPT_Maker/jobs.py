@@ -0,0 +1,536 @@
+import os
+import copy
+import time
+import uuid
+import atexit
+import logging
+import threading
+import multiprocessing
+from typing import List
+from multiprocessing.util import Finalize
+from functools import partial
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pydantic import BaseModel
+
+from llm_service.budget import fit_context, rewrite_max_tokens, slides_max_tokens
+from llm_service.improvement_tips import build_tips_prompt, generate_improvement_tips_batch, tips_max_tokens
+from llm_service.llm_generator import generate_llm_json, is_error_response, stream_llm_responses_batch
+from llm_service.metrics import add_stages, bind_context, finish_run, span, start_run
+from PPT_Maker.deck_output import DECK_MAX_AGE_SECONDS, new_deck_path
+from PPT_Maker.incremental import RenderedSlideCache, rewrite_key, tips_key
+from PPT_Maker.options import layout_options
+
+logger = logging.getLogger(__name__)
+
+# Generation jobs run at once across all sessions; further jobs wait in a queue.
+DEFAULT_JOB_WORKERS = int(os.getenv("SLIDECRAFT_JOB_WORKERS", "4"))
+
+# Worker processes rendering the decks of jobs, so that a render does not hold
+# the GIL of the process serving every session. 0 renders in the job's thread.
+DEFAULT_RENDER_PROCESSES = int(os.getenv("SLIDECRAFT_JOB_RENDER_PROCESSES", "2"))
+
+# Sessions whose rendered slides each render process keeps, least recently used first out.
+RENDER_SESSIONS_PER_PROCESS = int(os.getenv("SLIDECRAFT_RENDER_SESSIONS", "8"))
+
+# Finished jobs are forgotten after this long if nobody collects them.
+JOB_MAX_AGE_SECONDS = DECK_MAX_AGE_SECONDS
+
+# Job statuses.
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+# Pydantic model for JSON output
+class SlideEvent(BaseModel):
+    content: List[str]
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job once it has been cancelled.
+    """
+
+
+class GenerationJob:
+    """
+    A deck generation running in the background, and its progress: the stages
+    started so far, each with a count of finished items and, for streamed LLM
+    responses, each slide's text so far.
+
+    Jobs are updated by their worker thread and read by Streamlit reruns; read
+    them through snapshot().
+    """
+
+    def __init__(self, job_id):
+        self.id = job_id
+        self.status = QUEUED
+        self.deck_path = None
+        self.error = None
+        self.run_summary = None
+        self.created = time.time()
+        self.finished_at = None
+        self._stages = []
+        self._warnings = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """
+        Asks the job to stop. It stops at the next slide or stage boundary; a
+        deck being rendered is finished first.
+        """
+        self._cancelled.set()
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def start_stage(self, name, label, total=0, item_labels=None):
+        """
+        Starts a stage of ``total`` items, or of one item per entry of
+        ``item_labels`` whose text is then shown as it arrives.
+        """
+        with self._lock:
+            self._stages.append({
+                "name": name,
+                "label": label,
+                "done": 0,
+                "total": len(item_labels) if item_labels is not None else total,
+                "items": [[item_label, ""] for item_label in item_labels or ()],
+            })
+
+    def advance(self, name, amount=1):
+        with self._lock:
+            stage = self._stage(name)
+            stage["done"] = min(stage["total"], stage["done"] + amount)
+
+    def set_done(self, name, done):
+        with self._lock:
+            stage = self._stage(name)
+            stage["done"] = min(stage["total"], done)
+
+    def set_item_text(self, name, index, text):
+        with self._lock:
+            self._stage(name)["items"][index][1] = text
+
+    def warn(self, message):
+        with self._lock:
+            self._warnings.append(message)
+
+    def _stage(self, name):
+        for stage in reversed(self._stages):
+            if stage["name"] == name:
+                return stage
+        raise KeyError(name)
+
+    def snapshot(self):
+        """
+        Returns a consistent copy of the job's state as a dict.
+        """
+        with self._lock:
+            return {
+                "id": self.id,
+                "status": self.status,
+                "stages": copy.deepcopy(self._stages),
+                "warnings": list(self._warnings),
+                "deck_path": self.deck_path,
+                "error": self.error,
+                "elapsed_seconds": (self.finished_at or time.time()) - self.created,
+            }
+
+
+class JobManager:
+    """
+    Runs generation jobs on a thread pool shared by every session and keeps
+    them by ID, so a session only needs to remember the ID between reruns.
+
+    :param max_workers: Jobs run at once; see SLIDECRAFT_JOB_WORKERS.
+    """
+
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="slidecraft-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queues fn(job, *args, **kwargs) and returns the new GenerationJob. The
+        function's return value becomes the job's deck_path.
+        """
+        self._prune()
+        job = GenerationJob(uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(bind_context(self._run), job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def discard(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _run(self, job, fn, args, kwargs):
+        status = RUNNING
+        try:
+            job.check_cancelled()
+            job.status = RUNNING
+            job.deck_path = fn(job, *args, **kwargs)
+            status = DONE
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:
+            logger.exception("Generation job %s failed", job.id)
+            job.error = str(e)
+            status = FAILED
+        finally:
+            job.finished_at = time.time()
+            job.status = status
+
+    def _prune(self):
+        cutoff = time.time() - JOB_MAX_AGE_SECONDS
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job.finished and job.finished_at < cutoff]:
+                del self._jobs[job_id]
+
+
+_manager = None
+_lock = threading.Lock()
+
+# Render workers, their progress queue and the jobs listening to it, by render task.
+# Workers are spawned rather than forked from this multi-threaded process, so
+# they cannot inherit a lock held by another thread.
+_render_context = multiprocessing.get_context("spawn")
+_render_executors = []
+_render_progress = None
+_render_forwarder = None
+_render_listeners = {}
+# In render processes: the queue progress is sent back through, and the
+# sessions' rendered slides.
+_worker_progress = None
+_slide_caches = OrderedDict()
+
+
+def get_job_manager():
+    """
+    Returns the process-wide JobManager.
+    """
+    global _manager
+    with _lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
+
+
+def _get_render_executor(session_id):
+    """
+    Returns the render worker of a session. Each worker is a single-process pool,
+    so a session's decks always reach the process holding its rendered slides.
+    """
+    global _render_progress, _render_forwarder
+    with _lock:
+        if not _render_executors:
+            _render_progress = _render_context.Queue()
+            _render_forwarder = threading.Thread(target=_forward_render_progress, args=(_render_progress,),
+                                                 name="slidecraft-render-progress", daemon=True)
+            _render_forwarder.start()
+            _render_executors.extend(_new_render_executor() for _ in range(DEFAULT_RENDER_PROCESSES))
+        slot = int(session_id[:8], 16) % len(_render_executors)
+        return slot, _render_executors[slot]
+
+
+def _new_render_executor():
+    return ProcessPoolExecutor(max_workers=1, mp_context=_render_context, initializer=_init_render_worker,
+                               initargs=(_render_progress,))
+
+
+def _shutdown_render_executors():
+    with _lock:
+        executors = list(_render_executors)
+        _render_executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False)
+    if _render_forwarder is not None:
+        _render_progress.put(None)
+        _render_forwarder.join(timeout=5)
+
+
+atexit.register(_shutdown_render_executors)
+
+
+def _forward_render_progress(queue):
+    # Runs in this process: hands the workers' progress to the jobs waiting on it.
+    for task_id, done in iter(queue.get, None):
+        _report_render_progress(task_id, done)
+
+
+def _report_render_progress(task_id, done, total=None):
+    if _worker_progress is not None:
+        _worker_progress.put((task_id, done))
+        return
+    with _lock:
+        listener = _render_listeners.get(task_id)
+    if listener is not None:
+        listener(done)
+
+
+def _init_render_worker(progress_queue):
+    global _worker_progress
+    _worker_progress = progress_queue
+    # A worker process waits for its own children before atexit handlers run,
+    # so the section and image pools it may start are shut down ahead of that,
+    # and while their queues are still open (those close at exit priority 10).
+    Finalize(None, _shutdown_worker_pools, exitpriority=100)
+
+
+def _shutdown_worker_pools():
+    from PPT_Maker.image_pipeline import shutdown_image_executor
+    from PPT_Maker.rendering import shutdown_section_executor
+
+    shutdown_section_executor()
+    shutdown_image_executor()
+
+
+def _session_slide_cache(session_id):
+    with _lock:
+        slide_cache = _slide_caches.pop(session_id, None) or RenderedSlideCache()
+        _slide_caches[session_id] = slide_cache
+        while len(_slide_caches) > RENDER_SESSIONS_PER_PROCESS:
+            _slide_caches.popitem(last=False)
+        return slide_cache
+
+
+def _render_job_deck(task_id, session_id, output, args, kwargs):
+    """
+    Renders a job's deck with the session's rendered slides of this process, in
+    a render worker or in the job's thread.
+
+    :return: (output, stage totals of the render's metrics run, warnings).
+    """
+    # Imported here: python-pptx is only needed once a deck is built.
+    from PPT_Maker.rendering import create_presentation
+
+    warnings = []
+    run = start_run("render")
+    try:
+        create_presentation(*args, output=output, slide_cache=_session_slide_cache(session_id),
+                            warnings=warnings, progress_callback=partial(_report_render_progress, task_id),
+                            **kwargs)
+    finally:
+        finish_run(run, export=False)
+    return output, run.summary()["stages"], warnings
+
+
+def render_deck(job, session_id, *args, **kwargs):
+    """
+    Runs create_presentation into a new file of the managed output directory,
+    in a render worker process unless SLIDECRAFT_JOB_RENDER_PROCESSES is 0, and
+    reports each rendered slide to the job's "render" stage. The decks of one
+    session go to the same worker, which keeps the session's rendered slides
+    (see PPT_Maker.incremental) between runs. Only the deck's path, the
+    render's stage timings and its warnings come back from the worker.
+
+    :param session_id: ID of the session's SlideMemo.
+    :return: (path of the deck, list of warnings about charts left out).
+    """
+    task_id = uuid.uuid4().hex
+    with _lock:
+        _render_listeners[task_id] = partial(job.set_done, "render")
+    try:
+        if DEFAULT_RENDER_PROCESSES <= 0:
+            output, stages, warnings = _render_job_deck(task_id, session_id, new_deck_path(), args, kwargs)
+        else:
+            slot, executor = _get_render_executor(session_id)
+            try:
+                output, stages, warnings = executor.submit(
+                    _render_job_deck, task_id, session_id, new_deck_path(), args, kwargs
+                ).result()
+            except BrokenProcessPool:
+                # The worker died (e.g. killed for memory); give later jobs a fresh one.
+                with _lock:
+                    if slot < len(_render_executors) and _render_executors[slot] is executor:
+                        _render_executors[slot] = _new_render_executor()
+                raise
+        add_stages(stages)
+    finally:
+        with _lock:
+            _render_listeners.pop(task_id, None)
+    return output, warnings
+
+
+def _stream_to_job(job, stage, prompts, max_tokens=None):
+    """
+    Streams LLM responses for several prompts concurrently into a stage's items.
+
+    :return: The complete responses, in the same order as prompts.
+    """
+    parts = [[] for _ in prompts]
+    for index, chunk in stream_llm_responses_batch(prompts, provider="openai", model="gpt-4o",
+                                                   temperature=0.7, max_tokens=max_tokens):
+        job.check_cancelled()
+        if chunk is None:
+            job.advance(stage)
+            continue
+        parts[index].append(chunk)
+        job.set_item_text(stage, index, "".join(parts[index]))
+    return ["".join(chunks) for chunks in parts]
+
+
+def generate_deck(job, presentation_title, description, author, title_bg_bytes, common_content_bg_bytes,
+                  sections_data, memo, auto_generate=None, batch_tips=True, render_options=None):
+    """
+    The apps' Generate PPT pipeline, run as a job: AI rewrites, AI-generated
+    slides, improvement tips and rendering, each reported as a stage of ``job``.
+    The run's metrics summary is kept in job.run_summary.
+
+    :param memo: The session's SlideMemo. Rewrites and tips of slides whose inputs
+                 have not changed since an earlier run are reused.
+    :param auto_generate: Optional dict with "context", "prompt" and "num_slides";
+                          the generated slides replace sections_data.
+    :param batch_tips: Generate all improvement tips in batched requests instead of
+                       streaming each one.
+    :param render_options: Further create_presentation keyword arguments, such as
+                           template_file (bytes) and theme_choice.
+    :return: Path of the generated deck.
+    """
+    run = start_run("generate")
+    try:
+        # For manual slides, if AI rewriting is requested, update the content.
+        rewrite_slides = []
+        rewrite_labels = []
+        for section in sections_data:
+            for idx, slide_data in enumerate(section["slides"]):
+                if slide_data.get("use_ai", False) and slide_data.get("content", "") and slide_data.get("ai_prompt", ""):
+                    key = rewrite_key(slide_data, "openai", "gpt-4o", 0.7)
+                    if key in memo.rewrites:
+                        slide_data["content"] = memo.rewrites[key]
+                        continue
+                    rewrite_slides.append((slide_data, key))
+                    rewrite_labels.append(f"{section['section_title']} - Slide {idx+1}")
+        if rewrite_slides:
+            # Long contents are compacted to the context budget, and each
+            # rewrite is capped at about the length of the longest original.
+            rewrite_tokens = rewrite_max_tokens([slide_data["content"] for slide_data, _ in rewrite_slides], "gpt-4o")
+            job.start_stage("rewrites", "Rewriting slide content with AI", item_labels=rewrite_labels)
+            with span("generate.rewrites"):
+                rewritten = _stream_to_job(
+                    job, "rewrites",
+                    ["Context:\n" + fit_context(slide_data["content"], "gpt-4o", reserved_tokens=rewrite_tokens,
+                                                query=slide_data["ai_prompt"], label="rewrite context")
+                     + "\n\n" + "Instructions:\n" + slide_data["ai_prompt"]
+                     for slide_data, _ in rewrite_slides],
+                    max_tokens=rewrite_tokens
+                )
+            for (slide_data, key), new_content in zip(rewrite_slides, rewritten):
+                slide_data["content"] = new_content
+                if not is_error_response(new_content):
+                    memo.rewrites[key] = new_content
+
+        # If auto-generation is enabled, override manual sections.
+        if auto_generate:
+            num_ai_slides = auto_generate["num_slides"]
+            slides_tokens = slides_max_tokens(num_ai_slides, "gpt-4o")
+            context = fit_context(auto_generate["context"], "gpt-4o", reserved_tokens=slides_tokens,
+                                  query=auto_generate["prompt"], label="auto-generate context")
+            combined_prompt = (
+                f"Context:\n{context}\n\n"
+                f"Instructions:\n{auto_generate['prompt']}\n\n"
+                f"Please generate exactly {num_ai_slides} slide contents for a PowerPoint presentation "
+                "as a JSON array of strings. Each string should correspond to the content for one slide. "
+                "Do not include any additional text."
+            )
+            job.start_stage("auto_slides", f"Generating {num_ai_slides} slides with AI", total=1)
+            with span("generate.auto_slides"):
+                ai_output = generate_llm_json(
+                    combined_prompt, SlideEvent, provider="openai", model="gpt-4o", temperature=0.7,
+                    max_tokens=slides_tokens
+                )
+            job.advance("auto_slides")
+            logger.debug("Auto-generated slides: %s", ai_output)
+            try:
+                slide_contents = ai_output.content
+                if not isinstance(slide_contents, list) or len(slide_contents) != num_ai_slides:
+                    raise ValueError("The JSON array does not have the required number of slides.")
+            except Exception as e:
+                job.warn("Error parsing AI output as JSON: " + str(e))
+                slide_contents = ["" for _ in range(num_ai_slides)]
+            sections_data = [{
+                "section_title": "Auto-Generated Slides",
+                "section_header_bg": None,
+                "slides": [{
+                    "layout": layout_options["Title and Content (1)"],
+                    "content": slide_contents[i],
+                    "image": None,
+                    "image_type": None,
+                    "chart_type": None,
+                    "use_ai": False,
+                    "ai_prompt": "",
+                    "font_size": 24,
+                    "font_type": "Calibri",
+                    "improvement_tips": ""  # will be auto-generated below
+                } for i in range(num_ai_slides)]
+            }]
+        job.check_cancelled()
+
+        # --- Auto-generate Improvement Tips for every slide ---
+        tip_slides = []
+        tip_labels = []
+        for section in sections_data:
+            for idx, slide_data in enumerate(section["slides"]):
+                if slide_data.get("content", "").strip():
+                    key = tips_key(slide_data["content"].strip(), "openai", "gpt-4o", 0.7)
+                    if key in memo.tips:
+                        slide_data["improvement_tips"] = memo.tips[key]
+                        continue
+                    tip_slides.append((slide_data, key))
+                    tip_labels.append(f"{section['section_title']} - Slide {idx+1}")
+                else:
+                    slide_data["improvement_tips"] = "No content provided for improvement tips."
+        if tip_slides:
+            with span("generate.tips"):
+                if batch_tips:
+                    job.start_stage("tips", "Generating improvement tips", total=len(tip_slides))
+                    tips = generate_improvement_tips_batch(
+                        [slide_data["content"].strip() for slide_data, _ in tip_slides],
+                        provider="openai",
+                        model="gpt-4o",
+                        temperature=0.7
+                    )
+                    job.advance("tips", len(tip_slides))
+                else:
+                    job.start_stage("tips", "Generating improvement tips", item_labels=tip_labels)
+                    tips = _stream_to_job(
+                        job, "tips",
+                        [build_tips_prompt(slide_data["content"].strip()) for slide_data, _ in tip_slides],
+                        max_tokens=tips_max_tokens("gpt-4o")
+                    )
+            for (slide_data, key), improvement in zip(tip_slides, tips):
+                slide_data["improvement_tips"] = improvement
+                if not is_error_response(improvement):
+                    memo.tips[key] = improvement
+        job.check_cancelled()
+
+        total_slides = sum(len(section["slides"]) for section in sections_data)
+        job.start_stage("render", f"Rendering {total_slides} slides", total=total_slides)
+        with span("generate.render"):
+            deck_path, render_warnings = render_deck(job, memo.id, presentation_title, description, author,
+                                                     title_bg_bytes, common_content_bg_bytes, sections_data,
+                                                     **(render_options or {}))
+        for message in render_warnings:
+            job.warn(message)
+        return deck_path
+    finally:
+        job.run_summary = finish_run(run).summary()
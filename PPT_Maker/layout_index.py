@@ -0,0 +1,174 @@
+import re
+from collections import namedtuple
+
+from pptx.enum.shapes import PP_PLACEHOLDER
+
+# Semantic layout roles, in the order of python-pptx's built-in template so that
+# legacy integer layouts (0-10) map onto the role they used to select there.
+DEFAULT_LAYOUT_ROLES = (
+    "title",
+    "title_content",
+    "section_header",
+    "two_content",
+    "comparison",
+    "title_only",
+    "blank",
+    "content_caption",
+    "picture_caption",
+    "title_vertical_text",
+    "vertical_title_text",
+)
+
+# Normalised layout names recognised for each role.
+ROLE_NAME_ALIASES = {
+    "title": ("title slide", "title", "title page", "cover", "cover slide"),
+    "title_content": ("title and content", "title content", "title and body", "title body", "content"),
+    "section_header": ("section header", "section title", "section", "section divider", "divider"),
+    "two_content": ("two content", "two column", "two columns"),
+    "comparison": ("comparison",),
+    "title_only": ("title only",),
+    "blank": ("blank", "empty"),
+    "content_caption": ("content with caption", "content caption"),
+    "picture_caption": ("picture with caption", "picture caption", "image with caption"),
+    "title_vertical_text": ("title and vertical text",),
+    "vertical_title_text": ("vertical title and text",),
+}
+
+# Roles tried, in order, when a template has no layout for a role.
+ROLE_FALLBACKS = {
+    "title": ("section_header", "title_only", "title_content"),
+    "title_content": ("content_caption", "two_content", "title_only", "blank"),
+    "section_header": ("title", "title_only"),
+    "two_content": ("comparison", "title_content"),
+    "comparison": ("two_content", "title_content"),
+    "title_only": ("title_content", "section_header"),
+    "blank": ("title_only",),
+    "content_caption": ("title_content",),
+    "picture_caption": ("content_caption", "title_content"),
+    "title_vertical_text": ("title_content",),
+    "vertical_title_text": ("title_vertical_text", "title_content"),
+}
+
+TITLE_TYPES = (PP_PLACEHOLDER.TITLE, PP_PLACEHOLDER.CENTER_TITLE, PP_PLACEHOLDER.VERTICAL_TITLE)
+BODY_TYPES = (PP_PLACEHOLDER.OBJECT, PP_PLACEHOLDER.BODY, PP_PLACEHOLDER.SUBTITLE,
+              PP_PLACEHOLDER.VERTICAL_BODY, PP_PLACEHOLDER.VERTICAL_OBJECT)
+# Placeholders python-pptx does not copy from the layout onto new slides.
+FOOTER_TYPES = (PP_PLACEHOLDER.DATE, PP_PLACEHOLDER.FOOTER, PP_PLACEHOLDER.SLIDE_NUMBER)
+
+# A resolved layout: its position in prs.slide_layouts, its name and the idx of the
+# placeholders new slides should use for the title and body text (None if absent).
+LayoutEntry = namedtuple("LayoutEntry", ["index", "name", "title_idx", "body_idx"])
+
+
+class LayoutIndex:
+    """
+    Maps semantic layout roles to a template's slide layouts.
+
+    Built once per template from layout names and placeholder types: layouts are
+    first matched by name, then unmatched roles are assigned by placeholder
+    signature, and roles still missing fall back to related roles. Lookups are
+    then plain dictionary accesses, and each entry carries precomputed
+    placeholder idx values so slides need not be scanned for their body.
+
+    :param layouts: (name, [(idx, type), ...]) pairs in template order.
+    """
+
+    def __init__(self, layouts):
+        self.entries = [_make_entry(index, name, placeholders)
+                        for index, (name, placeholders) in enumerate(layouts)]
+        self._by_name = {}
+        for entry in self.entries:
+            self._by_name.setdefault(_normalise(entry.name), entry)
+        self._by_role = self._assign_roles(layouts)
+
+    @classmethod
+    def from_presentation(cls, presentation):
+        return cls([
+            (layout.name, [(ph.placeholder_format.idx, ph.placeholder_format.type) for ph in layout.placeholders])
+            for layout in presentation.slide_layouts
+        ])
+
+    def resolve(self, layout):
+        """
+        Returns the LayoutEntry for a role name, a legacy integer layout or the
+        name of one of the template's own layouts. Unknown values resolve to "blank".
+        """
+        if isinstance(layout, int):
+            role = DEFAULT_LAYOUT_ROLES[layout] if 0 <= layout < len(DEFAULT_LAYOUT_ROLES) else "blank"
+            return self._by_role[role]
+        entry = self._by_role.get(layout)
+        if entry is None:
+            entry = self._by_name.get(_normalise(str(layout)), self._by_role["blank"])
+        return entry
+
+    def _assign_roles(self, layouts):
+        by_role = {}
+        for role, aliases in ROLE_NAME_ALIASES.items():
+            for alias in aliases:
+                entry = self._by_name.get(alias)
+                if entry is not None:
+                    by_role[role] = entry
+                    break
+        for entry, (_, placeholders) in zip(self.entries, layouts):
+            role = _classify([ph_type for _, ph_type in placeholders])
+            if role is not None and role not in by_role:
+                by_role[role] = entry
+        # Fallbacks may chain, so repeat until no role is newly resolved.
+        changed = True
+        while changed:
+            changed = False
+            for role in DEFAULT_LAYOUT_ROLES:
+                if role in by_role:
+                    continue
+                for fallback in ROLE_FALLBACKS[role]:
+                    if fallback in by_role:
+                        by_role[role] = by_role[fallback]
+                        changed = True
+                        break
+        if self.entries:
+            sparsest = min(self.entries, key=lambda e: (e.title_idx is not None) + (e.body_idx is not None))
+            for role in DEFAULT_LAYOUT_ROLES:
+                by_role.setdefault(role, sparsest)
+        return by_role
+
+
+def _make_entry(index, name, placeholders):
+    title_idx = body_idx = None
+    for idx, ph_type in placeholders:
+        if title_idx is None and ph_type in TITLE_TYPES:
+            title_idx = idx
+        elif body_idx is None and ph_type in BODY_TYPES:
+            body_idx = idx
+    return LayoutEntry(index, name, title_idx, body_idx)
+
+
+def _classify(types):
+    types = [t for t in types if t not in FOOTER_TYPES]
+    objects = sum(t in (PP_PLACEHOLDER.OBJECT, PP_PLACEHOLDER.CHART, PP_PLACEHOLDER.TABLE) for t in types)
+    bodies = types.count(PP_PLACEHOLDER.BODY)
+    has_title = any(t in (PP_PLACEHOLDER.TITLE, PP_PLACEHOLDER.CENTER_TITLE) for t in types)
+    if not types:
+        return "blank"
+    if PP_PLACEHOLDER.VERTICAL_TITLE in types:
+        return "vertical_title_text"
+    if PP_PLACEHOLDER.VERTICAL_BODY in types or PP_PLACEHOLDER.VERTICAL_OBJECT in types:
+        return "title_vertical_text"
+    if PP_PLACEHOLDER.CENTER_TITLE in types or PP_PLACEHOLDER.SUBTITLE in types:
+        return "title"
+    if PP_PLACEHOLDER.PICTURE in types:
+        return "picture_caption"
+    if objects >= 2:
+        return "comparison" if bodies >= 2 else "two_content"
+    if objects == 1:
+        return "content_caption" if bodies else "title_content"
+    if bodies and has_title:
+        return "section_header"
+    if has_title and len(types) == 1:
+        return "title_only"
+    return None
+
+
+def _normalise(name):
+    # PowerPoint names copied layouts "1_Title Slide", "2_Title Slide", ...
+    name = re.sub(r"^\d+_", "", name.strip().lower())
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name).split())
@@ -0,0 +1,287 @@
+import io
+import re
+import copy
+import hashlib
+
+from pptx import Presentation
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import XmlPart
+from pptx.opc.packuri import PackURI
+from pptx.oxml import parse_xml
+from pptx.parts.image import ImagePart
+from pptx.parts.slide import NotesSlidePart, SlidePart
+
+R_NAMESPACE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+def remove_slides(prs):
+    """
+    Removes every slide from a presentation, e.g. a template clone that is about
+    to hold a partial deck. The dropped slide parts are no longer reachable and
+    are not written when the package is saved.
+    """
+    sldIdLst = prs.slides._sldIdLst
+    for sldId in list(sldIdLst):
+        prs.part.drop_rel(sldId.rId)
+        sldIdLst.remove(sldId)
+
+
+class PartSnapshot:
+    """
+    A serialised copy of a package part and the parts it relates to, detached
+    from its presentation so that keeping it does not keep the presentation.
+    Relationships back to the slide and to the notes master are recorded
+    without their target, which DeckMerger resolves in the target deck.
+    """
+
+    __slots__ = ("partname", "content_type", "part_class", "blob", "rels")
+
+    def __init__(self, part, seen):
+        self.partname = part.partname
+        self.content_type = part.content_type
+        self.part_class = type(part)
+        self.blob = part.blob
+        self.rels = _snapshot_rels(part.rels, seen)
+
+    def iter_parts(self, seen):
+        if id(self) in seen:
+            return
+        seen.add(id(self))
+        yield self
+        for rel in self.rels.values():
+            if rel.target_part is not None:
+                yield from rel.target_part.iter_parts(seen)
+
+
+class _RelSnapshot:
+    __slots__ = ("reltype", "is_external", "target_ref", "target_part")
+
+    def __init__(self, reltype, is_external=False, target_ref=None, target_part=None):
+        self.reltype = reltype
+        self.is_external = is_external
+        self.target_ref = target_ref
+        self.target_part = target_part
+
+
+def _snapshot_rels(rels, seen):
+    snapshot = {}
+    for rId, rel in rels.items():
+        if rel.is_external:
+            snapshot[rId] = _RelSnapshot(rel.reltype, True, rel.target_ref)
+        elif rel.reltype in (RT.SLIDE, RT.SLIDE_LAYOUT, RT.NOTES_MASTER):
+            snapshot[rId] = _RelSnapshot(rel.reltype)
+        else:
+            part = rel.target_part
+            if part not in seen:
+                seen[part] = PartSnapshot(part, seen)
+            snapshot[rId] = _RelSnapshot(rel.reltype, target_part=seen[part])
+    return snapshot
+
+
+class SlideSnapshot:
+    """
+    A slide serialised with its notes, images, charts and other related parts,
+    to be appended to decks built from the same template with
+    DeckMerger.append_snapshot. Unlike a python-pptx slide it holds no
+    reference to the presentation it was rendered in.
+
+    :param slide: The python-pptx slide to copy.
+    """
+
+    __slots__ = ("xml", "layout_index", "rels", "size")
+
+    def __init__(self, slide):
+        self.xml = slide.part.blob
+        self.layout_index = slide.part.package.presentation_part.presentation.slide_layouts.index(slide.slide_layout)
+        self.rels = _snapshot_rels(slide.part.rels, {})
+        seen = set()
+        self.size = len(self.xml) + sum(
+            len(part.blob)
+            for rel in self.rels.values() if rel.target_part is not None
+            for part in rel.target_part.iter_parts(seen)
+        )
+
+
+class DeckMerger:
+    """
+    Appends the slides of other decks built from the same template to a target
+    presentation.
+
+    Slide and notes XML is copied as is and every relationship is recreated in
+    the target package: slides point at the target's layout in the same position
+    as their source layout, images and media are shared with identical ones
+    already in the target, charts are copied with their embedded workbooks and
+    external links are kept. Part names are allocated from a single scan of the
+    target package, so merging stays linear in the number of parts.
+
+    :param target: The Presentation receiving the slides.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.package = target.part.package
+        self._layouts = list(target.slide_layouts)
+        self._layout_parts = {}
+        self._partnames = {part.partname for part in self.package.iter_parts()}
+        self._next_numbers = {}
+        self._media = {}
+
+    def append(self, source):
+        """
+        Appends all slides of ``source``, which is left unchanged.
+
+        :return: The number of slides appended.
+        """
+        count = 0
+        for slide in source.slides:
+            self.append_slide(slide)
+            count += 1
+        return count
+
+    def append_slide(self, slide):
+        """
+        Appends a copy of one slide from another presentation, which is left unchanged.
+        """
+        return self._append(copy.deepcopy(slide._element), slide.part.rels,
+                            lambda rel: self._target_layout_part(rel.target_part))
+
+    def append_snapshot(self, snapshot):
+        """
+        Appends a slide from a SlideSnapshot, which can be appended again later.
+        """
+        return self._append(parse_xml(snapshot.xml), snapshot.rels,
+                            lambda rel: self._layouts[snapshot.layout_index].part)
+
+    def _append(self, element, rels, layout_part):
+        slide_part = SlidePart(self._next_partname("/ppt/slides/slide%d.xml"), CT.PML_SLIDE,
+                               self.package, element)
+        # Related first so python-pptx sees the images it names while they are added.
+        slide_rId = self.target.part.relate_to(slide_part, RT.SLIDE)
+        rId_map = {}
+        for rId, rel in rels.items():
+            if rel.reltype == RT.SLIDE_LAYOUT:
+                rId_map[rId] = slide_part.relate_to(layout_part(rel), RT.SLIDE_LAYOUT)
+            elif rel.reltype == RT.NOTES_SLIDE:
+                rId_map[rId] = slide_part.relate_to(self._copy_notes(rel.target_part, slide_part), RT.NOTES_SLIDE)
+            elif rel.is_external:
+                rId_map[rId] = slide_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+            else:
+                rId_map[rId] = slide_part.relate_to(self._copy_part(rel.target_part), rel.reltype)
+        _remap_rIds(slide_part._element, rId_map)
+        self.target.slides._sldIdLst.add_sldId(slide_rId)
+        return slide_part.slide
+
+    def _target_layout_part(self, layout_part):
+        target = self._layout_parts.get(layout_part)
+        if target is None:
+            # Map every layout of the source deck by its position in the template.
+            source_layouts = layout_part.package.presentation_part.presentation.slide_layouts
+            for index, layout in enumerate(source_layouts):
+                self._layout_parts[layout.part] = self._layouts[index].part
+            target = self._layout_parts[layout_part]
+        return target
+
+    def append_package(self, package_bytes):
+        """
+        Appends all slides of a saved deck given as PPTX bytes.
+        """
+        return self.append(Presentation(io.BytesIO(package_bytes)))
+
+    def _copy_notes(self, notes_part, slide_part):
+        new_part = NotesSlidePart(self._next_partname("/ppt/notesSlides/notesSlide%d.xml"),
+                                  notes_part.content_type, self.package, _copy_element(notes_part))
+        rId_map = {}
+        for rId, rel in notes_part.rels.items():
+            if rel.reltype == RT.NOTES_MASTER:
+                target = self.package.presentation_part.notes_master_part
+            elif rel.reltype == RT.SLIDE:
+                target = slide_part
+            elif rel.is_external:
+                rId_map[rId] = new_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+                continue
+            else:
+                target = self._copy_part(rel.target_part)
+            rId_map[rId] = new_part.relate_to(target, rel.reltype)
+        _remap_rIds(new_part._element, rId_map)
+        return new_part
+
+    def _copy_part(self, part):
+        part_class = _part_class(part)
+        is_xml = issubclass(part_class, XmlPart)
+        # Images and media are shared; embedded workbooks and other XML parts stay per chart.
+        shared = issubclass(part_class, ImagePart) or (not is_xml and part.partname.startswith("/ppt/media/"))
+        if shared:
+            key = (part.content_type, hashlib.sha1(part.blob).hexdigest())
+            if key in self._media:
+                return self._media[key]
+            if issubclass(part_class, ImagePart):
+                # Also reuses an identical image already in the target, e.g. from the template.
+                image_part = self.package.get_or_add_image_part(io.BytesIO(part.blob))
+                self._partnames.add(image_part.partname)
+                self._media[key] = image_part
+                return image_part
+
+        new_part = part_class.load(self._next_partname(_partname_template(part.partname)),
+                                   part.content_type, self.package, part.blob)
+        rId_map = {}
+        for rId, rel in part.rels.items():
+            if rel.is_external:
+                rId_map[rId] = new_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+            else:
+                rId_map[rId] = new_part.relate_to(self._copy_part(rel.target_part), rel.reltype)
+        if is_xml:
+            _remap_rIds(new_part._element, rId_map)
+        if shared:
+            self._media[key] = new_part
+        return new_part
+
+    def _next_partname(self, template):
+        number = self._next_numbers.get(template, 1)
+        while template % number in self._partnames:
+            number += 1
+        partname = template % number
+        self._partnames.add(partname)
+        self._next_numbers[template] = number + 1
+        return PackURI(partname)
+
+
+def merge_packages(target, packages):
+    """
+    Appends the slides of several saved partial decks to ``target``, in order.
+
+    :param target: The Presentation receiving the slides.
+    :param packages: Iterable of PPTX bytes built from the same template as target.
+    :return: The number of slides appended.
+    """
+    merger = DeckMerger(target)
+    return sum(merger.append_package(package_bytes) for package_bytes in packages)
+
+
+def _part_class(part):
+    return part.part_class if isinstance(part, PartSnapshot) else type(part)
+
+
+def _copy_element(part):
+    if isinstance(part, PartSnapshot):
+        return parse_xml(part.blob)
+    return copy.deepcopy(part._element)
+
+
+def _partname_template(partname):
+    # "/ppt/charts/chart3.xml" -> "/ppt/charts/chart%d.xml"
+    template = re.sub(r"\d+(\.\w+)$", r"%d\1", partname)
+    if "%d" not in template:
+        base, ext = partname.rsplit(".", 1)
+        template = f"{base}%d.{ext}"
+    return template
+
+
+def _remap_rIds(element, rId_map):
+    if not rId_map:
+        return
+    prefix = "{%s}" % R_NAMESPACE
+    for node in element.iter():
+        for name, value in node.attrib.items():
+            if name.startswith(prefix) and value in rId_map:
+                node.set(name, rId_map[value])
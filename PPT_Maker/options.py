@@ -0,0 +1,29 @@
+"""
+Slide options offered by the apps. Kept free of python-pptx imports so the UI
+can render its widgets before the rendering stack is loaded.
+"""
+
+# Define slide layout options. Values are layout roles, resolved against each
+# template's layouts by name and placeholder types (see PPT_Maker.layout_index).
+layout_options = {
+    "Title Slide (0)": "title",
+    "Title and Content (1)": "title_content",
+    "Section Header (2)": "section_header",
+    "Two Content (3)": "two_content",
+    "Comparison (4)": "comparison",
+    "Title Only (5)": "title_only",
+    "Blank (6)": "blank",
+    "Content with Caption (7)": "content_caption",
+    "Picture with Caption (8)": "picture_caption",
+    "Title and Vertical Text (9)": "title_vertical_text",
+    "Vertical Title and Text (10)": "vertical_title_text"
+}
+
+# Define chart type options. Values are XL_CHART_TYPE member names.
+chart_type_options = {
+    "Column Clustered": "COLUMN_CLUSTERED",
+    "Bar Clustered": "BAR_CLUSTERED",
+    "Line": "LINE",
+    "Pie": "PIE",
+    "Scatter": "XY_SCATTER"
+}
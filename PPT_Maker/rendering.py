@@ -0,0 +1,660 @@
+import io
+import os
+import atexit
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from xml.sax.saxutils import quoteattr
+
+from pptx.util import Inches
+from pptx.dml.color import RGBColor
+
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+
+from llm_service.metrics import span
+from PPT_Maker.charts import DEFAULT_CHART_WORKBOOKS, add_chart
+from PPT_Maker.deck_output import save_presentation
+from PPT_Maker.image_pipeline import DEFAULT_IMAGE_DPI, DEFAULT_IMAGE_WORKERS, prepare_images
+from PPT_Maker.incremental import fingerprint, slide_fingerprint
+from PPT_Maker.merge import DeckMerger, SlideSnapshot, merge_packages, remove_slides
+from PPT_Maker.options import chart_type_options
+from PPT_Maker.template_cache import get_template_cache, read_template_bytes
+
+logger = logging.getLogger(__name__)
+
+# Theme defaults for when no template is uploaded.
+THEME_DEFAULTS = {
+    "Default": {"bg_color": None, "font_color": None},
+    "Dark": {"bg_color": RGBColor(50, 50, 50), "font_color": RGBColor(255, 255, 255)},
+    "Corporate": {"bg_color": RGBColor(240, 240, 240), "font_color": RGBColor(0, 0, 0)},
+    "Creative": {"bg_color": RGBColor(255, 228, 196), "font_color": RGBColor(75, 0, 130)},
+}
+
+# Worker processes rendering sections of large decks in parallel.
+DEFAULT_SECTION_WORKERS = int(os.getenv("SLIDECRAFT_SECTION_WORKERS", str(os.cpu_count() or 1)))
+# Smaller decks render faster in-process than split across workers and merged.
+PARALLEL_MIN_SLIDES = int(os.getenv("SLIDECRAFT_PARALLEL_MIN_SLIDES", "100"))
+
+# Width of each foreground image on a slide.
+FOREGROUND_IMAGE_WIDTH = Inches(3)
+
+
+def _set_background_picture(layout, image_stream):
+    """
+    Sets a stretched picture fill as the background of a slide, or of a slide layout
+    (or master) so every slide based on it shows the picture without a shape of its own.
+    """
+    _, rId = layout.part.get_or_add_image_part(image_stream)
+    cSld = layout._element.cSld
+    cSld._remove_bg()
+    cSld.insert(0, parse_xml(
+        f'<p:bg {nsdecls("p", "a", "r")}><p:bgPr>'
+        f'<a:blipFill dpi="0" rotWithShape="1"><a:blip r:embed="{rId}"/><a:srcRect/>'
+        f'<a:stretch><a:fillRect/></a:stretch></a:blipFill><a:effectLst/>'
+        f'</p:bgPr></p:bg>'
+    ))
+
+
+def _shared_layouts(layout_index):
+    """
+    Returns the indexes of the layouts used by the title and section header slides.
+    """
+    return {layout_index.resolve("title").index, layout_index.resolve("section_header").index}
+
+
+def _image_requests(title_bg_bytes, common_content_bg_bytes, sections_data, slide_width, slide_height):
+    """
+    Lists every image of the deck as (image_bytes, width_emu, height_emu), the box
+    it will be drawn into, so they can all be prepared up front in one batch.
+    """
+    requests = []
+    for background in (title_bg_bytes, common_content_bg_bytes):
+        if background:
+            requests.append((background, slide_width, slide_height))
+    for section in sections_data:
+        if section.get("section_header_bg"):
+            requests.append((section["section_header_bg"], slide_width, slide_height))
+        for slide_data in section["slides"]:
+            image_data = slide_data.get("image", None)
+            if not image_data:
+                continue
+            if slide_data.get("image_type", None) == "foreground" and isinstance(image_data, list):
+                requests.extend((img_bytes, FOREGROUND_IMAGE_WIDTH, None) for img_bytes in image_data)
+            else:
+                if isinstance(image_data, list):
+                    image_data = image_data[0]
+                requests.append((image_data, slide_width, slide_height))
+    return requests
+
+
+def _image_stream(prepared_images, image_bytes, width, height):
+    return io.BytesIO(prepared_images.get((image_bytes, width, height), image_bytes))
+
+
+def _add_section(prs, layout_index, section, prepared_images, theme_name=None, theme_background=False,
+                 chart_workbooks=DEFAULT_CHART_WORKBOOKS, content_background=None, warnings=None, progress=None):
+    """
+    Adds a section header slide and the section's slides to a presentation.
+
+    :param prepared_images: Dict from prepare_images; images missing from it are inserted as given.
+    :param theme_name: Key of THEME_DEFAULTS whose font colour is applied, or None.
+    :param theme_background: Whether slides without a picture get the theme's background colour.
+    :param chart_workbooks: Whether charts embed an Excel workbook of their data.
+    :param content_background: Common content background image bytes, set on each content
+                               slide whose layout the title or section header slides share.
+    :param warnings: Optional list that messages about charts left out are appended to.
+    :param progress: Optional callable called with 1 after each content slide.
+    """
+    _add_section_header(prs, layout_index, section, prepared_images, theme_name, theme_background)
+    for idx, slide_data in enumerate(section["slides"]):
+        _add_content_slide(prs, layout_index, section["section_title"], idx, slide_data,
+                           prepared_images, theme_name, theme_background, chart_workbooks, content_background,
+                           warnings)
+        if progress is not None:
+            progress(1)
+
+
+def _add_section_header(prs, layout_index, section, prepared_images, theme_name=None, theme_background=False):
+    """
+    Adds a section's header slide.
+    """
+    slide_width, slide_height = prs.slide_width, prs.slide_height
+    section_title = section["section_title"]
+    section_header_bg = section.get("section_header_bg", None)
+    
+    # Create section header slide.
+    section_entry = layout_index.resolve("section_header")
+    sec_slide = prs.slides.add_slide(prs.slide_layouts[section_entry.index])
+    if section_entry.title_idx is not None:
+        sec_slide.placeholders[section_entry.title_idx].text = section_title
+    else:
+        txBox = sec_slide.shapes.add_textbox(Inches(1), Inches(1),
+                                             prs.slide_width - Inches(2),
+                                             Inches(1))
+        txBox.text = section_title
+    
+    # Add background for section header if provided.
+    if section_header_bg:
+        with span("render.images"):
+            bg_stream = _image_stream(prepared_images, section_header_bg, slide_width, slide_height)
+            bg = sec_slide.shapes.add_picture(bg_stream, 0, 0,
+                                              width=prs.slide_width,
+                                              height=prs.slide_height)
+            bg._element.getparent().remove(bg._element)
+            sec_slide.shapes._spTree.insert(2, bg._element)
+    elif theme_background:
+        fill = sec_slide.background.fill
+        fill.solid()
+        fill.fore_color.rgb = THEME_DEFAULTS[theme_name]["bg_color"]
+
+
+def _add_content_slide(prs, layout_index, section_title, idx, slide_data, prepared_images,
+                       theme_name=None, theme_background=False, chart_workbooks=DEFAULT_CHART_WORKBOOKS,
+                       content_background=None, warnings=None):
+    """
+    Adds one content slide, the ``idx``-th of its section. A chart whose data
+    cannot be plotted is left out and reported in ``warnings``.
+    """
+    theme = THEME_DEFAULTS[theme_name] if theme_name else None
+    slide_width, slide_height = prs.slide_width, prs.slide_height
+    layout = slide_data.get("layout", "blank")
+    content = slide_data.get("content", "")
+    image_data = slide_data.get("image", None)  # can be a single value or list
+    image_type = slide_data.get("image_type", None)  # "background" or "foreground"
+    chart_type = slide_data.get("chart_type", None)
+    font_size = slide_data.get("font_size", 24)
+    font_type = slide_data.get("font_type", "Calibri")
+    improvement_tips = slide_data.get("improvement_tips", "")
+    
+    entry = layout_index.resolve(layout)
+    new_slide = prs.slides.add_slide(prs.slide_layouts[entry.index])
+    
+    # The common background is on the layout unless title or section header slides use it too.
+    if content_background and entry.index in _shared_layouts(layout_index):
+        with span("render.images"):
+            _set_background_picture(
+                new_slide, _image_stream(prepared_images, content_background, slide_width, slide_height)
+            )
+    
+    # Set a default title for the slide if available.
+    if entry.title_idx is not None:
+        new_slide.placeholders[entry.title_idx].text = f"{section_title} - Slide {idx+1}"
+    
+    # Add text content and apply font settings.
+    if content:
+        if entry.body_idx is not None:
+            placeholder = new_slide.placeholders[entry.body_idx]
+            placeholder.text = content
+            text_frame = placeholder.text_frame
+        else:
+            txBox = new_slide.shapes.add_textbox(Inches(1), Inches(2),
+                                                 prs.slide_width - Inches(2),
+                                                 Inches(2))
+            txBox.text = content
+            text_frame = txBox.text_frame
+        _apply_text_style(text_frame, font_size, font_type, theme["font_color"] if theme else None)
+    
+    # Add images if provided.
+    if image_data:
+        if image_type == "foreground" and isinstance(image_data, list):
+            margin = Inches(0.5)
+            img_width = FOREGROUND_IMAGE_WIDTH
+            x = prs.slide_width - img_width - margin
+            y = prs.slide_height - img_width - margin
+            with span("render.images"):
+                for img_bytes in image_data:
+                    img_stream = _image_stream(prepared_images, img_bytes, img_width, None)
+                    new_slide.shapes.add_picture(img_stream, x, y, width=img_width)
+                    x -= (img_width + Inches(0.2))
+        else:
+            if isinstance(image_data, list):
+                image_data = image_data[0]
+            with span("render.images"):
+                img_stream = _image_stream(prepared_images, image_data, slide_width, slide_height)
+                pic = new_slide.shapes.add_picture(img_stream, 0, 0,
+                                                   width=prs.slide_width,
+                                                   height=prs.slide_height)
+                pic._element.getparent().remove(pic._element)
+                new_slide.shapes._spTree.insert(2, pic._element)
+    elif theme_background:
+        # If no image is provided and no common background, apply theme background.
+        fill = new_slide.background.fill
+        fill.solid()
+        fill.fore_color.rgb = theme["bg_color"]
+    
+    # Add a chart if requested.
+    if chart_type:
+        chart_name = chart_type_options.get(chart_type, None)
+        if chart_name:
+            x, y, cx, cy = Inches(2), Inches(2), Inches(6), Inches(4.5)
+            with span("render.charts"):
+                try:
+                    add_chart(new_slide.shapes, chart_name, x, y, cx, cy, slide_data.get("chart_data"),
+                              chart_x=slide_data.get("chart_x"), series=slide_data.get("chart_series"),
+                              max_points=slide_data.get("chart_max_points"), workbook=chart_workbooks)
+                except (ValueError, KeyError, OSError) as e:
+                    # An unusable upload costs this slide its chart, not the whole deck.
+                    reason = f"no column {e}" if isinstance(e, KeyError) else str(e)
+                    message = f"{section_title} - Slide {idx+1}: chart left out ({reason})"
+                    logger.warning(message)
+                    if warnings is not None:
+                        warnings.append(message)
+    
+    # Add slide notes with improvement tips.
+    try:
+        notes_slide = new_slide.notes_slide
+    except AttributeError:
+        notes_slide = new_slide.notes_slide
+    notes_slide.notes_text_frame.text = improvement_tips
+
+
+def _apply_text_style(text_frame, font_size, font_type, font_color=None):
+    """
+    Sets the font of all text in a text frame once, as the default run
+    properties of its list style, rather than on every run: runs without their
+    own properties inherit them, so long contents stay small and fast to write.
+    Only the first outline level is styled, which is the level of all text set
+    by this module.
+
+    :param font_size: Size in points.
+    :param font_type: Typeface name.
+    :param font_color: RGBColor, or None to keep the inherited colour.
+    """
+    fill = f'<a:solidFill><a:srgbClr val="{font_color}"/></a:solidFill>' if font_color else ""
+    def_rpr = parse_xml(
+        f'<a:defRPr {nsdecls("a")} sz="{int(round(font_size * 100))}">'
+        f'{fill}<a:latin typeface={quoteattr(font_type)}/></a:defRPr>'
+    )
+    txBody = text_frame._txBody
+    lst_style = txBody.find(qn("a:lstStyle"))
+    if lst_style is None:
+        lst_style = parse_xml(f'<a:lstStyle {nsdecls("a")}/>')
+        txBody.bodyPr.addnext(lst_style)
+    level = lst_style.find(qn("a:lvl1pPr"))
+    if level is None:
+        level = parse_xml(f'<a:lvl1pPr {nsdecls("a")}/>')
+        # lvl1pPr follows the optional defPPr.
+        default = lst_style.find(qn("a:defPPr"))
+        if default is not None:
+            default.addnext(level)
+        else:
+            lst_style.insert(0, level)
+    # Keep any paragraph properties of the level; defRPr is its last child but extLst.
+    existing = level.find(qn("a:defRPr"))
+    if existing is not None:
+        level.replace(existing, def_rpr)
+    elif level.find(qn("a:extLst")) is not None:
+        level.find(qn("a:extLst")).addprevious(def_rpr)
+    else:
+        level.append(def_rpr)
+
+
+def _add_sections_cached(prs, template, sections_data, slide_cache, theme_name, theme_background,
+                         image_dpi, image_workers, chart_workbooks=DEFAULT_CHART_WORKBOOKS,
+                         content_background=None, prepared_background=None, warnings=None, progress=None):
+    """
+    Adds the sections' slides, copying unchanged ones from ``slide_cache`` and
+    rendering the rest into a scratch presentation, whose slides are snapshotted
+    into the cache and which is then released. Slides rendered with warnings are
+    not cached, so the warnings are raised again on the next call.
+
+    :param prepared_background: Dict from prepare_images holding ``content_background``.
+    :param progress: Optional callable called with the number of content slides
+                     taken from the cache, then with 1 after each one rendered.
+    """
+    # Everything besides the slide itself that its rendering depends on.
+    context = (template.key, theme_name, theme_background, image_dpi, chart_workbooks, content_background)
+    units = []
+    for section in sections_data:
+        section_title = section["section_title"]
+        units.append((fingerprint(context, "section_header", section_title, section.get("section_header_bg")),
+                      section, None, None))
+        for idx, slide_data in enumerate(section["slides"]):
+            units.append((fingerprint(context, section_title, idx, slide_fingerprint(slide_data)),
+                          section, idx, slide_data))
+
+    # Cached slides are taken up front, as adding the new ones may evict them.
+    snapshots = {}
+    dirty = {}
+    uncached = set()
+    for unit in units:
+        key = unit[0]
+        if key in snapshots or key in dirty:
+            continue
+        snapshot = slide_cache.get(key)
+        if snapshot is not None:
+            snapshots[key] = snapshot
+        else:
+            dirty[key] = unit
+    # Content slides per key; identical slides are rendered once.
+    content_units = {}
+    for key, _, idx, _ in units:
+        if idx is not None:
+            content_units[key] = content_units.get(key, 0) + 1
+    cached = sum(content_units.get(key, 0) for key in snapshots)
+    if progress is not None and cached:
+        progress(cached)
+    if dirty:
+        prepared_images = dict(prepared_background or {})
+        if image_dpi:
+            image_sections = [
+                {"section_header_bg": section.get("section_header_bg"), "slides": []} if idx is None
+                else {"slides": [slide_data]}
+                for _, section, idx, slide_data in dirty.values()
+            ]
+            with span("render.prepare_images"):
+                prepared_images.update(prepare_images(
+                    _image_requests(None, None, image_sections, template.slide_width, template.slide_height),
+                    dpi=image_dpi, max_workers=image_workers
+                ))
+        scratch = template.clone()
+        remove_slides(scratch)
+        for key, section, idx, slide_data in dirty.values():
+            if idx is None:
+                _add_section_header(scratch, template.layout_index, section, prepared_images,
+                                    theme_name, theme_background)
+            else:
+                slide_warnings = []
+                _add_content_slide(scratch, template.layout_index, section["section_title"], idx, slide_data,
+                                   prepared_images, theme_name, theme_background, chart_workbooks,
+                                   content_background, slide_warnings)
+                if slide_warnings:
+                    uncached.add(key)
+                    if warnings is not None:
+                        warnings.extend(slide_warnings)
+                if progress is not None:
+                    progress(content_units[key])
+            snapshots[key] = SlideSnapshot(scratch.slides[len(scratch.slides) - 1])
+        del scratch
+
+    with span("render.merge"):
+        merger = DeckMerger(prs)
+        for key, _, _, _ in units:
+            merger.append_snapshot(snapshots[key])
+    slide_cache.retain(snapshots)
+    for key, snapshot in snapshots.items():
+        if key not in uncached:
+            slide_cache.set(key, snapshot)
+
+
+def _render_section_package(template_bytes, sections, theme_name, theme_background, image_dpi,
+                            chart_workbooks=DEFAULT_CHART_WORKBOOKS, content_background=None):
+    """
+    Renders sections into a partial deck holding only their slides. Runs in a
+    worker process; the template is read once per worker and then cloned.
+
+    :return: (the partial deck as PPTX bytes, list of warnings).
+    """
+    template = get_template_cache().get(template_bytes)
+    prs = template.clone()
+    remove_slides(prs)
+    prepared_images = {}
+    if image_dpi:
+        prepared_images = prepare_images(
+            _image_requests(None, content_background, sections, template.slide_width, template.slide_height),
+            dpi=image_dpi, max_workers=1
+        )
+    warnings = []
+    for section in sections:
+        _add_section(prs, template.layout_index, section, prepared_images, theme_name, theme_background,
+                     chart_workbooks, content_background, warnings)
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue(), warnings
+
+
+def _partition_sections(sections_data, parts):
+    """
+    Splits sections into at most ``parts`` contiguous groups of similar slide counts.
+    """
+    total = sum(len(section["slides"]) + 1 for section in sections_data)
+    target = total / parts
+    groups, current, count = [], [], 0
+    for section in sections_data:
+        current.append(section)
+        count += len(section["slides"]) + 1
+        if count >= target * (len(groups) + 1) and len(groups) < parts - 1:
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _render_sections_parallel(template_bytes, sections_data, theme_name, theme_background, image_dpi, max_workers,
+                              chart_workbooks=DEFAULT_CHART_WORKBOOKS, content_background=None, warnings=None,
+                              progress=None):
+    """
+    Renders groups of sections into partial decks across the section worker pool.
+
+    :param warnings: Optional list the workers' warnings are appended to.
+    :param progress: Optional callable called with the number of content slides
+                     of each group once it is rendered.
+    :return: The partial decks as PPTX bytes, in section order.
+    """
+    # A few groups per worker keeps the pool busy when sections differ in cost.
+    groups = _partition_sections(sections_data, max_workers * 2)
+    executor = _get_section_executor(max_workers)
+    futures = [
+        executor.submit(_render_section_package, template_bytes, group, theme_name, theme_background, image_dpi,
+                        chart_workbooks, content_background)
+        for group in groups
+    ]
+    if progress is not None:
+        group_slides = {future: sum(len(section["slides"]) for section in group)
+                        for group, future in zip(groups, futures)}
+        for future in as_completed(futures):
+            progress(group_slides[future])
+    packages = []
+    for future in futures:
+        package, group_warnings = future.result()
+        packages.append(package)
+        if warnings is not None:
+            warnings.extend(group_warnings)
+    return packages
+
+
+_section_executor = None
+_section_executor_workers = 0
+_section_executor_lock = threading.Lock()
+
+
+def _get_section_executor(max_workers):
+    # One pool per process, grown to the largest size asked for so far. A pool
+    # being replaced still finishes the sections already submitted to it.
+    global _section_executor, _section_executor_workers
+    with _section_executor_lock:
+        if _section_executor is None or max_workers > _section_executor_workers:
+            if _section_executor is not None:
+                _section_executor.shutdown(wait=False)
+            _section_executor = ProcessPoolExecutor(max_workers=max_workers)
+            _section_executor_workers = max_workers
+        return _section_executor
+
+
+def shutdown_section_executor():
+    """
+    Stops the section worker processes. A later parallel render starts them again.
+    """
+    global _section_executor, _section_executor_workers
+    with _section_executor_lock:
+        executor, _section_executor, _section_executor_workers = _section_executor, None, 0
+    if executor is not None:
+        executor.shutdown()
+
+
+atexit.register(shutdown_section_executor)
+
+
+def create_presentation(presentation_title, description, author,
+                        title_bg_bytes, common_content_bg_bytes, sections_data,
+                        template_file=None, theme_choice=None,
+                        image_dpi=DEFAULT_IMAGE_DPI, image_workers=DEFAULT_IMAGE_WORKERS,
+                        output=None, section_workers=DEFAULT_SECTION_WORKERS, slide_cache=None,
+                        chart_workbooks=DEFAULT_CHART_WORKBOOKS, warnings=None, progress_callback=None):
+    """
+    Builds a presentation from the sections_data structure collected by the apps.
+    This is plain python-pptx and does not depend on Streamlit, so it can be used
+    from scripts, the CLI or worker processes.
+    
+    :param presentation_title: Title of the main title slide.
+    :param description: Description shown on the title slide.
+    :param author: Author shown on the title slide.
+    :param title_bg_bytes: Optional background image bytes for the title slide.
+    :param common_content_bg_bytes: Optional background image bytes for all content slides.
+    :param sections_data: List of section dicts, each with "section_title",
+                          "section_header_bg" and a list of slide dicts under "slides".
+                          A slide's "layout" is a role from layout_options, a legacy
+                          integer index or the name of one of the template's layouts.
+    :param template_file: Optional PPTX template (path or file-like object).
+    :param theme_choice: Optional key of THEME_DEFAULTS, applied only without a template.
+    :param image_dpi: Resolution images are downsampled to for their box on the slide;
+                      None inserts images unchanged.
+    :param image_workers: Worker processes used to prepare images.
+    :param output: Optional path or writable file object the deck is saved to.
+    :param section_workers: Worker processes rendering sections in parallel, in a pool shared
+                            by every caller and sized for the largest request. Decks with
+                            fewer than PARALLEL_MIN_SLIDES slides, or a single section,
+                            are rendered in this process.
+    :param slide_cache: Optional RenderedSlideCache (see PPT_Maker.incremental). Slides
+                        whose fingerprint is unchanged since an earlier call are copied
+                        from it and only new or edited slides are rendered, in this process.
+                        It is not used for decks rendered in parallel, which are large
+                        enough for the section workers to be faster.
+    :param chart_workbooks: Whether charts embed an Excel workbook of their data, which
+                            makes it editable in PowerPoint. Without, decks are smaller and
+                            faster to build (see SLIDECRAFT_CHART_WORKBOOKS).
+    :param warnings: Optional list that a message is appended to for each chart left
+                     out because its data could not be read or plotted; the rest of
+                     the deck is still built.
+    :param progress_callback: Optional callable called with (done, total) content
+                              slides as they are rendered: after each slide, or after
+                              each group of sections when rendering in parallel.
+    :return: The output when given; otherwise a spooled temporary file holding the
+             PPTX, kept in memory while small and moved to disk when large.
+    """
+    total_slides = sum(len(section["slides"]) for section in sections_data)
+    parallel = section_workers > 1 and len(sections_data) > 1 and total_slides >= PARALLEL_MIN_SLIDES
+    if parallel:
+        slide_cache = None
+    progress = None
+    if progress_callback is not None:
+        done = [0]
+
+        def progress(amount):
+            done[0] += amount
+            progress_callback(done[0], total_slides)
+    if parallel and template_file is not None:
+        # Workers receive the template as bytes, so read an upload or path only once.
+        template_file = read_template_bytes(template_file)
+    
+    # Use the uploaded template if provided; otherwise create a blank presentation.
+    # Both are opened from a cached, uncompressed copy of the package with its layouts already indexed.
+    with span("render.template"):
+        template = get_template_cache().get(template_file)
+        prs = template.clone()
+    layout_index = template.layout_index
+    slide_width, slide_height = prs.slide_width, prs.slide_height
+    
+    # Downsample and recompress every image before it is inserted. Section workers
+    # and the slide cache path prepare the images of the slides they render.
+    prepared_images = {}
+    if image_dpi:
+        with span("render.prepare_images"):
+            prepared_images = prepare_images(
+                _image_requests(title_bg_bytes, common_content_bg_bytes,
+                                sections_data if slide_cache is None and not parallel else [],
+                                slide_width, slide_height),
+                dpi=image_dpi, max_workers=image_workers
+            )
+    
+    # Theme colors only apply to the built-in blank presentation.
+    use_theme = (not template_file) and theme_choice and theme_choice != "Default"
+    theme_name = theme_choice if use_theme else None
+    theme_background = bool(use_theme) and not common_content_bg_bytes
+    
+    # ----------------------------
+    # Create Main Title Slide
+    # ----------------------------
+    title_entry = layout_index.resolve("title")
+    slide = prs.slides.add_slide(prs.slide_layouts[title_entry.index])
+    
+    if title_bg_bytes:
+        with span("render.images"):
+            bg_stream = _image_stream(prepared_images, title_bg_bytes, slide_width, slide_height)
+            bg = slide.shapes.add_picture(bg_stream, 0, 0,
+                                          width=prs.slide_width,
+                                          height=prs.slide_height)
+            # Move image behind other shapes.
+            bg._element.getparent().remove(bg._element)
+            slide.shapes._spTree.insert(2, bg._element)
+    elif theme_background:
+        # Apply theme background to title slide if no background image is provided.
+        fill = slide.background.fill
+        fill.solid()
+        fill.fore_color.rgb = THEME_DEFAULTS[theme_name]["bg_color"]
+    
+    if title_entry.title_idx is not None:
+        slide.placeholders[title_entry.title_idx].text = presentation_title
+    if title_entry.body_idx is not None:
+        slide.placeholders[title_entry.body_idx].text = f"{description}\n\nAuthor: {author}"
+    else:
+        txBox = slide.shapes.add_textbox(Inches(1), Inches(2),
+                                         prs.slide_width - Inches(2),
+                                         Inches(1))
+        txBox.text = f"{description}\n\nAuthor: {author}"
+    
+    # ----------------------------
+    # Common Content Background
+    # ----------------------------
+    # Applied once as the background of each layout used only by content slides:
+    # the deck carries a single image part and the slides need no picture shapes.
+    # Content slides on a layout the title or section header slides also use get
+    # the same picture as their own background instead.
+    content_background = None
+    if common_content_bg_bytes:
+        content_layouts = {
+            layout_index.resolve(slide_data.get("layout", "blank")).index
+            for section in sections_data
+            for slide_data in section["slides"]
+        }
+        shared_layouts = _shared_layouts(layout_index)
+        if content_layouts & shared_layouts:
+            content_background = common_content_bg_bytes
+        with span("render.images"):
+            for index in sorted(content_layouts - shared_layouts):
+                _set_background_picture(
+                    prs.slide_layouts[index],
+                    _image_stream(prepared_images, common_content_bg_bytes, slide_width, slide_height)
+                )
+    
+    # ----------------------------
+    # Process Each Section
+    # ----------------------------
+    # Stages inside worker processes are recorded there, so the parallel path
+    # reports rendering and merging as a whole.
+    if slide_cache is not None:
+        with span("render.sections", path="incremental"):
+            _add_sections_cached(prs, template, sections_data, slide_cache, theme_name, theme_background,
+                                 image_dpi, image_workers, chart_workbooks, content_background, prepared_images,
+                                 warnings, progress)
+    elif parallel:
+        # Sections are rendered into partial decks by worker processes and their
+        # slides appended to this one in order.
+        with span("render.sections", path="parallel"):
+            packages = _render_sections_parallel(
+                template_file, sections_data, theme_name, theme_background, image_dpi, section_workers,
+                chart_workbooks, content_background, warnings, progress
+            )
+        with span("render.merge"):
+            merge_packages(prs, packages)
+    else:
+        with span("render.sections", path="serial"):
+            for section in sections_data:
+                _add_section(prs, layout_index, section, prepared_images, theme_name, theme_background,
+                             chart_workbooks, content_background, warnings, progress)
+    
+    with span("render.save"):
+        return save_presentation(prs, output)
+
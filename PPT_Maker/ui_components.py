@@ -0,0 +1,223 @@
+import os
+import time
+
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+from llm_service.clients import get_registry
+from llm_service.llm_generator import warm_provider_connections
+from PPT_Maker.deck_output import read_deck
+from PPT_Maker.image_pipeline import EMU_PER_INCH, prepare_image
+from PPT_Maker.jobs import CANCELLED, DONE, generate_deck, get_job_manager
+from PPT_Maker.template_cache import get_template_cache
+
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+# Image previews are downscaled to this width (pixels at 96 DPI) before display.
+PREVIEW_MAX_WIDTH = 1200
+PREVIEW_DPI = 96
+
+# Session state key holding the path of the last generated deck.
+LAST_DECK_KEY = "last_deck"
+
+# Session state key holding the metrics summary of the last Generate click.
+LAST_RUN_KEY = "last_run_metrics"
+
+# Session state key holding the ID of the session's generation job until it is collected.
+JOB_KEY = "generation_job"
+
+# Seconds between progress refreshes while a generation job runs.
+JOB_POLL_SECONDS = float(os.getenv("SLIDECRAFT_JOB_POLL_SECONDS", "0.5"))
+
+
+@st.cache_resource(show_spinner=False)
+def get_llm_clients():
+    """
+    Returns the process-wide pooled provider clients, warming the connections
+    only on the first run of any session rather than on every rerun.
+    """
+    warm_provider_connections(["openai"])
+    return get_registry()
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def load_template(template_bytes):
+    """
+    Returns the parsed template (a CachedTemplate) for uploaded template bytes,
+    shared by every session and rerun. Calling it when a template is uploaded
+    moves the parse out of the Generate click.
+    """
+    return get_template_cache().get(template_bytes)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def image_preview(image_bytes):
+    """
+    Returns a downscaled copy of an uploaded image for st.image, so reruns do not
+    decode and re-encode full-size uploads.
+    """
+    return prepare_image(image_bytes, PREVIEW_MAX_WIDTH * EMU_PER_INCH // PREVIEW_DPI, dpi=PREVIEW_DPI)
+
+
+def deck_download_button(deck_path, label="Download PPT", file_name="advanced_generated_presentation.pptx"):
+    """
+    Offers a deck saved on disk for download. Where Streamlit supports deferred
+    downloads, the file is only read when the button is clicked, so the deck is
+    not held in server memory between reruns.
+    """
+    try:
+        return st.download_button(label=label, data=lambda: read_deck(deck_path),
+                                  file_name=file_name, mime=PPTX_MIME)
+    except StreamlitAPIException:
+        # Older Streamlit versions only accept the data itself.
+        with open(deck_path, "rb") as deck_file:
+            return st.download_button(label=label, data=deck_file, file_name=file_name, mime=PPTX_MIME)
+
+
+def remember_deck(deck_path):
+    """
+    Keeps the latest deck in session state so its download button survives
+    reruns, including the one triggered by clicking it. The previous deck's file
+    is deleted.
+    """
+    previous = st.session_state.get(LAST_DECK_KEY)
+    if previous and previous != deck_path:
+        try:
+            os.remove(previous)
+        except OSError:
+            # Already removed by the age-based cleanup.
+            pass
+    st.session_state[LAST_DECK_KEY] = deck_path
+
+
+def last_deck_download_button(**kwargs):
+    """
+    Shows the download button for the last generated deck, if it is still on disk.
+    """
+    deck_path = st.session_state.get(LAST_DECK_KEY)
+    if deck_path and os.path.exists(deck_path):
+        return deck_download_button(deck_path, **kwargs)
+    return None
+
+
+def submit_generation(*args, **kwargs):
+    """
+    Starts generate_deck (see PPT_Maker.jobs) as a background job for this
+    session, so the script is not blocked and reruns do not interrupt it.
+    """
+    job = get_job_manager().submit(generate_deck, *args, **kwargs)
+    st.session_state[JOB_KEY] = job.id
+    return job
+
+
+def active_job():
+    """
+    Returns this session's generation job while it is queued or running, else None.
+    """
+    job_id = st.session_state.get(JOB_KEY)
+    job = get_job_manager().get(job_id) if job_id else None
+    return job if job is not None and not job.finished else None
+
+
+def generation_job_status():
+    """
+    Shows the live progress of this session's generation job, refreshed every
+    JOB_POLL_SECONDS. Once the job has finished, its deck and metrics are kept
+    for last_deck_download_button and run_metrics_sidebar.
+    """
+    job_id = st.session_state.get(JOB_KEY)
+    if job_id is None:
+        return
+    job = get_job_manager().get(job_id)
+    if job is None:
+        # Expired, or the server restarted.
+        del st.session_state[JOB_KEY]
+        return
+    if job.finished:
+        _collect_job(job)
+    elif _job_progress_fragment is not None:
+        _job_progress_fragment(job_id)
+    else:
+        # Streamlit versions without fragments rerun the whole script instead.
+        _show_job_progress(job)
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
+
+
+def _job_progress(job_id):
+    job = get_job_manager().get(job_id)
+    if job is None or job.finished:
+        # The full rerun collects the deck and shows its download button.
+        st.rerun()
+    _show_job_progress(job)
+
+
+_job_progress_fragment = st.fragment(run_every=JOB_POLL_SECONDS)(_job_progress) if hasattr(st, "fragment") else None
+
+
+def _show_job_progress(job):
+    state = job.snapshot()
+    st.markdown(f"**Generating presentation...** ({state['elapsed_seconds']:.0f}s)")
+    for index, stage in enumerate(state["stages"]):
+        current = index == len(state["stages"]) - 1
+        total = stage["total"]
+        text = f"{stage['label']}... ({stage['done']}/{total})"
+        st.progress(stage["done"] / total if total else 1.0, text=text)
+        if stage["items"]:
+            with st.expander(stage["label"], expanded=current):
+                for label, item_text in stage["items"]:
+                    st.caption(label)
+                    st.markdown(item_text)
+    for warning in state["warnings"]:
+        st.warning(warning)
+    st.button("Cancel", key="cancel_generation", on_click=job.cancel, disabled=job.cancelled)
+
+
+def _collect_job(job):
+    state = job.snapshot()
+    del st.session_state[JOB_KEY]
+    get_job_manager().discard(job.id)
+    if job.run_summary is not None:
+        st.session_state[LAST_RUN_KEY] = job.run_summary
+    for warning in state["warnings"]:
+        st.error(warning)
+    if state["status"] == DONE:
+        remember_deck(state["deck_path"])
+        st.success("Presentation generated successfully!")
+    elif state["status"] == CANCELLED:
+        st.info("Generation cancelled.")
+    else:
+        st.error(f"Generation failed: {state['error']}")
+
+
+def run_metrics_sidebar():
+    """
+    Shows, when enabled in the sidebar, where the time of the last Generate
+    click went: each stage's calls and seconds, and the tokens used.
+    """
+    if not st.sidebar.checkbox("Show timing breakdown", key="show_run_metrics"):
+        return
+    summary = st.session_state.get(LAST_RUN_KEY)
+    if summary is None:
+        st.sidebar.caption("Generate a presentation to see its timing breakdown.")
+        return
+    wall = summary["wall_seconds"]
+    st.sidebar.subheader(f"Last run: {wall:.2f}s")
+    rows = []
+    for stage in summary["stages"]:
+        labels = ", ".join(stage["labels"].values())
+        rows.append({
+            "Stage": f"{stage['stage']} ({labels})" if labels else stage["stage"],
+            "Calls": stage["count"],
+            "Seconds": round(stage["seconds"], 3),
+            "Share": f"{stage['seconds'] / wall:.0%}" if wall else "",
+        })
+    st.sidebar.dataframe(rows, hide_index=True)
+    tokens = [counter for counter in summary["counters"] if counter["name"] == "llm.tokens"]
+    if tokens:
+        st.sidebar.caption(" · ".join(
+            f"{counter['labels']['model']} {counter['labels']['type']}: {counter['value']} tokens"
+            for counter in tokens
+        ))
+    st.sidebar.caption("Nested stages are included in their parent, and concurrent LLM calls "
+                       "can add up to more than the wall time.")
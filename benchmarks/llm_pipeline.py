@@ -0,0 +1,152 @@
+"""
+Network-free benchmark of the LLM generation pipeline.
+
+    python benchmarks/llm_pipeline.py
+    python benchmarks/llm_pipeline.py --latency lognormal:0.8,0.5 --error-rate 0.1 --concurrency 1 4 16
+    python benchmarks/llm_pipeline.py --provider replay --cassette recorded.jsonl
+
+Calls go through the real entry points (generate_llm_responses_batch,
+stream_llm_responses_batch, generate_improvement_tips_batch and, for the
+'async' scenario, agenerate_llm_responses_batch on one event loop) with the
+'mock' or 'replay' provider from llm_service.mock, so concurrency, rate
+limiting, retries and the response cache all behave as they do against a live
+endpoint. Each scenario runs once per concurrency level from a cold in-memory
+cache, then once more warm to measure cache hits.
+
+Record a cassette from live traffic by running the apps with
+SLIDECRAFT_LLM_RECORD=recorded.jsonl, then replay it here.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import llm_service.async_generator as async_generator
+import llm_service.cache as llm_cache
+from llm_service.cache import LLMResponseCache
+from llm_service.improvement_tips import generate_improvement_tips_batch
+from llm_service.llm_generator import (
+    generate_llm_responses_batch,
+    is_error_response,
+    stream_llm_responses_batch,
+)
+from llm_service.mock import LatencyModel, configure_mock_provider
+from llm_service.scheduler import configure_scheduler
+
+SCENARIOS = ("rewrite", "stream", "tips", "async")
+
+
+def make_prompts(count):
+    return [f"Rewrite the content of slide {index + 1} to be clearer:\n"
+            f"Revenue grew {index + 3}% year on year, driven by the new subscription tier."
+            for index in range(count)]
+
+
+def run_scenario(scenario, provider, prompts, concurrency):
+    """
+    Runs one scenario and returns (wall seconds, per-item seconds, error count).
+    """
+    start = time.perf_counter()
+    finished = {}
+    if scenario == "rewrite":
+        def _progress(completed, total):
+            finished[completed] = time.perf_counter() - start
+        results = generate_llm_responses_batch(prompts, provider=provider, max_concurrency=concurrency,
+                                               progress_callback=_progress)
+    elif scenario == "stream":
+        parts = {}
+        for index, chunk in stream_llm_responses_batch(prompts, provider=provider, max_concurrency=concurrency):
+            if chunk is None:
+                finished[index] = time.perf_counter() - start
+            else:
+                parts.setdefault(index, []).append(chunk)
+        results = ["".join(parts.get(index, [])) for index in range(len(prompts))]
+    elif scenario == "async":
+        def _progress(completed, total):
+            finished[completed] = time.perf_counter() - start
+        results = asyncio.run(async_generator.agenerate_llm_responses_batch(
+            prompts, provider=provider, max_concurrency=concurrency, progress_callback=_progress))
+    else:
+        results = generate_improvement_tips_batch(prompts, provider=provider, max_concurrency=concurrency)
+    wall = time.perf_counter() - start
+    errors = sum(1 for result in results if not result or is_error_response(result))
+    return wall, sorted(finished.values()), errors
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Network-free benchmark of the LLM generation pipeline.")
+    parser.add_argument("--provider", choices=("mock", "replay"), default="mock")
+    parser.add_argument("--cassette", help="Cassette to serve responses from (required for replay).")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--prompts", type=int, default=24, help="Prompts per scenario (default: 24).")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8])
+    parser.add_argument("--latency", default="lognormal:0.3,0.4",
+                        help="Latency distribution of a call (default: lognormal:0.3,0.4).")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute limit (default: none).")
+    parser.add_argument("--backoff-base", type=float, default=0.1, help="Retry backoff base in seconds.")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", dest="json_path", help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    prompts = make_prompts(args.prompts)
+    results = []
+    for scenario in args.scenarios:
+        for concurrency in args.concurrency:
+            # Simulated responses skip the response cache unless asked to, as in the apps.
+            mock = configure_mock_provider(args.provider, cassette=args.cassette,
+                                           latency=LatencyModel.parse(args.latency, args.latency_scale),
+                                           error_rate=args.error_rate, seed=args.seed, cache_responses=True)
+            configure_scheduler(args.provider, requests_per_minute=args.rpm, base_delay=args.backoff_base)
+            llm_cache._cache = LLMResponseCache(":memory:")
+
+            wall, finished, errors = run_scenario(scenario, args.provider, prompts, concurrency)
+            attempts = mock.stats()
+            warm_wall, _, _ = run_scenario(scenario, args.provider, prompts, concurrency)
+            cache_stats = llm_cache._cache.stats()
+
+            result = {
+                "scenario": scenario,
+                "concurrency": concurrency,
+                "prompts": len(prompts),
+                "wall_seconds": wall,
+                "throughput_per_second": len(prompts) / wall if wall else None,
+                "p50_completion_seconds": percentile(finished, 0.5),
+                "p95_completion_seconds": percentile(finished, 0.95),
+                "errors": errors,
+                "attempts": attempts["calls"],
+                "simulated_failures": attempts["failures"],
+                "warm_wall_seconds": warm_wall,
+                "cache_hits": cache_stats["hits"],
+            }
+            results.append(result)
+            # The tips batch reports no per-item progress.
+            p95 = "     -" if not finished else f"{result['p95_completion_seconds']:5.2f}s"
+            print(f"{scenario:<8} x{concurrency:<3} {wall:7.2f}s  {result['throughput_per_second']:6.1f}/s  "
+                  f"p95 {p95}  attempts {attempts['calls']:4d}  "
+                  f"failed {attempts['failures']:3d}  errors {errors:3d}  warm {warm_wall:6.3f}s")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump({"provider": args.provider, "latency": args.latency, "error_rate": args.error_rate,
+                       "median_wall_seconds": statistics.median(r["wall_seconds"] for r in results),
+                       "results": results}, json_file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
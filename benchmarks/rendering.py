@@ -0,0 +1,311 @@
+"""
+Offline benchmark of create_presentation across deck shapes.
+
+    python benchmarks/rendering.py
+    python benchmarks/rendering.py --quick --json after.json --compare before.json
+
+Decks are generated from synthetic sections_data over a grid of sections x
+slides per section and five deck kinds:
+
+- text: a title and five bullet lines per slide
+- image: background and foreground photos on every slide
+- chart: one chart of sample data per slide, cycling through the chart types
+- data: like chart, plotting a CSV of ``--chart-rows`` rows (downsampled to
+  SLIDECRAFT_CHART_MAX_POINTS points)
+- template: text slides on an uploaded template with a picture on its master
+
+For each case, wall time is the median of ``--repeat`` runs. Peak memory is
+taken from one extra run under tracemalloc, so tracing does not skew the
+timings. Output size is the length of the saved PPTX. The template,
+prepared-image and chart part caches are cleared before every run, so each run
+measures the full rendering path; identical charts within a deck still share
+their generated parts. No LLM is called.
+
+Chart decks also report the time per chart (the 'render.charts' stage of the
+median run) and the compressed size per chart of the chart parts and their
+embedded workbooks. Compare ``--no-chart-cache`` (every chart generated anew)
+and ``--no-chart-workbooks`` (lightweight charts) against the defaults. Stage
+times are only collected in this process, i.e. with ``--section-workers 1``.
+
+With ``--compare`` every case is checked against an earlier JSON result, and
+the exit status is 1 if any median is more than ``--threshold`` slower.
+"""
+import io
+import os
+import sys
+import json
+import math
+import time
+import random
+import zipfile
+import argparse
+import platform
+import statistics
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from PIL import Image
+
+from llm_service.metrics import get_metrics
+from PPT_Maker.charts import get_chart_cache
+from PPT_Maker.image_pipeline import get_image_cache
+from PPT_Maker.options import chart_type_options
+from PPT_Maker.rendering import _set_background_picture, create_presentation
+from PPT_Maker.template_cache import get_template_cache
+
+KINDS = ("text", "image", "chart", "data", "template")
+GRID_SECTIONS = (1, 4, 16)
+GRID_SLIDES = (5, 25)
+QUICK_SECTIONS = (1, 4)
+QUICK_SLIDES = (5,)
+
+IMAGE_POOL_SIZE = 8
+IMAGE_SIZE = (2400, 1600)
+
+CHART_ROWS = 10000
+
+
+def make_image(seed, size=IMAGE_SIZE):
+    """
+    Returns deterministic photo-like JPEG bytes: smooth random colour fields
+    upscaled from a tiny random image.
+    """
+    rng = random.Random(seed)
+    small = Image.frombytes("RGB", (24, 16), bytes(rng.randrange(256) for _ in range(24 * 16 * 3)))
+    output = io.BytesIO()
+    small.resize(size, Image.BICUBIC).save(output, format="JPEG", quality=92)
+    return output.getvalue()
+
+
+def make_template():
+    """
+    Returns PPTX bytes of a template whose slide master has a picture background.
+    """
+    from pptx import Presentation
+
+    prs = Presentation()
+    _set_background_picture(prs.slide_master, io.BytesIO(make_image(1000, (1600, 1200))))
+    output = io.BytesIO()
+    prs.save(output)
+    return output.getvalue()
+
+
+def make_chart_csv(rows):
+    """
+    Returns CSV bytes of a daily time series with two noisy seasonal columns.
+    """
+    rng = random.Random(rows)
+    lines = ["date,revenue,cost"]
+    for row in range(rows):
+        day = time.strftime("%Y-%m-%d", time.gmtime(row * 86400))
+        lines.append(f"{day},{100 + 20 * math.sin(row / 30) + rng.gauss(0, 5):.3f},"
+                     f"{80 + 10 * math.cos(row / 45) + rng.gauss(0, 3):.3f}")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def make_sections(kind, sections, slides_per_section, images, chart_csv=None):
+    """
+    Builds the sections_data of one deck.
+    """
+    chart_types = list(chart_type_options)
+    sections_data = []
+    for s in range(sections):
+        slides = []
+        for i in range(slides_per_section):
+            n = s * slides_per_section + i
+            slide = {
+                "layout": "title_content",
+                "content": "\n".join(f"Point {j + 1} of slide {n + 1}: revenue grew {n + j}% year on year"
+                                     for j in range(5)),
+                "font_size": 20,
+                "font_type": "Calibri",
+                "improvement_tips": f"Tighten the wording of slide {n + 1}.",
+            }
+            if kind == "image":
+                if n % 2:
+                    slide.update(layout="blank", image=images[n % len(images)], image_type="background")
+                else:
+                    slide.update(image=[images[n % len(images)], images[(n + 1) % len(images)]],
+                                 image_type="foreground")
+            elif kind in ("chart", "data"):
+                slide.update(layout="title_only", chart_type=chart_types[n % len(chart_types)])
+                if kind == "data":
+                    slide["chart_data"] = chart_csv
+            slides.append(slide)
+        sections_data.append({"section_title": f"Section {s + 1}", "section_header_bg": None, "slides": slides})
+    return sections_data
+
+
+def render(case, image_workers=1, section_workers=1, chart_workbooks=True):
+    """
+    Renders one case from cold caches and returns the saved deck.
+    """
+    get_template_cache().clear()
+    get_image_cache().clear()
+    get_chart_cache().clear()
+    output = io.BytesIO()
+    create_presentation("Benchmark deck", "Generated offline", "benchmarks/rendering.py",
+                        None, None, case["sections_data"], template_file=case["template"],
+                        image_workers=image_workers, section_workers=section_workers, output=output,
+                        chart_workbooks=chart_workbooks)
+    return output.getvalue()
+
+
+def chart_stage_seconds():
+    """
+    Returns the seconds spent in the 'render.charts' stage since the last metrics reset.
+    """
+    return sum(stage["seconds"] for stage in get_metrics().snapshot()["stages"]
+               if stage["stage"] == "render.charts")
+
+
+def chart_part_bytes(deck):
+    """
+    Returns the compressed size of a deck's chart parts and embedded workbooks.
+    """
+    with zipfile.ZipFile(io.BytesIO(deck)) as archive:
+        return sum(info.compress_size for info in archive.infolist()
+                   if info.filename.startswith(("ppt/charts/", "ppt/embeddings/")))
+
+
+def run_case(case, repeat, image_workers=1, section_workers=1, chart_workbooks=True):
+    wall_times = []
+    chart_times = []
+    deck = b""
+    for _ in range(repeat):
+        get_metrics().reset()
+        start = time.perf_counter()
+        deck = render(case, image_workers, section_workers, chart_workbooks)
+        wall_times.append(time.perf_counter() - start)
+        chart_times.append(chart_stage_seconds())
+
+    tracemalloc.start()
+    try:
+        render(case, image_workers, section_workers, chart_workbooks)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    charts = sum(1 for section in case["sections_data"] for slide in section["slides"] if slide.get("chart_type"))
+    return {
+        "case": case["name"],
+        "kind": case["kind"],
+        "sections": case["sections"],
+        "slides_per_section": case["slides_per_section"],
+        "slides": case["sections"] * (case["slides_per_section"] + 1) + 1,
+        "wall_seconds": wall_times,
+        "median_seconds": statistics.median(wall_times),
+        "peak_bytes": peak,
+        "output_bytes": len(deck),
+        "charts": charts,
+        "chart_seconds_per_chart": statistics.median(chart_times) / charts if charts else None,
+        "chart_bytes_per_chart": chart_part_bytes(deck) / charts if charts else None,
+    }
+
+
+def build_cases(kinds, sections_grid, slides_grid, chart_rows=CHART_ROWS):
+    images = [make_image(seed) for seed in range(IMAGE_POOL_SIZE)]
+    template = make_template() if "template" in kinds else None
+    chart_csv = make_chart_csv(chart_rows) if "data" in kinds else None
+    cases = []
+    for kind in kinds:
+        for sections in sections_grid:
+            for slides_per_section in slides_grid:
+                cases.append({
+                    "name": f"{kind}-{sections}x{slides_per_section}",
+                    "kind": kind,
+                    "sections": sections,
+                    "slides_per_section": slides_per_section,
+                    "sections_data": make_sections(kind, sections, slides_per_section, images, chart_csv),
+                    "template": template if kind == "template" else None,
+                })
+    return cases
+
+
+def compare(results, baseline_path, threshold):
+    """
+    Prints each case's median against a baseline run and returns the names of
+    cases more than ``threshold`` (a fraction) slower.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as baseline_file:
+        baseline = {result["case"]: result for result in json.load(baseline_file)["results"]}
+    regressions = []
+    for result in results:
+        before = baseline.get(result["case"])
+        if before is None:
+            continue
+        ratio = result["median_seconds"] / before["median_seconds"]
+        memory_ratio = result["peak_bytes"] / max(1, before["peak_bytes"])
+        print(f"{result['case']:<22} time x{ratio:5.2f}  peak memory x{memory_ratio:5.2f}")
+        if ratio > 1 + threshold:
+            regressions.append(result["case"])
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of create_presentation.")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--sections", nargs="+", type=int, help="Sections per deck (grid axis).")
+    parser.add_argument("--slides", nargs="+", type=int, help="Slides per section (grid axis).")
+    parser.add_argument("--quick", action="store_true", help="Run a small grid.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (default: 3).")
+    parser.add_argument("--image-workers", type=int, default=1)
+    parser.add_argument("--section-workers", type=int, default=1)
+    parser.add_argument("--chart-rows", type=int, default=CHART_ROWS,
+                        help=f"Rows of the data charts' CSV (default: {CHART_ROWS}).")
+    parser.add_argument("--no-chart-workbooks", action="store_true",
+                        help="Render lightweight charts without embedded workbooks.")
+    parser.add_argument("--no-chart-cache", action="store_true",
+                        help="Generate every chart's parts anew instead of reusing identical ones.")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Earlier JSON result to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Slowdown fraction reported as a regression (default: 0.15).")
+    args = parser.parse_args(argv)
+
+    sections_grid = args.sections or (QUICK_SECTIONS if args.quick else GRID_SECTIONS)
+    slides_grid = args.slides or (QUICK_SLIDES if args.quick else GRID_SLIDES)
+
+    if args.no_chart_cache:
+        get_chart_cache().max_bytes = 0
+
+    results = []
+    for case in build_cases(args.kinds, sections_grid, slides_grid, args.chart_rows):
+        result = run_case(case, args.repeat, args.image_workers, args.section_workers,
+                          chart_workbooks=not args.no_chart_workbooks)
+        results.append(result)
+        per_chart = ""
+        if result["charts"]:
+            per_chart = (f"  {result['chart_seconds_per_chart'] * 1000:6.2f} ms/chart  "
+                         f"{result['chart_bytes_per_chart'] / 1024:7.1f} KiB/chart")
+        print(f"{result['case']:<22} {result['slides']:4d} slides  {result['median_seconds'] * 1000:8.1f} ms  "
+              f"peak {result['peak_bytes'] / 2**20:7.1f} MiB  output {result['output_bytes'] / 2**20:6.2f} MiB"
+              f"{per_chart}")
+
+    if args.json_path:
+        import pptx
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump({
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "python_pptx": pptx.__version__,
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "chart_workbooks": not args.no_chart_workbooks,
+                "chart_cache": not args.no_chart_cache,
+                "results": results,
+            }, json_file, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for name in regressions:
+            print(f"{name} is more than {args.threshold:.0%} slower than the baseline", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
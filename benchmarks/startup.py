@@ -0,0 +1,130 @@
+"""
+Cold-start benchmark for the Streamlit apps and the headless rendering path.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --repeat 10 --json startup.json --budget 1.5
+
+Each target runs in a fresh interpreter under ``python -X importtime``. The
+benchmark reports the median wall time to start, the import time Python
+recorded and the heaviest top-level imports. Apps are executed up to, but not
+including, ``main()``, i.e. everything that runs before the first widget is
+drawn. With ``--budget`` the exit status is 1 if any target's median wall time
+exceeds the budget in seconds.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APPS = ("ppt_maker_modern.py", "ppt_maker_choose_theme.py", "ppt_maker_modern_upload_template.py")
+
+HEADLESS_DECK = (
+    "import io\n"
+    "from PPT_Maker.rendering import create_presentation\n"
+    "create_presentation('Title', 'Description', 'Author', None, None,\n"
+    "                    [{'section_title': 'Section', 'slides': [{'layout': 'title_content', 'content': 'Hello'}]}],\n"
+    "                    output=io.BytesIO())\n"
+)
+
+
+def startup_targets():
+    """
+    Returns (name, python source) pairs for every measured start-up path.
+    """
+    targets = []
+    for app in APPS:
+        path = os.path.join(ROOT, "PPT_Maker", app)
+        # A run_name other than "__main__" stops before main().
+        targets.append((f"app:{app}", f"import runpy; runpy.run_path({path!r}, run_name='__startup__')"))
+    targets.append(("import:PPT_Maker.rendering", "import PPT_Maker.rendering"))
+    targets.append(("import:llm_service.llm_generator", "import llm_service.llm_generator"))
+    targets.append(("headless:first_deck", HEADLESS_DECK))
+    return targets
+
+
+def parse_importtime(stderr):
+    """
+    Parses ``-X importtime`` output into (module, self_us, cumulative_us, depth)
+    tuples, skipping any other stderr lines.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        imports.append((name.strip(), self_us, cumulative_us, depth))
+    return imports
+
+
+def measure(source, repeat=5):
+    """
+    Runs ``source`` in ``repeat`` fresh interpreters.
+
+    :return: A dict with the wall time of each run, the median, the total import
+             time of the last run and its ten heaviest top-level imports.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env.setdefault("STREAMLIT_BROWSER_GATHER_USAGE_STATS", "false")
+    wall_times = []
+    imports = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", source],
+                                   cwd=ROOT, env=env, capture_output=True, text=True)
+        wall_times.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr[-2000:])
+        imports = parse_importtime(completed.stderr)
+    top_level = [entry for entry in imports if entry[3] == 0]
+    heaviest = sorted(top_level, key=lambda entry: entry[2], reverse=True)[:10]
+    return {
+        "wall_seconds": wall_times,
+        "median_seconds": statistics.median(wall_times),
+        "import_seconds": sum(entry[2] for entry in top_level) / 1e6,
+        "heaviest_imports": [{"module": name, "cumulative_ms": cumulative / 1000}
+                             for name, _, cumulative, _ in heaviest],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per target (default: 5).")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file.")
+    parser.add_argument("--budget", type=float, help="Fail if a target's median start-up exceeds this many seconds.")
+    parser.add_argument("targets", nargs="*", help="Only run targets whose name contains one of these strings.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, source in startup_targets():
+        if args.targets and not any(t in name for t in args.targets):
+            continue
+        result = measure(source, args.repeat)
+        results[name] = result
+        heaviest = ", ".join(f"{entry['module']} {entry['cumulative_ms']:.0f}ms"
+                             for entry in result["heaviest_imports"][:3])
+        print(f"{name:<40} {result['median_seconds'] * 1000:7.0f} ms  "
+              f"(imports {result['import_seconds'] * 1000:.0f} ms: {heaviest})")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump({"python": sys.version.split()[0], "repeat": args.repeat, "results": results},
+                      json_file, indent=2)
+
+    if args.budget is not None:
+        over = [name for name, result in results.items() if result["median_seconds"] > args.budget]
+        for name in over:
+            print(f"{name} exceeds the {args.budget:.2f}s start-up budget", file=sys.stderr)
+        return 1 if over else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Benchmark of the ways to start a new presentation from a cached template.
+
+    python benchmarks/template_clone.py
+    python benchmarks/template_clone.py --repeat 50 --json clone.json
+
+Every rendered deck (and every batch of the incremental slide cache) starts
+from a fresh copy of its template. The strategies compared are:
+
+- deepcopy: copy.deepcopy of a parsed python-pptx Presentation, as
+  PPT_Maker.template_cache clones templates
+- reopen: Presentation(BytesIO(bytes)) of the template as uploaded
+- reopen-stored: the same, from a copy of the package re-zipped without
+  compression, so opening skips inflating every part
+
+for the built-in blank template, a template with a picture on its master, and
+a large upload: that template with ``--sample-slides`` slides of text and
+pictures. Each timing is the median of ``--repeat`` runs.
+"""
+import io
+import os
+import sys
+import copy
+import json
+import time
+import argparse
+import statistics
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from pptx import Presentation
+from pptx.util import Inches
+
+from PPT_Maker.template_cache import stored_package
+
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from rendering import make_image, make_template  # noqa: E402
+
+
+def default_template():
+    output = io.BytesIO()
+    Presentation().save(output)
+    return output.getvalue()
+
+
+def sample_slides_template(slides):
+    """
+    Returns a template with a picture master and ``slides`` sample slides, each
+    with filled placeholders and a picture, as uploaded decks often have.
+    """
+    prs = Presentation(io.BytesIO(make_template()))
+    for n in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[n % len(prs.slide_layouts)])
+        for placeholder in slide.placeholders:
+            if placeholder.has_text_frame:
+                placeholder.text = "\n".join(f"Line {j + 1} of sample slide {n + 1}" for j in range(8))
+        slide.shapes.add_picture(io.BytesIO(make_image(n, (800, 600))), Inches(1), Inches(1), width=Inches(3))
+    output = io.BytesIO()
+    prs.save(output)
+    return output.getvalue()
+
+
+def time_strategy(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark of template clone strategies.")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per strategy (default: 20).")
+    parser.add_argument("--sample-slides", type=int, default=100,
+                        help="Slides of the large template (default: 100).")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    results = []
+    templates = (("default", default_template()), ("picture-master", make_template()),
+                 (f"{args.sample_slides}-slides", sample_slides_template(args.sample_slides)))
+    for name, template_bytes in templates:
+        parsed = Presentation(io.BytesIO(template_bytes))
+        stored = stored_package(template_bytes)
+        strategies = {
+            "deepcopy": lambda: copy.deepcopy(parsed),
+            "reopen": lambda: Presentation(io.BytesIO(template_bytes)),
+            "reopen-stored": lambda: Presentation(io.BytesIO(stored)),
+        }
+        parts = len(zipfile.ZipFile(io.BytesIO(template_bytes)).namelist())
+        for strategy, fn in strategies.items():
+            seconds = time_strategy(fn, args.repeat)
+            results.append({"template": name, "parts": parts, "strategy": strategy, "median_seconds": seconds})
+            print(f"{name:<16} {parts:4d} parts  {strategy:<14} {seconds * 1000:7.2f} ms")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump({"repeat": args.repeat, "results": results}, json_file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
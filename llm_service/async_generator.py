@@ -0,0 +1,274 @@
+import os
+import time
+import asyncio
+import weakref
+
+from llm_service.clients import get_registry
+from llm_service.llm_generator import (
+    DEFAULT_DEADLINE,
+    HTTP_PROVIDERS,
+    _http_request,
+    _http_response_text,
+    _output_limit,
+    _refund_unused,
+    _resolve_provider,
+    _response_cache,
+    _token_charge,
+    encode_image,
+    get_api_key,
+    is_error_response,
+)
+from llm_service.metrics import record_usage, span
+from llm_service.mock import MOCK_PROVIDERS, get_mock_provider, record_response
+from llm_service.scheduler import compute_deadline, get_scheduler
+
+# Upper bound on requests sent at once from one event loop.
+DEFAULT_ASYNC_CONCURRENCY = int(os.getenv("SLIDECRAFT_LLM_ASYNC_CONCURRENCY", "64"))
+
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _get_semaphore():
+    """
+    Returns the running event loop's request semaphore.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(DEFAULT_ASYNC_CONCURRENCY)
+    return semaphore
+
+
+async def _ascheduled(provider, prompt, send, deadline, model=None, max_tokens=None):
+    """
+    Awaits send(timeout) through the provider's rate-limit and retry scheduler,
+    charging the prompt's token count plus the expected output. SDK results
+    reporting their usage get the unused part of the charge refunded.
+    """
+    tokens = _token_charge(provider, prompt, model, max_tokens)
+
+    async def _send(timeout):
+        # Only the request itself takes a slot; rate-limit and backoff waits do not.
+        async with _get_semaphore():
+            return await send(timeout)
+
+    result = await get_scheduler(provider).arun(_send, tokens=tokens, deadline=deadline,
+                                                timeout=get_registry().timeout)
+    _refund_unused(provider, tokens, getattr(result, "usage", None))
+    return result
+
+
+async def _in_thread(fn, *args):
+    # The response cache is synchronous SQLite; keep its I/O off the event loop.
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+async def agenerate_llm_response(prompt, provider="openai", model="gpt-4o", temperature=0.7, use_cache=True,
+                                 deadline=DEFAULT_DEADLINE, max_tokens=None):
+    """
+    Async variant of generate_llm_response.
+
+    :param prompt: The prompt or query string.
+    :param provider: Which LLM provider to use ('openai', 'huggingface', 'claude', 'gemini', 'mock', 'replay').
+    :param model: Model name.
+    :param temperature: Sampling temperature (if applicable).
+    :param use_cache: Set to False to bypass the response cache for this call.
+    :param deadline: Seconds the call may take, including rate-limit waits and retries.
+    :param max_tokens: Cap on the response length in tokens; None keeps the provider's default.
+    :return: The text response from the LLM, or an error string if something fails.
+    """
+    try:
+        provider = _resolve_provider(provider)
+        with span("llm.request", provider=provider.lower(), kind="text", api="async") as timer:
+            cache = _response_cache(provider, use_cache)
+            if cache is not None:
+                cache_key = cache.make_key(provider, model, temperature, prompt)
+                cached = await _in_thread(cache.get, cache_key)
+                if cached is not None:
+                    timer.set(outcome="cache_hit")
+                    return cached
+
+            start = time.perf_counter()
+            response = await _arequest_llm_response(prompt, provider, model, temperature,
+                                                    compute_deadline(deadline), max_tokens)
+            if isinstance(response, str) and not is_error_response(response):
+                timer.set(outcome="ok")
+                record_response(provider, model, temperature, prompt, response, time.perf_counter() - start)
+                if cache is not None:
+                    await _in_thread(cache.set, cache_key, response)
+            else:
+                timer.set(outcome="error")
+            return response
+    except Exception as e:
+        return f"LLM Error: {str(e)}"
+
+
+async def _arequest_llm_response(prompt, provider, model, temperature, deadline=None, max_tokens=None):
+    try:
+        if provider.lower() == "openai":
+            client = get_registry().get_async_clients().get_openai_client(get_api_key("OPENAI_API_KEY"))
+            response = await _ascheduled("openai", prompt, lambda timeout: client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                timeout=timeout,
+                **_output_limit(max_tokens)
+            ), deadline, model, max_tokens)
+            record_usage("openai", model, response.usage)
+            return response.choices[0].message.content
+
+        elif provider.lower() in MOCK_PROVIDERS:
+            mock = get_mock_provider(provider)
+            entry = mock.lookup(prompt, model, temperature)
+            return await _ascheduled(provider.lower(), prompt, lambda timeout: mock.acomplete(
+                prompt, model, temperature, timeout, entry=entry
+            ), deadline, model, max_tokens)
+
+        elif provider.lower() in HTTP_PROVIDERS:
+            url, headers, payload = _http_request(provider.lower(), prompt, model, temperature, max_tokens)
+            client = get_registry().get_async_clients().get_http_client(provider)
+            http_response = await _ascheduled(provider.lower(), prompt, lambda timeout: client.post(
+                url, headers=headers, json=payload, timeout=timeout
+            ), deadline, model, max_tokens)
+            return _http_response_text(provider.lower(), http_response)
+
+        else:
+            return "LLM Error: Unknown provider specified."
+
+    except Exception as e:
+        return f"LLM Error: {str(e)}"
+
+
+async def agenerate_llm_responses_batch(prompts, provider="openai", model="gpt-4o", temperature=0.7,
+                                        max_concurrency=DEFAULT_ASYNC_CONCURRENCY, progress_callback=None,
+                                        use_cache=True, deadline=DEFAULT_DEADLINE, max_tokens=None):
+    """
+    Runs agenerate_llm_response for many prompts concurrently on the running
+    event loop. Across all callers on the loop, at most
+    SLIDECRAFT_LLM_ASYNC_CONCURRENCY requests are sent at once.
+
+    :param prompts: Iterable of prompt strings.
+    :param max_concurrency: Maximum number of this batch's items in progress at once.
+    :param progress_callback: Optional callable invoked as progress_callback(completed, total)
+                              after each item finishes.
+    :return: A list of responses in the same order as prompts. A failing item yields an
+             "LLM Error: ..." string without affecting the others.
+    """
+    prompts = list(prompts)
+    total = len(prompts)
+    results = [None] * total
+    completed = 0
+    slots = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+    async def _item(index, prompt):
+        nonlocal completed
+        async with slots:
+            results[index] = await agenerate_llm_response(prompt, provider, model, temperature, use_cache,
+                                                          deadline, max_tokens)
+        completed += 1
+        if progress_callback is not None:
+            progress_callback(completed, total)
+
+    await asyncio.gather(*(_item(index, prompt) for index, prompt in enumerate(prompts)))
+    return results
+
+
+async def agenerate_image_description(image_path, prompt, provider="openai", model="gpt-4o-mini", temperature=0.7,
+                                      deadline=DEFAULT_DEADLINE):
+    """
+    Async variant of generate_image_description.
+
+    :param image_path: Path to the input image.
+    :param prompt: Instructions for the description.
+    :param provider: LLM provider, default 'openai'.
+    :param model: LLM model name.
+    :param temperature: Sampling temperature.
+    :param deadline: Seconds the call may take, including rate-limit waits and retries.
+    :return: A generated caption describing the image.
+    """
+    client = get_registry().get_async_clients().get_openai_client(get_api_key("OPENAI_API_KEY"))
+
+    base64_image = await asyncio.get_running_loop().run_in_executor(None, encode_image, image_path)
+    with span("llm.request", provider="openai", kind="image", api="async"):
+        response = await _ascheduled("openai", prompt, lambda timeout: client.chat.completions.create(
+            model=model,
+            timeout=timeout,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}},
+                    ],
+                }
+            ],
+        ), compute_deadline(deadline), model)
+    record_usage("openai", model, response.usage)
+    return response.choices[0].message.content
+
+
+async def agenerate_llm_json(prompt, event, provider="openai", model="gpt-4o-2024-08-06", temperature=0.7,
+                             use_cache=True, deadline=DEFAULT_DEADLINE, max_tokens=None):
+    """
+    Async variant of generate_llm_json.
+
+    :param prompt: The prompt or query string.
+    :param event: Pydantic model class describing the expected response.
+    :param provider: LLM provider; only 'openai' supports structured output, besides 'mock' and 'replay'.
+    :param model: Model name.
+    :param temperature: Sampling temperature.
+    :param use_cache: Set to False to bypass the response cache for this call.
+    :param deadline: Seconds the call may take, including rate-limit waits and retries.
+    :param max_tokens: Cap on the response length in tokens; None keeps the provider's default.
+    :return: An instance of ``event``, or an error string if something fails.
+    """
+    try:
+        provider = _resolve_provider(provider)
+        with span("llm.request", provider=provider.lower(), kind="json", api="async") as timer:
+            cache = _response_cache(provider, use_cache)
+            if cache is not None:
+                cache_key = cache.make_key(provider, model, temperature, prompt, schema=event.model_json_schema())
+                cached = await _in_thread(cache.get, cache_key)
+                if cached is not None:
+                    timer.set(outcome="cache_hit")
+                    return event.model_validate_json(cached)
+
+            start = time.perf_counter()
+            parsed = await _arequest_llm_json(prompt, event, provider, model, temperature,
+                                              compute_deadline(deadline), max_tokens)
+            if isinstance(parsed, event):
+                timer.set(outcome="ok")
+                serialized = parsed.model_dump_json()
+                record_response(provider, model, temperature, prompt, serialized, time.perf_counter() - start,
+                                structured=True)
+                if cache is not None:
+                    await _in_thread(cache.set, cache_key, serialized)
+            else:
+                timer.set(outcome="error")
+            return parsed
+    except Exception as e:
+        return f"LLM Error: {str(e)}"
+
+
+async def _arequest_llm_json(prompt, event, provider, model, temperature, deadline=None, max_tokens=None):
+    try:
+        if provider.lower() == "openai":
+            client = get_registry().get_async_clients().get_openai_client(get_api_key("OPENAI_API_KEY"))
+            completion = await _ascheduled("openai", prompt, lambda timeout: client.beta.chat.completions.parse(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                response_format=event,
+                timeout=timeout,
+                **_output_limit(max_tokens)
+            ), deadline, model, max_tokens)
+            record_usage("openai", model, completion.usage)
+            return completion.choices[0].message.parsed
+        elif provider.lower() in MOCK_PROVIDERS:
+            mock = get_mock_provider(provider)
+            entry = mock.lookup(prompt, model, temperature, structured=True)
+            return await _ascheduled(provider.lower(), prompt, lambda timeout: mock.acomplete_json(
+                prompt, event, model, temperature, timeout, entry=entry
+            ), deadline, model, max_tokens)
+    except Exception as e:
+        return f"LLM Error: {str(e)}"
@@ -0,0 +1,248 @@
+import os
+import re
+import math
+import logging
+import threading
+
+from llm_service.metrics import count
+
+logger = logging.getLogger(__name__)
+
+# (context window, maximum output tokens) per model; unknown models use DEFAULT_MODEL_LIMITS.
+MODEL_LIMITS = {
+    "gpt-4o": (128000, 16384),
+    "gpt-4o-2024-08-06": (128000, 16384),
+    "gpt-4o-mini": (128000, 16384),
+}
+DEFAULT_MODEL_LIMITS = (8192, 4096)
+
+# Tokens a pasted context may use, well inside the context window: long
+# prompts are slow to process and rarely improve slide text.
+DEFAULT_CONTEXT_TOKEN_BUDGET = int(os.getenv("SLIDECRAFT_CONTEXT_TOKEN_BUDGET", "6000"))
+
+# How oversized contexts are shortened: "extractive" keeps the most relevant
+# sentences, "truncate" keeps the beginning.
+DEFAULT_COMPACTION = os.getenv("SLIDECRAFT_PROMPT_COMPACTION", "extractive").lower()
+
+# max_tokens is the expected output size plus headroom, and never below the minimum.
+OUTPUT_HEADROOM = 1.25
+MIN_OUTPUT_TOKENS = 64
+
+# Expected output sizes of the apps' requests.
+REWRITE_OUTPUT_RATIO = 1.5
+SLIDE_OUTPUT_TOKENS = 150
+
+# Encoding used for models tiktoken does not know.
+FALLBACK_ENCODING = "o200k_base"
+
+_WORD = re.compile(r"[a-z0-9]{3,}")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = frozenset(
+    "the and for are but not you all any can had her was one our out has have this that with from they "
+    "will would there their what about which when make like than then them these some into its also "
+    "more other only over such very just your please slide slides".split()
+)
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def model_limits(model):
+    """
+    Returns (context window, maximum output tokens) for a model.
+    """
+    return MODEL_LIMITS.get(model, DEFAULT_MODEL_LIMITS)
+
+
+def _get_encoding(model):
+    """
+    Returns the tiktoken encoding for a model, or None when tiktoken is not
+    installed or its encoding files cannot be loaded (e.g. offline).
+    """
+    key = model or FALLBACK_ENCODING
+    if key in _encodings:
+        return _encodings[key]
+    with _encodings_lock:
+        if key not in _encodings:
+            try:
+                import tiktoken
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except (KeyError, TypeError):
+                    encoding = tiktoken.get_encoding(FALLBACK_ENCODING)
+            except Exception:
+                encoding = None
+            _encodings[key] = encoding
+    return _encodings[key]
+
+
+def count_tokens(text, model=None):
+    """
+    Counts the tokens of ``text`` with the model's tiktoken encoding, or
+    estimates about four characters per token when tiktoken is unavailable.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text, max_tokens, model=None):
+    """
+    Returns the beginning of ``text`` holding at most ``max_tokens`` tokens,
+    cut at a word boundary where possible.
+    """
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        limit = max(0, (max_tokens - 1) * 4)
+        if len(text) <= limit:
+            return text
+        cut = text[:limit]
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        cut = encoding.decode(tokens[:max_tokens])
+    space = cut.rfind(" ")
+    return cut[:space] if space > len(cut) // 2 else cut
+
+
+def compact_text(text, max_tokens, model=None, query="", mode=None):
+    """
+    Shortens ``text`` to at most ``max_tokens`` tokens.
+
+    Extractive compaction splits the text into sentences and keeps the
+    highest-scoring ones in their original order. A sentence scores for
+    sharing words with ``query`` (e.g. the user's instructions), for words that
+    recur across the text, and for opening the text or a paragraph. Truncation
+    keeps the beginning.
+
+    :param mode: 'extractive' or 'truncate'; defaults to SLIDECRAFT_PROMPT_COMPACTION.
+    """
+    mode = mode or DEFAULT_COMPACTION
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    if mode != "extractive":
+        return truncate_tokens(text, max_tokens, model)
+
+    units = []
+    for line_index, line in enumerate(text.splitlines()):
+        for position, sentence in enumerate(_SENTENCE_END.split(line.strip())):
+            if sentence:
+                units.append((line_index, position, sentence))
+    if len(units) < 2:
+        return truncate_tokens(text, max_tokens, model)
+
+    query_words = set(_words(query))
+    frequencies = {}
+    unit_words = []
+    for _, _, sentence in units:
+        words = _words(sentence)
+        unit_words.append(words)
+        for word in set(words):
+            frequencies[word] = frequencies.get(word, 0) + 1
+
+    scores = []
+    for index, ((line_index, position, sentence), words) in enumerate(zip(units, unit_words)):
+        distinct = set(words)
+        centrality = sum(math.log1p(frequencies[word]) for word in distinct) / math.sqrt(len(distinct) + 1)
+        relevance = 2.0 * len(distinct & query_words)
+        lead = 1.0 if index == 0 else (0.5 if position == 0 else 0.0)
+        scores.append(centrality + relevance + lead)
+
+    kept = set()
+    used = 0
+    for index in sorted(range(len(units)), key=lambda i: scores[i], reverse=True):
+        cost = count_tokens(units[index][2], model) + 1
+        if used + cost <= max_tokens:
+            kept.add(index)
+            used += cost
+
+    lines = {}
+    for index in sorted(kept):
+        line_index, _, sentence = units[index]
+        lines.setdefault(line_index, []).append(sentence)
+    compacted = "\n".join(" ".join(lines[line_index]) for line_index in sorted(lines))
+    if not compacted:
+        return truncate_tokens(text, max_tokens, model)
+    # Joining can merge tokens differently; make sure the result fits.
+    if count_tokens(compacted, model) > max_tokens:
+        compacted = truncate_tokens(compacted, max_tokens, model)
+    return compacted
+
+
+def _words(text):
+    return [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+
+
+def fit_context(context, model="gpt-4o", reserved_tokens=0, max_tokens=DEFAULT_CONTEXT_TOKEN_BUDGET,
+                query="", label="context"):
+    """
+    Returns ``context`` shortened, if needed, to fit its token budget: the
+    smaller of ``max_tokens`` and what the model's context window leaves after
+    ``reserved_tokens`` (the rest of the prompt and the expected output).
+    Compactions are logged and counted in the 'prompt.compacted_tokens' metric.
+
+    :param query: Text the kept context should be relevant to, e.g. the instructions.
+    :param label: Name of the context in log messages and metrics.
+    """
+    if not context:
+        return context
+    window, _ = model_limits(model)
+    budget = window - reserved_tokens
+    if max_tokens:
+        budget = min(budget, max_tokens)
+    budget = max(budget, 0)
+    tokens = count_tokens(context, model)
+    if tokens <= budget:
+        logger.debug("%s: %d tokens, within the %d-token budget", label, tokens, budget)
+        return context
+    compacted = compact_text(context, budget, model, query=query)
+    compacted_tokens = count_tokens(compacted, model)
+    logger.info("%s: %d tokens exceed the %d-token budget for %s; %s compaction kept %d tokens",
+                label, tokens, budget, model, DEFAULT_COMPACTION, compacted_tokens)
+    count("prompt.compacted_tokens", tokens - compacted_tokens, label=label)
+    return compacted
+
+
+def max_output_tokens(expected_tokens, model="gpt-4o"):
+    """
+    Returns the max_tokens for a request expected to produce about
+    ``expected_tokens`` tokens, capped at the model's output limit.
+    """
+    _, output_limit = model_limits(model)
+    return int(min(output_limit, max(MIN_OUTPUT_TOKENS, math.ceil(expected_tokens * OUTPUT_HEADROOM))))
+
+
+def rewrite_max_tokens(contents, model="gpt-4o"):
+    """
+    Returns the max_tokens for AI rewrites of slide contents: a rewrite is
+    expected to be about as long as the longest original.
+    """
+    longest = max((count_tokens(content, model) for content in contents), default=0)
+    return max_output_tokens(longest * REWRITE_OUTPUT_RATIO, model)
+
+
+def slides_max_tokens(num_slides, model="gpt-4o"):
+    """
+    Returns the max_tokens for generating the contents of ``num_slides`` slides.
+    """
+    return max_output_tokens(num_slides * SLIDE_OUTPUT_TOKENS, model)
+
+
+def log_request_budget(provider, model, prompt_tokens, max_tokens):
+    """
+    Logs the token budget of a request about to be sent, warning when it does
+    not fit the model's context window.
+    """
+    window, _ = model_limits(model)
+    total = prompt_tokens + (max_tokens or 0)
+    if total > window:
+        logger.warning("%s %s: prompt of %d tokens plus max_tokens %s exceeds the %d-token context window",
+                       provider, model, prompt_tokens, max_tokens, window)
+    else:
+        logger.debug("%s %s: prompt %d tokens, max_tokens %s", provider, model, prompt_tokens, max_tokens)
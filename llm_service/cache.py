@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# Cache location and limits can be tuned per deployment through the environment.
+DEFAULT_CACHE_PATH = os.getenv(
+    "SLIDECRAFT_LLM_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "slidecraft", "llm_cache.sqlite3"),
+)
+DEFAULT_TTL_SECONDS = float(os.getenv("SLIDECRAFT_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_MAX_BYTES = int(os.getenv("SLIDECRAFT_LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_ENABLED = os.getenv("SLIDECRAFT_LLM_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+
+class LLMResponseCache:
+    """
+    Persistent, content-addressed cache of LLM responses backed by SQLite.
+
+    Entries are keyed on provider, model, temperature, a hash of the prompt and,
+    for structured calls, the response schema. Reads refresh an entry's access
+    time so that eviction removes least recently used entries first once the
+    total stored size exceeds ``max_bytes``. Entries older than ``ttl`` are
+    treated as misses and purged.
+
+    The total size is kept in a ``meta`` row that triggers update on every
+    insert, replace and delete, so writes never have to sum the whole table and
+    several processes can share one database file.
+
+    :param path: SQLite database file, or ":memory:".
+    :param ttl: Time-to-live of an entry in seconds; None disables expiry.
+    :param max_bytes: Cap on the summed size of stored values.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # INSERT OR REPLACE only fires the delete trigger of the replaced row with this on.
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_size_insert AFTER INSERT ON responses BEGIN"
+                " UPDATE meta SET value = value + NEW.size WHERE name = 'total_size'; END"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_size_delete AFTER DELETE ON responses BEGIN"
+                " UPDATE meta SET value = value - OLD.size WHERE name = 'total_size'; END"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_size_update AFTER UPDATE OF size ON responses BEGIN"
+                " UPDATE meta SET value = value + NEW.size - OLD.size WHERE name = 'total_size'; END"
+            )
+            # Databases written before the running total existed are summed once.
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (name, value)"
+                " SELECT 'total_size', COALESCE(SUM(size), 0) FROM responses"
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def make_key(provider, model, temperature, prompt, schema=None):
+        """
+        Builds the cache key for a request.
+
+        :param schema: JSON-serialisable response schema for structured calls.
+        """
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        schema_hash = None
+        if schema is not None:
+            schema_hash = hashlib.sha256(json.dumps(schema, sort_keys=True).encode("utf-8")).hexdigest()
+        material = json.dumps([provider.lower(), model, temperature, prompt_hash, schema_hash])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Returns the cached value for a key, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value):
+        """
+        Stores a value and evicts expired and least recently used entries as needed.
+        """
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(now)
+
+    def clear(self):
+        """
+        Removes every entry and resets the hit/miss counters.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Returns hit/miss counters together with the current entry count and size.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            total = self._total_size()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": total}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _total_size(self):
+        return self._conn.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()[0]
+
+    def _evict(self, now):
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        total = self._total_size()
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Returns the process-wide response cache, or None when caching is disabled
+    via SLIDECRAFT_LLM_CACHE=0.
+    """
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache()
+    return _cache
@@ -0,0 +1,314 @@
+import os
+import asyncio
+import weakref
+import threading
+
+
+# Pool sizing and timeouts can be tuned per deployment through the environment.
+DEFAULT_POOL_CONNECTIONS = int(os.getenv("SLIDECRAFT_LLM_POOL_CONNECTIONS", "4"))
+DEFAULT_POOL_MAXSIZE = int(os.getenv("SLIDECRAFT_LLM_POOL_MAXSIZE", "16"))
+DEFAULT_TIMEOUT = float(os.getenv("SLIDECRAFT_LLM_TIMEOUT", "60"))
+# Async calls multiplex many requests over one event loop, so their pools are larger.
+DEFAULT_ASYNC_POOL_MAXSIZE = int(os.getenv("SLIDECRAFT_LLM_ASYNC_POOL_MAXSIZE", "64"))
+WARM_TIMEOUT = 5.0
+
+# Hosts contacted by each provider branch in llm_generator.
+PROVIDER_BASE_URLS = {
+    "openai": "https://api.openai.com",
+    "huggingface": "https://api-inference.huggingface.co",
+    "claude": "https://api.anthropic.com",
+    "gemini": "https://generativelanguage.googleapis.com",
+}
+
+
+class ProviderClientRegistry:
+    """
+    Holds one long-lived client per provider so that repeated LLM calls reuse
+    keep-alive connections instead of paying a TCP+TLS handshake every time.
+
+    HTTP providers (HuggingFace, Claude, Gemini) share a ``requests.Session``
+    per provider, mounted with a sized connection pool. OpenAI gets one SDK
+    client per API key, which keeps its own pool internally. Async callers get
+    the equivalent async clients from get_async_clients.
+
+    :param pool_connections: Number of host pools cached per session.
+    :param pool_maxsize: Maximum connections kept alive per host.
+    :param timeout: Default request timeout in seconds.
+    :param async_pool_maxsize: Maximum connections per host of the async clients.
+    """
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, timeout=DEFAULT_TIMEOUT,
+                 async_pool_maxsize=DEFAULT_ASYNC_POOL_MAXSIZE):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.async_pool_maxsize = async_pool_maxsize
+        self._lock = threading.RLock()
+        self._sessions = {}
+        self._openai_clients = {}
+        self._openai_http_clients = {}
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._warmed = set()
+
+    def configure(self, pool_connections=None, pool_maxsize=None, timeout=None, async_pool_maxsize=None):
+        """
+        Updates pool sizes and timeouts. Existing clients are closed and rebuilt
+        lazily on next use with the new settings.
+        """
+        with self._lock:
+            if pool_connections is not None:
+                self.pool_connections = pool_connections
+            if pool_maxsize is not None:
+                self.pool_maxsize = pool_maxsize
+            if timeout is not None:
+                self.timeout = timeout
+            if async_pool_maxsize is not None:
+                self.async_pool_maxsize = async_pool_maxsize
+            self.close()
+
+    def get_session(self, provider):
+        """
+        Returns the shared ``requests.Session`` for a provider, creating it on first use.
+        """
+        provider = provider.lower()
+        session = self._sessions.get(provider)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(provider)
+                if session is None:
+                    session = self._build_session()
+                    self._sessions[provider] = session
+        return session
+
+    def get_openai_client(self, api_key):
+        """
+        Returns the shared OpenAI client for an API key, creating it on first use.
+        """
+        client = self._openai_clients.get(api_key)
+        if client is None:
+            with self._lock:
+                client = self._openai_clients.get(api_key)
+                if client is None:
+                    client = self._build_openai_client(api_key)
+                    self._openai_clients[api_key] = client
+        return client
+
+    def get_async_clients(self):
+        """
+        Returns the async clients of the running event loop, creating them on
+        first use. httpx pools are bound to the loop that opened their
+        connections, so every loop gets its own set; it is dropped with the loop.
+        """
+        loop = asyncio.get_running_loop()
+        clients = self._async_clients.get(loop)
+        if clients is None:
+            with self._lock:
+                clients = self._async_clients.get(loop)
+                if clients is None:
+                    clients = AsyncProviderClients(self.async_pool_maxsize, self.timeout)
+                    self._async_clients[loop] = clients
+        return clients
+
+    def warm(self, providers=None, openai_api_key=None, background=False):
+        """
+        Opens a connection to each provider's host so the first real request
+        skips the handshake. Providers already warmed in this process are skipped.
+
+        :param providers: Provider names to warm; defaults to all known providers.
+        :param openai_api_key: Key of the OpenAI client to warm; OpenAI is skipped without it.
+        :param background: Warm in a daemon thread instead of blocking the caller.
+        :return: The started thread when ``background`` is set, otherwise None.
+        """
+        providers = [p.lower() for p in (providers or PROVIDER_BASE_URLS)]
+        with self._lock:
+            pending = [p for p in providers if p in PROVIDER_BASE_URLS and p not in self._warmed
+                       and (p != "openai" or openai_api_key)]
+            self._warmed.update(pending)
+        if not pending:
+            return None
+        if background:
+            thread = threading.Thread(target=self._warm, args=(pending, openai_api_key), daemon=True)
+            thread.start()
+            return thread
+        self._warm(pending, openai_api_key)
+        return None
+
+    def close(self):
+        """
+        Closes every pooled client and forgets them. Async clients can only be
+        closed from their own loop (see aclose_async_clients); here they are
+        just forgotten.
+        """
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            for client in self._openai_clients.values():
+                client.close()
+            self._sessions = {}
+            self._openai_clients = {}
+            self._openai_http_clients = {}
+            self._async_clients = weakref.WeakKeyDictionary()
+            self._warmed = set()
+
+    async def aclose(self):
+        """
+        Closes and forgets the async clients of the running event loop.
+        """
+        with self._lock:
+            clients = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if clients is not None:
+            await clients.aclose()
+
+    def _build_session(self):
+        # Imported on first use: the HTTP stack is not needed until a provider is called.
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _build_openai_client(self, api_key):
+        # The OpenAI SDK takes longer to import than the rest of the app's modules
+        # together, so it is only loaded once an OpenAI client is needed.
+        from openai import OpenAI
+
+        http_client = None
+        try:
+            import httpx
+            from openai import DefaultHttpxClient
+            http_client = DefaultHttpxClient(
+                limits=httpx.Limits(max_connections=self.pool_maxsize,
+                                    max_keepalive_connections=self.pool_maxsize),
+                timeout=self.timeout,
+            )
+        except ImportError:
+            # Older or newer SDKs without an httpx transport keep their default pool.
+            pass
+        self._openai_http_clients[api_key] = http_client
+        # Retries are owned by llm_service.scheduler, so the SDK must not retry on its own.
+        return OpenAI(api_key=api_key, timeout=self.timeout, max_retries=0, http_client=http_client)
+
+    def _warm(self, providers, openai_api_key=None):
+        for provider in providers:
+            url = PROVIDER_BASE_URLS[provider]
+            # Any response, even a 404, leaves a live connection in the pool.
+            try:
+                if provider == "openai":
+                    self.get_openai_client(openai_api_key)
+                    http_client = self._openai_http_clients.get(openai_api_key)
+                    if http_client is not None:
+                        http_client.head(url, timeout=WARM_TIMEOUT)
+                else:
+                    self.get_session(provider).head(url, timeout=WARM_TIMEOUT)
+            except Exception:
+                pass
+
+
+class AsyncProviderClients:
+    """
+    The async clients of one event loop: an ``httpx.AsyncClient`` per HTTP
+    provider and an ``AsyncOpenAI`` client per API key, each with a pool of
+    ``pool_maxsize`` keep-alive connections.
+
+    :param pool_maxsize: Maximum connections per client.
+    :param timeout: Default request timeout in seconds.
+    """
+
+    def __init__(self, pool_maxsize=DEFAULT_ASYNC_POOL_MAXSIZE, timeout=DEFAULT_TIMEOUT):
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self._http_clients = {}
+        self._openai_clients = {}
+
+    def get_http_client(self, provider):
+        """
+        Returns the shared ``httpx.AsyncClient`` for a provider, creating it on first use.
+        """
+        provider = provider.lower()
+        client = self._http_clients.get(provider)
+        if client is None:
+            client = self._http_clients[provider] = self._build_http_client()
+        return client
+
+    def get_openai_client(self, api_key):
+        """
+        Returns the shared ``AsyncOpenAI`` client for an API key, creating it on first use.
+        """
+        client = self._openai_clients.get(api_key)
+        if client is None:
+            client = self._openai_clients[api_key] = self._build_openai_client(api_key)
+        return client
+
+    async def aclose(self):
+        for client in self._http_clients.values():
+            await client.aclose()
+        for client in self._openai_clients.values():
+            await client.close()
+        self._http_clients = {}
+        self._openai_clients = {}
+
+    def _limits(self):
+        import httpx
+
+        return httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize)
+
+    def _build_http_client(self):
+        # httpx ships with the OpenAI SDK; like requests it is imported on first use.
+        import httpx
+
+        return httpx.AsyncClient(limits=self._limits(), timeout=self.timeout)
+
+    def _build_openai_client(self, api_key):
+        from openai import AsyncOpenAI
+
+        http_client = None
+        try:
+            from openai import DefaultAsyncHttpxClient
+            http_client = DefaultAsyncHttpxClient(limits=self._limits(), timeout=self.timeout)
+        except ImportError:
+            pass
+        # Retries are owned by llm_service.scheduler, so the SDK must not retry on its own.
+        return AsyncOpenAI(api_key=api_key, timeout=self.timeout, max_retries=0, http_client=http_client)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    Returns the process-wide provider client registry.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ProviderClientRegistry()
+    return _registry
+
+
+def configure_clients(pool_connections=None, pool_maxsize=None, timeout=None, async_pool_maxsize=None):
+    """
+    Reconfigures pool sizes and timeouts of the process-wide registry.
+    """
+    get_registry().configure(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                             timeout=timeout, async_pool_maxsize=async_pool_maxsize)
+
+
+async def aclose_async_clients():
+    """
+    Closes the running event loop's async clients, e.g. before the loop ends.
+    """
+    await get_registry().aclose()
+
+
+def warm_connections(providers=None, openai_api_key=None, background=True):
+    """
+    Pre-opens provider connections, typically once at app start.
+    """
+    return get_registry().warm(providers, openai_api_key=openai_api_key, background=background)
@@ -0,0 +1,151 @@
+from typing import List
+from concurrent.futures import ThreadPoolExecutor
+
+from pydantic import BaseModel
+
+from llm_service.budget import (
+    DEFAULT_MODEL_LIMITS,
+    MODEL_LIMITS,
+    count_tokens,
+    fit_context,
+    max_output_tokens,
+)
+from llm_service.llm_generator import (
+    DEFAULT_MAX_CONCURRENCY,
+    generate_llm_json,
+    generate_llm_responses_batch,
+)
+from llm_service.metrics import bind_context
+
+# Prompt used for a single slide, and for slides missing from a batched response.
+IMPROVEMENT_TIPS_PROMPT = (
+    "Based on the following slide content, provide improvement tips to enhance clarity, engagement, and design:\n"
+)
+
+BATCH_TIPS_PROMPT = (
+    "Provide improvement tips to enhance clarity, engagement, and design for each of the slides below. "
+    "Return one entry per slide in the `tips` array, with `slide_index` set to the number shown in the "
+    "slide's [Slide N] marker and `tips` holding the improvement tips for that slide.\n\n"
+)
+
+# Expected size of the tips for one slide, used to budget the response.
+TIPS_TOKENS_PER_SLIDE = 400
+
+
+# Pydantic models for JSON output
+class SlideTip(BaseModel):
+    slide_index: int
+    tips: str
+
+
+class SlideTipsEvent(BaseModel):
+    tips: List[SlideTip]
+
+
+def build_tips_prompt(slide_content, model="gpt-4o"):
+    """
+    Returns the per-slide improvement tips prompt, with oversized slide content
+    compacted to the context budget (see llm_service.budget).
+    """
+    return IMPROVEMENT_TIPS_PROMPT + fit_context(slide_content, model, reserved_tokens=tips_max_tokens(model),
+                                                 label="tips slide content")
+
+
+def tips_max_tokens(model="gpt-4o", slides=1):
+    """
+    Returns the max_tokens for the improvement tips of ``slides`` slides.
+    """
+    return max_output_tokens(slides * TIPS_TOKENS_PER_SLIDE, model)
+
+
+def estimate_tokens(text, model=None):
+    """
+    Token count used for chunking: exact with tiktoken, otherwise about four
+    characters per token (see llm_service.budget.count_tokens).
+    """
+    return count_tokens(text, model) + 1
+
+
+def chunk_slide_indices(slide_contents, model):
+    """
+    Splits slide indices into consecutive groups whose prompt fits the model's
+    context window and whose expected tips fit its output limit.
+
+    :return: A list of lists of indices into slide_contents.
+    """
+    context_tokens, output_tokens = MODEL_LIMITS.get(model, DEFAULT_MODEL_LIMITS)
+    max_slides = max(1, output_tokens // TIPS_TOKENS_PER_SLIDE)
+    input_budget = context_tokens - output_tokens - estimate_tokens(BATCH_TIPS_PROMPT, model)
+
+    chunks = []
+    current = []
+    used = 0
+    for index, content in enumerate(slide_contents):
+        cost = estimate_tokens(content, model) + 8  # allow for the [Slide N] marker
+        if current and (used + cost > input_budget or len(current) >= max_slides):
+            chunks.append(current)
+            current = []
+            used = 0
+        current.append(index)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def generate_improvement_tips_batch(slide_contents, provider="openai", model="gpt-4o", temperature=0.7,
+                                    max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """
+    Generates improvement tips for many slides with as few structured requests as possible.
+
+    All slide contents are sent in one generate_llm_json request returning a
+    SlideTipsEvent keyed by slide index. Batches that would exceed the model's
+    context are split into chunks, which are requested concurrently. Slides
+    missing from a response (or from a failed request) fall back to individual
+    generate_llm_response calls.
+
+    :param slide_contents: List of slide content strings.
+    :param provider: Which LLM provider to use; structured output requires 'openai'.
+    :param model: Model name.
+    :param temperature: Sampling temperature.
+    :param max_concurrency: Maximum number of requests in flight at once.
+    :return: A list of tips strings in the same order as slide_contents.
+    """
+    slide_contents = list(slide_contents)
+    tips = [None] * len(slide_contents)
+    if not slide_contents:
+        return tips
+    # A single oversized slide would otherwise not fit any chunk.
+    slide_contents = [fit_context(content, model, reserved_tokens=tips_max_tokens(model, len(slide_contents)),
+                                  label="tips slide content")
+                      for content in slide_contents]
+
+    def _request_chunk(indices):
+        prompt = BATCH_TIPS_PROMPT + "\n\n".join(
+            f"[Slide {index}]\n{slide_contents[index]}" for index in indices
+        )
+        return indices, generate_llm_json(prompt, SlideTipsEvent, provider=provider, model=model,
+                                          temperature=temperature,
+                                          max_tokens=tips_max_tokens(model, len(indices)))
+
+    chunks = chunk_slide_indices(slide_contents, model)
+    workers = max(1, min(int(max_concurrency), len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-tips") as executor:
+        for indices, result in executor.map(bind_context(_request_chunk), chunks):
+            if not isinstance(result, SlideTipsEvent):
+                continue
+            expected = set(indices)
+            for item in result.tips:
+                if item.slide_index in expected and item.tips.strip():
+                    tips[item.slide_index] = item.tips
+
+    missing = [index for index, tip in enumerate(tips) if tip is None]
+    if missing:
+        fallback = generate_llm_responses_batch(
+            [build_tips_prompt(slide_contents[index], model) for index in missing],
+            provider=provider, model=model, temperature=temperature, max_concurrency=max_concurrency,
+            max_tokens=tips_max_tokens(model)
+        )
+        for index, tip in zip(missing, fallback):
+            tips[index] = tip
+    return tips
@@ -1,18 +1,59 @@
 
 import os
-import requests
 import json
-from openai import OpenAI
-from dotenv import load_dotenv
 import base64
+import time
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-load_dotenv()
+from llm_service.budget import count_tokens, log_request_budget
+from llm_service.cache import get_cache
+from llm_service.clients import get_registry, warm_connections
+from llm_service.metrics import bind_context, record_usage, span
+from llm_service.mock import MOCK_PROVIDERS, get_mock_provider, record_response
+from llm_service.scheduler import compute_deadline, get_scheduler
 
-# Retrieve API keys
-HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # Hypothetical
+# Upper bound on in-flight requests for the batch helpers.
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("SLIDECRAFT_LLM_MAX_CONCURRENCY", "8"))
+
+# Seconds a single call may take, including rate-limit waits and retries.
+DEFAULT_DEADLINE = float(os.getenv("SLIDECRAFT_LLM_DEADLINE", "180"))
+
+# Output tokens assumed per request when charging the tokens-per-minute budget.
+DEFAULT_OUTPUT_TOKEN_ESTIMATE = 500
+
+# Routes every call to this provider when set, e.g. "mock" or "replay" to run
+# the apps and benchmarks without network access.
+PROVIDER_OVERRIDE = os.getenv("SLIDECRAFT_LLM_PROVIDER_OVERRIDE")
+
+# Prefixes of the error strings returned instead of raising; these are never cached.
+ERROR_PREFIXES = ("LLM Error:", "HuggingFace API Error:", "Claude API Error:", "Gemini API Error:")
+
+_dotenv_loaded = False
+
+
+def get_api_key(name):
+    """
+    Returns a provider API key from the environment. The .env file is loaded on
+    the first call rather than when this module is imported.
+    """
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
+    return os.getenv(name)
+
+
+def warm_provider_connections(providers=("openai",), background=True):
+    """
+    Pre-opens pooled keep-alive connections to the given providers.
+    Meant to be called at app start; providers already warmed are skipped.
+
+    :param providers: Provider names to warm ('openai', 'huggingface', 'claude', 'gemini').
+    :param background: Warm in a daemon thread instead of blocking the caller.
+    """
+    return warm_connections(list(providers), openai_api_key=get_api_key("OPENAI_API_KEY"), background=background)
 
 
 # Function to encode the image
@@ -31,116 +72,146 @@ def encode_image(image_path):
 #   import anthropic
 #   anthropic.Client(ANTHROPIC_API_KEY)
 
-def generate_llm_response(prompt, provider="openai", model="gpt-4o", temperature=0.7):
+def is_error_response(response):
+    """
+    Returns True if a response is one of the error strings produced by this module.
+    """
+    return isinstance(response, str) and response.startswith(ERROR_PREFIXES)
+
+
+def _resolve_provider(provider):
+    return PROVIDER_OVERRIDE or provider
+
+
+def _token_charge(provider, prompt, model=None, max_tokens=None):
+    """
+    Returns the tokens a request is charged against the provider's
+    tokens-per-minute budget: the prompt's token count plus the expected output.
+    """
+    prompt_tokens = count_tokens(prompt, model)
+    log_request_budget(provider, model, prompt_tokens, max_tokens)
+    return prompt_tokens + (max_tokens or DEFAULT_OUTPUT_TOKEN_ESTIMATE)
+
+
+def _refund_unused(provider, charged, usage):
+    """
+    Refunds the part of a request's charge that its reported ``usage`` (an
+    OpenAI-style object or dict) shows was not used. Missing usage is ignored.
+    """
+    if usage is None:
+        return
+    values = [usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)
+              for field in ("prompt_tokens", "completion_tokens")]
+    if all(isinstance(value, int) for value in values):
+        get_scheduler(provider).refund(charged, sum(values))
+
+
+def _response_cache(provider, use_cache):
+    """
+    Returns the response cache a call should use, or None. Simulated providers
+    bypass it unless configured to cache (see llm_service.mock).
+    """
+    if not use_cache:
+        return None
+    if provider.lower() in MOCK_PROVIDERS and not get_mock_provider(provider).cache_responses:
+        return None
+    return get_cache()
+
+
+def _scheduled(provider, prompt, send, deadline, model=None, max_tokens=None, tokens=None):
+    """
+    Runs send(timeout) through the provider's rate-limit and retry scheduler,
+    charging the prompt's token count plus the expected output. SDK results
+    reporting their usage get the unused part of the charge refunded.
+
+    :param tokens: The charge, if the caller computed it to refund it later itself.
+    """
+    if tokens is None:
+        tokens = _token_charge(provider, prompt, model, max_tokens)
+    result = get_scheduler(provider).run(send, tokens=tokens, deadline=deadline, timeout=get_registry().timeout)
+    _refund_unused(provider, tokens, getattr(result, "usage", None))
+    return result
+
+
+def _output_limit(max_tokens):
+    # Keyword arguments for the OpenAI SDK; omitted to keep the model's default.
+    return {"max_tokens": max_tokens} if max_tokens else {}
+
+
+def generate_llm_response(prompt, provider="openai", model="gpt-4o", temperature=0.7, use_cache=True,
+                          deadline=DEFAULT_DEADLINE, max_tokens=None):
     """
     Generates a response from various LLM providers (OpenAI, Hugging Face, Claude, Google Gemini).
+    Successful responses are served from and stored in the persistent response cache.
     
     :param prompt: The prompt or query string.
-    :param provider: Which LLM provider to use ('openai', 'huggingface', 'claude', 'gemini').
+    :param provider: Which LLM provider to use ('openai', 'huggingface', 'claude', 'gemini'), or
+                     'mock' / 'replay' to serve simulated or recorded responses (see llm_service.mock).
     :param model: Model name (e.g., 'gpt-4', 'gpt-4o', 'claude-v1', 'google-gemini', etc.).
     :param temperature: Sampling temperature (if applicable).
+    :param use_cache: Set to False to bypass the response cache for this call.
+    :param deadline: Seconds the call may take, including rate-limit waits and retries.
+    :param max_tokens: Cap on the response length in tokens, e.g. from llm_service.budget;
+                       None keeps the provider's default.
     :return: The text response from the LLM, or an error string if something fails.
     """
+    try:
+        provider = _resolve_provider(provider)
+        with span("llm.request", provider=provider.lower(), kind="text") as timer:
+            cache = _response_cache(provider, use_cache)
+            if cache is not None:
+                cache_key = cache.make_key(provider, model, temperature, prompt)
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    timer.set(outcome="cache_hit")
+                    return cached
+            
+            start = time.perf_counter()
+            response = _request_llm_response(prompt, provider, model, temperature, compute_deadline(deadline),
+                                             max_tokens)
+            if isinstance(response, str) and not is_error_response(response):
+                timer.set(outcome="ok")
+                record_response(provider, model, temperature, prompt, response, time.perf_counter() - start)
+                if cache is not None:
+                    cache.set(cache_key, response)
+            else:
+                timer.set(outcome="error")
+            return response
+    except Exception as e:
+        return f"LLM Error: {str(e)}"
+
+
+def _request_llm_response(prompt, provider, model, temperature, deadline=None, max_tokens=None):
     try:
         if provider.lower() == "openai":
             # Using OpenAI's official Python library
-            client = OpenAI(api_key=OPENAI_API_KEY)
-            response = client.chat.completions.create(
+            client = get_registry().get_openai_client(get_api_key("OPENAI_API_KEY"))
+            response = _scheduled("openai", prompt, lambda timeout: client.chat.completions.create(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=temperature,
-            )
+                timeout=timeout,
+                **_output_limit(max_tokens)
+            ), deadline, model, max_tokens)
+            record_usage("openai", model, response.usage)
             return response.choices[0].message.content
         
-        elif provider.lower() == "huggingface":
-            # Using Hugging Face Inference API
-            # Make sure to have HUGGINGFACE_API_KEY set in your environment
-            # and set your model endpoint, e.g., "bigscience/bloomz"
-            huggingface_url = f"https://api-inference.huggingface.co/models/{model}"
-            headers = {"Authorization": f"Bearer {HUGGINGFACE_API_KEY}"}
-            
-            payload = {
-                "inputs": prompt,
-                "parameters": {"temperature": temperature, "max_new_tokens": 300},
-                "options": {"wait_for_model": True}
-            }
-            
-            hf_response = requests.post(huggingface_url, headers=headers, json=payload)
-            if hf_response.status_code == 200:
-                data = hf_response.json()
-                # Some Hugging Face models return a list of generated texts
-                # You may need to adapt parsing logic for your specific model
-                if isinstance(data, list) and len(data) > 0 and "generated_text" in data[0]:
-                    return data[0]["generated_text"]
-                else:
-                    return str(data)
-            else:
-                return f"HuggingFace API Error: {hf_response.text}"
+        elif provider.lower() in MOCK_PROVIDERS:
+            # Simulated latency and failures, paced and retried like a real provider.
+            mock = get_mock_provider(provider)
+            entry = mock.lookup(prompt, model, temperature)
+            return _scheduled(provider.lower(), prompt, lambda timeout: mock.complete(
+                prompt, model, temperature, timeout, entry=entry
+            ), deadline, model, max_tokens)
         
-        elif provider.lower() == "claude":
-            # Using Anthropic's API for Claude
-            # The code snippet below is illustrative; official usage may differ
-            # https://github.com/anthropics/anthropic-sdk-python
-            # import anthropic
-            # client = anthropic.Client(api_key=ANTHROPIC_API_KEY)
-            
-            # Hypothetical usage:
-            # conversation = anthropic.ChatCompletion(
-            #     model=model,
-            #     messages=[{"role": "user", "content": prompt}],
-            #     temperature=temperature
-            # )
-            # return conversation["completion"]
-            
-            # We'll simulate a direct request for demonstration:
-            # (Replace with actual library usage or requests to Claude's endpoint.)
-            
-            claude_url = "https://api.anthropic.com/v1/complete"  # Example endpoint
-            headers = {"x-api-key": ANTHROPIC_API_KEY, "Content-Type": "application/json"}
-            data = {
-                "model": model,
-                "prompt": f"\n\nHuman: {prompt}\n\nAssistant:",
-                "max_tokens_to_sample": 300,
-                "temperature": temperature,
-            }
-            
-            claude_response = requests.post(claude_url, headers=headers, json=data)
-            if claude_response.status_code == 200:
-                res_json = claude_response.json()
-                # The exact response structure depends on Anthropic's API
-                if "completion" in res_json:
-                    return res_json["completion"]
-                else:
-                    return str(res_json)
-            else:
-                return f"Claude API Error: {claude_response.text}"
-        
-        elif provider.lower() == "gemini":
-            # Hypothetical usage for Google Gemini
-            # There's currently no official Python library or public endpoint for Gemini at time of writing.
-            # Below is a placeholder to illustrate usage.
-            
-            # Example usage with PaLM or hypothetical Gemini endpoint:
-            gemini_url = f"https://generativelanguage.googleapis.com/v1beta2/models/{model}:generateText"
-            headers = {
-                "Authorization": f"Bearer {GEMINI_API_KEY}",
-                "Content-Type": "application/json"
-            }
-            data = {
-                "prompt": {"text": prompt},
-                "temperature": temperature,
-                "candidate_count": 1
-            }
-            gemini_response = requests.post(gemini_url, headers=headers, json=data)
-            if gemini_response.status_code == 200:
-                res_json = gemini_response.json()
-                # Hypothetical response structure
-                if "candidates" in res_json and len(res_json["candidates"]) > 0:
-                    return res_json["candidates"][0].get("output", "")
-                else:
-                    return str(res_json)
-            else:
-                return f"Gemini API Error: {gemini_response.text}"
+        elif provider.lower() in HTTP_PROVIDERS:
+            # Hugging Face, Claude and Gemini are called over plain HTTP.
+            url, headers, payload = _http_request(provider.lower(), prompt, model, temperature, max_tokens)
+            session = get_registry().get_session(provider)
+            http_response = _scheduled(provider.lower(), prompt, lambda timeout: session.post(
+                url, headers=headers, json=payload, timeout=timeout
+            ), deadline, model, max_tokens)
+            return _http_response_text(provider.lower(), http_response)
         
         else:
             return "LLM Error: Unknown provider specified."
@@ -148,8 +219,343 @@ def generate_llm_response(prompt, provider="openai", model="gpt-4o", temperature
     except Exception as e:
         return f"LLM Error: {str(e)}"
     
+
+def _huggingface_request(prompt, model, temperature, max_tokens=None):
+    # Using Hugging Face Inference API
+    # Make sure to have HUGGINGFACE_API_KEY set in your environment
+    # and set your model endpoint, e.g., "bigscience/bloomz"
+    huggingface_url = f"https://api-inference.huggingface.co/models/{model}"
+    headers = {"Authorization": f"Bearer {get_api_key('HUGGINGFACE_API_KEY')}"}
+    payload = {
+        "inputs": prompt,
+        "parameters": {"temperature": temperature, "max_new_tokens": max_tokens or 300},
+        "options": {"wait_for_model": True}
+    }
+    return huggingface_url, headers, payload
+
+
+def _huggingface_text(hf_response):
+    if hf_response.status_code == 200:
+        data = hf_response.json()
+        # Some Hugging Face models return a list of generated texts
+        # You may need to adapt parsing logic for your specific model
+        if isinstance(data, list) and len(data) > 0 and "generated_text" in data[0]:
+            return data[0]["generated_text"]
+        else:
+            return str(data)
+    else:
+        return f"HuggingFace API Error: {hf_response.text}"
+
+
+def _claude_request(prompt, model, temperature, max_tokens=None):
+    # Using Anthropic's API for Claude
+    # The code snippet below is illustrative; official usage may differ
+    # https://github.com/anthropics/anthropic-sdk-python
+    # We simulate a direct request for demonstration:
+    # (Replace with actual library usage or requests to Claude's endpoint.)
+    claude_url = "https://api.anthropic.com/v1/complete"  # Example endpoint
+    headers = {"x-api-key": get_api_key("ANTHROPIC_API_KEY"), "Content-Type": "application/json"}
+    data = {
+        "model": model,
+        "prompt": f"\n\nHuman: {prompt}\n\nAssistant:",
+        "max_tokens_to_sample": max_tokens or 300,
+        "temperature": temperature,
+    }
+    return claude_url, headers, data
+
+
+def _claude_text(claude_response):
+    if claude_response.status_code == 200:
+        res_json = claude_response.json()
+        # The exact response structure depends on Anthropic's API
+        if "completion" in res_json:
+            return res_json["completion"]
+        else:
+            return str(res_json)
+    else:
+        return f"Claude API Error: {claude_response.text}"
+
+
+def _gemini_request(prompt, model, temperature, max_tokens=None):
+    # Hypothetical usage for Google Gemini
+    # There's currently no official Python library or public endpoint for Gemini at time of writing.
+    # Below is a placeholder to illustrate usage with PaLM or a hypothetical Gemini endpoint.
+    gemini_url = f"https://generativelanguage.googleapis.com/v1beta2/models/{model}:generateText"
+    headers = {
+        "Authorization": f"Bearer {get_api_key('GEMINI_API_KEY')}",
+        "Content-Type": "application/json"
+    }
+    data = {
+        "prompt": {"text": prompt},
+        "temperature": temperature,
+        "candidate_count": 1
+    }
+    if max_tokens:
+        data["max_output_tokens"] = max_tokens
+    return gemini_url, headers, data
+
+
+def _gemini_text(gemini_response):
+    if gemini_response.status_code == 200:
+        res_json = gemini_response.json()
+        # Hypothetical response structure
+        if "candidates" in res_json and len(res_json["candidates"]) > 0:
+            return res_json["candidates"][0].get("output", "")
+        else:
+            return str(res_json)
+    else:
+        return f"Gemini API Error: {gemini_response.text}"
+
+
+# Request builders and response parsers of the providers called over plain HTTP.
+# They work on requests and httpx responses alike, so the sync and async
+# entry points (llm_service.async_generator) build and parse requests the same way.
+HTTP_PROVIDERS = {
+    "huggingface": (_huggingface_request, _huggingface_text),
+    "claude": (_claude_request, _claude_text),
+    "gemini": (_gemini_request, _gemini_text),
+}
+
+
+def _http_request(provider, prompt, model, temperature, max_tokens=None):
+    """
+    Returns (url, headers, JSON payload) of a request to an HTTP provider.
+    """
+    return HTTP_PROVIDERS[provider][0](prompt, model, temperature, max_tokens)
+
+
+def _http_response_text(provider, response):
+    """
+    Returns the text of an HTTP provider's response, or its error string.
+    """
+    return HTTP_PROVIDERS[provider][1](response)
+
+
+def generate_llm_responses_batch(prompts, provider="openai", model="gpt-4o", temperature=0.7,
+                                 max_concurrency=DEFAULT_MAX_CONCURRENCY, progress_callback=None,
+                                 use_cache=True, deadline=DEFAULT_DEADLINE, max_tokens=None):
+    """
+    Runs generate_llm_response for many prompts concurrently on a bounded thread pool.
+    
+    :param prompts: Iterable of prompt strings.
+    :param provider: Which LLM provider to use ('openai', 'huggingface', 'claude', 'gemini').
+    :param model: Model name.
+    :param temperature: Sampling temperature (if applicable).
+    :param max_concurrency: Maximum number of requests in flight at once.
+    :param progress_callback: Optional callable invoked as progress_callback(completed, total)
+                              after each item finishes. It runs on the calling thread, so it
+                              may safely update Streamlit elements.
+    :param use_cache: Set to False to bypass the response cache for every item.
+    :param deadline: Seconds each item may take, including rate-limit waits and retries.
+    :param max_tokens: Cap on each response's length in tokens; None keeps the provider's default.
+    :return: A list of responses in the same order as prompts. A failing item yields an
+             "LLM Error: ..." string without affecting the others.
+    """
+    prompts = list(prompts)
+    total = len(prompts)
+    results = [None] * total
+    if total == 0:
+        return results
+    
+    workers = max(1, min(int(max_concurrency), total))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-batch") as executor:
+        futures = {
+            executor.submit(bind_context(generate_llm_response), prompt, provider, model, temperature, use_cache,
+                            deadline, max_tokens): index
+            for index, prompt in enumerate(prompts)
+        }
+        for completed, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                results[index] = f"LLM Error: {str(e)}"
+            if progress_callback is not None:
+                progress_callback(completed, total)
+    return results
+
+
+def stream_llm_response(prompt, provider="openai", model="gpt-4o", temperature=0.7, use_cache=True,
+                        deadline=DEFAULT_DEADLINE, max_tokens=None):
+    """
+    Streaming variant of generate_llm_response that yields text chunks as they arrive.
+    OpenAI, Hugging Face (text-generation-inference) and Claude stream over server-sent
+    events; Gemini does not, so its full response is yielded as a single chunk.
+    Cached responses are yielded at once, and completed streams are stored in the cache.
+    
+    :param prompt: The prompt or query string.
+    :param provider: Which LLM provider to use ('openai', 'huggingface', 'claude', 'gemini').
+    :param model: Model name.
+    :param temperature: Sampling temperature (if applicable).
+    :param use_cache: Set to False to bypass the response cache for this call.
+    :param deadline: Seconds allowed to open the stream, including rate-limit waits and retries.
+    :param max_tokens: Cap on the response length in tokens; None keeps the provider's default.
+    :return: A generator of text chunks. Failures are yielded as an "LLM Error: ..." chunk.
+    """
+    try:
+        provider = _resolve_provider(provider)
+        with span("llm.request", provider=provider.lower(), kind="stream") as timer:
+            cache = _response_cache(provider, use_cache)
+            if cache is not None:
+                cache_key = cache.make_key(provider, model, temperature, prompt)
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    timer.set(outcome="cache_hit")
+                    yield cached
+                    return
+            
+            start = time.perf_counter()
+            parts = []
+            for chunk in _stream_llm_chunks(prompt, provider, model, temperature, compute_deadline(deadline),
+                                            max_tokens):
+                parts.append(chunk)
+                yield chunk
+            response = "".join(parts)
+            if response and not is_error_response(response):
+                timer.set(outcome="ok")
+                record_response(provider, model, temperature, prompt, response, time.perf_counter() - start)
+                if cache is not None:
+                    cache.set(cache_key, response)
+            else:
+                timer.set(outcome="error")
+    except Exception as e:
+        yield f"LLM Error: {str(e)}"
+
+
+def _stream_llm_chunks(prompt, provider, model, temperature, deadline=None, max_tokens=None):
+    registry = get_registry()
+    if provider.lower() == "openai":
+        client = registry.get_openai_client(get_api_key("OPENAI_API_KEY"))
+        # Kept to refund against once the final chunk reports the usage.
+        tokens = _token_charge("openai", prompt, model, max_tokens)
+        stream = _scheduled("openai", prompt, lambda timeout: client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+            timeout=timeout,
+            **_output_limit(max_tokens)
+        ), deadline, model, max_tokens, tokens)
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if getattr(chunk, "usage", None) is not None:
+                # Sent in a final chunk without choices.
+                record_usage("openai", model, chunk.usage)
+                _refund_unused("openai", tokens, chunk.usage)
+    
+    elif provider.lower() in MOCK_PROVIDERS:
+        mock = get_mock_provider(provider)
+        entry = mock.lookup(prompt, model, temperature)
+        yield from _scheduled(provider.lower(), prompt, lambda timeout: mock.open_stream(
+            prompt, model, temperature, timeout, entry=entry
+        ), deadline, model, max_tokens)
     
-def generate_image_description(image_path, prompt,provider="openai", model="gpt-4o-mini",temperature=0.7):
+    elif provider.lower() == "huggingface":
+        huggingface_url, headers, payload = _huggingface_request(prompt, model, temperature, max_tokens)
+        payload["stream"] = True
+        session = registry.get_session("huggingface")
+        with _scheduled("huggingface", prompt, lambda timeout: session.post(
+            huggingface_url, headers=headers, json=payload, timeout=timeout, stream=True
+        ), deadline, model, max_tokens) as hf_response:
+            if hf_response.status_code != 200:
+                yield f"HuggingFace API Error: {hf_response.text}"
+                return
+            for event in _iter_sse_events(hf_response):
+                token = event.get("token", {})
+                if token.get("text") and not token.get("special", False):
+                    yield token["text"]
+    
+    elif provider.lower() == "claude":
+        claude_url, headers, data = _claude_request(prompt, model, temperature, max_tokens)
+        data["stream"] = True
+        session = registry.get_session("claude")
+        with _scheduled("claude", prompt, lambda timeout: session.post(
+            claude_url, headers=headers, json=data, timeout=timeout, stream=True
+        ), deadline, model, max_tokens) as claude_response:
+            if claude_response.status_code != 200:
+                yield f"Claude API Error: {claude_response.text}"
+                return
+            for event in _iter_sse_events(claude_response):
+                if event.get("completion"):
+                    yield event["completion"]
+    
+    else:
+        # No streaming endpoint; deliver the whole response as one chunk.
+        yield _request_llm_response(prompt, provider, model, temperature, deadline, max_tokens)
+
+
+def _iter_sse_events(response):
+    """
+    Yields the decoded JSON payload of each ``data:`` line of a server-sent events response.
+    """
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        payload = line[len("data:"):].strip()
+        if payload == "[DONE]":
+            break
+        try:
+            yield json.loads(payload)
+        except ValueError:
+            continue
+
+
+def stream_llm_responses_batch(prompts, provider="openai", model="gpt-4o", temperature=0.7,
+                               max_concurrency=DEFAULT_MAX_CONCURRENCY, use_cache=True,
+                               deadline=DEFAULT_DEADLINE, max_tokens=None):
+    """
+    Streams many prompts concurrently on a bounded thread pool, interleaving their chunks.
+    
+    Chunks are yielded as (index, chunk) tuples on the calling thread, so the consumer
+    may update Streamlit elements directly. Each prompt's stream is terminated by an
+    (index, None) tuple.
+    
+    :param prompts: Iterable of prompt strings.
+    :param provider: Which LLM provider to use ('openai', 'huggingface', 'claude', 'gemini').
+    :param model: Model name.
+    :param temperature: Sampling temperature (if applicable).
+    :param max_concurrency: Maximum number of streams open at once.
+    :param use_cache: Set to False to bypass the response cache for every item.
+    :param deadline: Seconds allowed to open each stream, including rate-limit waits and retries.
+    :param max_tokens: Cap on each response's length in tokens; None keeps the provider's default.
+    """
+    prompts = list(prompts)
+    if not prompts:
+        return
+    
+    events = queue.Queue()
+    
+    def _worker(index, prompt):
+        try:
+            for chunk in stream_llm_response(prompt, provider, model, temperature, use_cache, deadline, max_tokens):
+                events.put((index, chunk))
+        finally:
+            events.put((index, None))
+    
+    workers = max(1, min(int(max_concurrency), len(prompts)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-stream")
+    futures = []
+    try:
+        for index, prompt in enumerate(prompts):
+            futures.append(executor.submit(bind_context(_worker), index, prompt))
+        remaining = len(prompts)
+        while remaining:
+            index, chunk = events.get()
+            if chunk is None:
+                remaining -= 1
+            yield index, chunk
+    finally:
+        # If the consumer stops early, drop the streams that have not started yet
+        # (shutdown's cancel_futures needs Python 3.9).
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def generate_image_description(image_path, prompt,provider="openai", model="gpt-4o-mini",temperature=0.7,
+                               deadline=DEFAULT_DEADLINE):
     """
     Generates an image description using OpenAI's API.
     Since OpenAI's API does not accept image binary directly for captioning,
@@ -159,14 +565,17 @@ def generate_image_description(image_path, prompt,provider="openai", model="gpt-
     :param provider: LLM provider, default 'openai'.
     :param model: LLM model name.
     :param temperature: Sampling temperature.
+    :param deadline: Seconds the call may take, including rate-limit waits and retries.
     :return: A generated caption describing the image.
     """
-    client = OpenAI(api_key=OPENAI_API_KEY) 
+    client = get_registry().get_openai_client(get_api_key("OPENAI_API_KEY"))
     
     image_path = image_path
     base64_image = encode_image(image_path)
-    response = client.chat.completions.create(
+    with span("llm.request", provider="openai", kind="image"):
+        response = _scheduled("openai", prompt, lambda timeout: client.chat.completions.create(
                                             model=model,
+                                            timeout=timeout,
                                             messages=[
                                                                     {
                                                                         "role": "user",
@@ -182,25 +591,80 @@ def generate_image_description(image_path, prompt,provider="openai", model="gpt-
                                                                         ],
                                                                     }
                                                                 ],
-                                                            )
-
+                                                            ), compute_deadline(deadline), model)
+    record_usage("openai", model, response.usage)
+    return response.choices[0].message.content
 
 
-    return response.choices[0].message.content
 
+def generate_llm_json(prompt,event,provider="openai", model="gpt-4o-2024-08-06",temperature=0.7, use_cache=True,
+                      deadline=DEFAULT_DEADLINE, max_tokens=None):
+    """
+    Generates a structured response parsed into the pydantic model ``event``.
+    Successful responses are served from and stored in the persistent response cache,
+    keyed on the model's JSON schema as well as the request.
+    
+    :param prompt: The prompt or query string.
+    :param event: Pydantic model class describing the expected response.
+    :param provider: LLM provider; only 'openai' supports structured output. 'mock' and 'replay'
+                     serve simulated or recorded responses (see llm_service.mock).
+    :param model: Model name.
+    :param temperature: Sampling temperature.
+    :param use_cache: Set to False to bypass the response cache for this call.
+    :param deadline: Seconds the call may take, including rate-limit waits and retries.
+    :param max_tokens: Cap on the response length in tokens; None keeps the provider's default.
+    :return: An instance of ``event``, or an error string if something fails.
+    """
+    try:
+        provider = _resolve_provider(provider)
+        with span("llm.request", provider=provider.lower(), kind="json") as timer:
+            cache = _response_cache(provider, use_cache)
+            if cache is not None:
+                cache_key = cache.make_key(provider, model, temperature, prompt, schema=event.model_json_schema())
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    timer.set(outcome="cache_hit")
+                    return event.model_validate_json(cached)
+            
+            start = time.perf_counter()
+            parsed = _request_llm_json(prompt, event, provider, model, temperature, compute_deadline(deadline),
+                                       max_tokens)
+            if isinstance(parsed, event):
+                timer.set(outcome="ok")
+                serialized = parsed.model_dump_json()
+                record_response(provider, model, temperature, prompt, serialized, time.perf_counter() - start,
+                                structured=True)
+                if cache is not None:
+                    cache.set(cache_key, serialized)
+            else:
+                timer.set(outcome="error")
+            return parsed
+    except Exception as e:
+        return f"LLM Error: {str(e)}"
 
 
-def generate_llm_json(prompt,event,provider="openai", model="gpt-4o-2024-08-06",temperature=0.7):
+def _request_llm_json(prompt, event, provider, model, temperature, deadline=None, max_tokens=None):
     try:
         if provider.lower() == "openai":
-            client = OpenAI(api_key=OPENAI_API_KEY)
-            completion = client.beta.chat.completions.parse(
+            client = get_registry().get_openai_client(get_api_key("OPENAI_API_KEY"))
+            completion = _scheduled("openai", prompt, lambda timeout: client.beta.chat.completions.parse(
             model=model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=temperature,
             response_format=event,
-            )
+            timeout=timeout,
+            **_output_limit(max_tokens)
+            ), deadline, model, max_tokens)
+            record_usage("openai", model, completion.usage)
             return completion.choices[0].message.parsed
+        elif provider.lower() in MOCK_PROVIDERS:
+            mock = get_mock_provider(provider)
+            entry = mock.lookup(prompt, model, temperature, structured=True)
+            return _scheduled(provider.lower(), prompt, lambda timeout: mock.complete_json(
+                prompt, event, model, temperature, timeout, entry=entry
+            ), deadline, model, max_tokens)
+        else:
+            return "LLM Error: Unknown provider specified."
     except Exception as e:
         return f"LLM Error: {str(e)}"
     
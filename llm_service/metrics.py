@@ -0,0 +1,348 @@
+import os
+import json
+import time
+import bisect
+import threading
+import contextvars
+
+# In-process metrics are on by default; they cost a clock read and a dict update per span.
+METRICS_ENABLED = os.getenv("SLIDECRAFT_METRICS", "1").lower() not in ("0", "false", "no", "off")
+
+# Optional exports: every span as a JSON line, and a Prometheus text file
+# (e.g. for node_exporter's textfile collector) rewritten after each run.
+JSONL_PATH = os.getenv("SLIDECRAFT_METRICS_JSONL")
+PROMETHEUS_PATH = os.getenv("SLIDECRAFT_METRICS_PROMETHEUS")
+
+# Upper bounds in seconds of the stage duration histogram buckets.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current_run = contextvars.ContextVar("slidecraft_metrics_run", default=None)
+
+
+class MetricsRegistry:
+    """
+    Process-wide aggregates of stage durations and counters, labelled by stage
+    and e.g. provider.
+
+    Durations are kept as Prometheus-style histograms (count, sum and cumulative
+    buckets); counters are plain totals such as tokens used.
+
+    :param buckets: Histogram bucket upper bounds in seconds.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, stage, seconds, labels=None):
+        key = (stage, _label_items(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0, 0.0, [0] * len(self.buckets)]
+            histogram[0] += 1
+            histogram[1] += seconds
+            index = bisect.bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                histogram[2][index] += 1
+
+    def increment(self, name, amount=1, labels=None):
+        key = (name, _label_items(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def snapshot(self):
+        """
+        Returns the stage totals and counters as JSON-serialisable lists.
+        """
+        with self._lock:
+            stages = [{"stage": stage, "labels": dict(labels), "count": histogram[0], "seconds": histogram[1]}
+                      for (stage, labels), histogram in sorted(self._histograms.items())]
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+        return {"stages": stages, "counters": counters}
+
+    def render_prometheus(self, prefix="slidecraft"):
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        lines = [f"# HELP {prefix}_stage_seconds Duration of instrumented stages.",
+                 f"# TYPE {prefix}_stage_seconds histogram"]
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        for (stage, labels), (observations, total, buckets) in histograms:
+            base = (("stage", stage),) + labels
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, buckets):
+                cumulative += bucket_count
+                lines.append(f"{prefix}_stage_seconds_bucket{_format_labels(base + (('le', repr(bound)),))} "
+                             f"{cumulative}")
+            lines.append(f"{prefix}_stage_seconds_bucket{_format_labels(base + (('le', '+Inf'),))} {observations}")
+            lines.append(f"{prefix}_stage_seconds_sum{_format_labels(base)} {total}")
+            lines.append(f"{prefix}_stage_seconds_count{_format_labels(base)} {observations}")
+        declared = set()
+        for (name, labels), value in counters:
+            metric = f"{prefix}_{name.replace('.', '_')}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Atomically replaces ``path`` with the Prometheus text of every metric.
+        """
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as prometheus_file:
+            prometheus_file.write(self.render_prometheus())
+        os.replace(temp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+class MetricsRun:
+    """
+    Breakdown of one unit of work, e.g. a Generate click: the time spent in
+    each stage and the counters recorded while it was the current run, in this
+    thread or in threads started through bind_context.
+
+    :param name: Name of the run, e.g. 'generate'.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.wall_seconds = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+        self._token = None
+
+    def add_stage(self, stage, seconds, labels=None, calls=1):
+        key = (stage, _label_items(labels))
+        with self._lock:
+            totals = self._stages.setdefault(key, [0, 0.0])
+            totals[0] += calls
+            totals[1] += seconds
+
+    def add_count(self, name, amount, labels=None):
+        key = (name, _label_items(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def finish(self):
+        if self.wall_seconds is None:
+            self.wall_seconds = time.perf_counter() - self._start
+        return self.wall_seconds
+
+    def summary(self):
+        """
+        Returns the run as a dict: its wall time, each stage's count and total
+        seconds (slowest first) and its counters. Nested stages, such as chart
+        building within slide rendering, are also counted in their parent.
+        """
+        with self._lock:
+            stages = [{"stage": stage, "labels": dict(labels), "count": calls, "seconds": seconds}
+                      for (stage, labels), (calls, seconds) in self._stages.items()]
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+        stages.sort(key=lambda item: item["seconds"], reverse=True)
+        wall = self.wall_seconds if self.wall_seconds is not None else time.perf_counter() - self._start
+        return {"run": self.name, "started": self.started, "wall_seconds": wall,
+                "stages": stages, "counters": counters}
+
+
+class Span:
+    """
+    Times a stage as a context manager. Labels known only during the stage, such
+    as its outcome, are added with set().
+    """
+
+    __slots__ = ("stage", "labels", "seconds", "_start")
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+        self.seconds = None
+
+    def set(self, **labels):
+        self.labels.update(labels)
+        return self
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self._start
+        if exc_type is not None and "outcome" not in self.labels:
+            self.labels["outcome"] = "exception"
+        record_stage(self.stage, self.seconds, self.labels)
+        return False
+
+
+class _DisabledSpan(Span):
+    __slots__ = ()
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def span(stage, **labels):
+    """
+    Returns a context manager timing ``stage``, e.g.
+
+        with span("render.save"):
+            prs.save(output)
+    """
+    if not METRICS_ENABLED:
+        return _DisabledSpan(stage, labels)
+    return Span(stage, labels)
+
+
+def record_stage(stage, seconds, labels=None):
+    """
+    Records a stage duration in the registry, the current run and the JSONL export.
+    """
+    if not METRICS_ENABLED:
+        return
+    _registry.observe(stage, seconds, labels)
+    run = _current_run.get()
+    if run is not None:
+        run.add_stage(stage, seconds, labels)
+    if JSONL_PATH:
+        _write_jsonl({"type": "span", "ts": time.time(), "stage": stage, "seconds": round(seconds, 6),
+                      "labels": labels or {}, "run": run.name if run is not None else None})
+
+
+def count(name, amount=1, **labels):
+    """
+    Adds ``amount`` to a counter in the registry and the current run.
+    """
+    if not METRICS_ENABLED or not amount:
+        return
+    _registry.increment(name, amount, labels)
+    run = _current_run.get()
+    if run is not None:
+        run.add_count(name, amount, labels)
+
+
+def record_usage(provider, model, usage):
+    """
+    Counts the prompt and completion tokens reported in a response's ``usage``
+    (an OpenAI-style object or dict). Missing usage is ignored.
+    """
+    if usage is None:
+        return
+    for field, kind in (("prompt_tokens", "prompt"), ("completion_tokens", "completion")):
+        value = usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)
+        if isinstance(value, int):
+            count("llm.tokens", value, provider=provider, model=model, type=kind)
+
+
+def start_run(name):
+    """
+    Starts a run and makes it current in this context, replacing any previous
+    run. Stages and counters recorded until finish_run are added to it.
+    """
+    run = MetricsRun(name)
+    run._token = _current_run.set(run)
+    return run
+
+
+def finish_run(run, export=True):
+    """
+    Ends a run, exports its summary and returns it.
+
+    :param export: Whether to write the run and the registry to the configured
+                   exports; off for runs whose summary is passed on to another process.
+    """
+    run.finish()
+    if _current_run.get() is run:
+        try:
+            _current_run.reset(run._token)
+        except ValueError:
+            # Started in another context.
+            _current_run.set(None)
+    if METRICS_ENABLED and export:
+        if JSONL_PATH:
+            _write_jsonl(dict(run.summary(), type="run"))
+        if PROMETHEUS_PATH:
+            _registry.write_prometheus(PROMETHEUS_PATH)
+    return run
+
+
+def current_run():
+    return _current_run.get()
+
+
+def add_stages(stages):
+    """
+    Adds stage totals recorded in another process, as listed in the "stages" of
+    a run summary, to the current run. They are not added to the registry, as
+    only totals are known.
+    """
+    run = _current_run.get()
+    if run is None:
+        return
+    for item in stages:
+        run.add_stage(item["stage"], item["seconds"], item["labels"], calls=item["count"])
+
+
+def bind_context(fn):
+    """
+    Wraps ``fn`` to run in a copy of the caller's context, so spans recorded in
+    executor threads are added to the caller's current run.
+    """
+    context = contextvars.copy_context()
+
+    def _run_in_context(*args, **kwargs):
+        # A context can only be entered by one thread at a time.
+        return context.copy().run(fn, *args, **kwargs)
+    return _run_in_context
+
+
+def get_metrics():
+    """
+    Returns the process-wide metrics registry.
+    """
+    return _registry
+
+
+def _label_items(labels):
+    if not labels:
+        return ()
+    return tuple(sorted((str(key), str(value)) for key, value in labels.items()))
+
+
+def _format_labels(items):
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in items) + "}"
+
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registry = MetricsRegistry()
+_jsonl_lock = threading.Lock()
+_jsonl_file = None
+
+
+def _write_jsonl(event):
+    global _jsonl_file
+    line = json.dumps(event, default=str)
+    with _jsonl_lock:
+        if _jsonl_file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(JSONL_PATH)), exist_ok=True)
+            _jsonl_file = open(JSONL_PATH, "a", encoding="utf-8", buffering=1)
+        _jsonl_file.write(line + "\n")
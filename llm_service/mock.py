@@ -0,0 +1,494 @@
+import os
+import json
+import math
+import time
+import random
+import asyncio
+import hashlib
+import threading
+
+# Simulated providers served by this module instead of a network endpoint.
+MOCK_PROVIDERS = ("mock", "replay")
+
+# Cassette (JSON lines) that mock and replay calls are served from.
+DEFAULT_CASSETTE_PATH = os.getenv("SLIDECRAFT_LLM_CASSETTE")
+
+# When set, successful live responses are appended to this cassette.
+RECORD_PATH = os.getenv("SLIDECRAFT_LLM_RECORD")
+
+# Latency of a simulated call, e.g. "fixed:0.2", "uniform:0.1,0.8",
+# "normal:0.6,0.2", "lognormal:0.6,0.5" (median, sigma) or "exponential:0.6" (mean).
+DEFAULT_LATENCY = os.getenv("SLIDECRAFT_MOCK_LATENCY", "fixed:0")
+DEFAULT_LATENCY_SCALE = float(os.getenv("SLIDECRAFT_MOCK_LATENCY_SCALE", "1.0"))
+
+# Fraction of simulated attempts that fail, and the HTTP statuses they fail with.
+DEFAULT_ERROR_RATE = float(os.getenv("SLIDECRAFT_MOCK_ERROR_RATE", "0"))
+DEFAULT_ERROR_STATUSES = tuple(int(status) for status in
+                               os.getenv("SLIDECRAFT_MOCK_ERROR_STATUSES", "429,503").split(","))
+
+DEFAULT_SEED = os.getenv("SLIDECRAFT_MOCK_SEED")
+
+# Whether simulated responses are served from and stored in the response cache.
+# Off by default, so they never mix with live responses; benchmarks turn it on.
+DEFAULT_CACHE_RESPONSES = os.getenv("SLIDECRAFT_MOCK_CACHE", "0").lower() in ("1", "true", "yes")
+
+# Share of a simulated call's latency spent before the first streamed chunk.
+FIRST_CHUNK_FRACTION = 0.3
+
+# Items generated for list fields of structured mock responses.
+MOCK_LIST_LENGTH = 3
+
+# Default ``entry`` of the MockProvider calls: look the request up in the cassette.
+LOOKUP = object()
+
+
+class MockProviderError(Exception):
+    """
+    A simulated provider failure. It carries an HTTP status code (and a
+    Retry-After header for 429s), so the scheduler retries it exactly like a
+    real provider error.
+    """
+
+    def __init__(self, status_code, message, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = _MockHTTPResponse({} if retry_after is None else {"retry-after": str(retry_after)})
+
+
+class _MockHTTPResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class CassetteMiss(LookupError):
+    """
+    Raised by the replay provider when a cassette has no response for a request.
+    """
+
+
+class LatencyModel:
+    """
+    Distribution of simulated call latencies in seconds.
+
+    :param kind: 'fixed', 'uniform', 'normal', 'lognormal' or 'exponential'.
+    :param params: Distribution parameters: (seconds,), (low, high), (mean, stddev),
+                   (median, sigma) and (mean,) respectively.
+    :param scale: Factor applied to every sample, e.g. 0.1 to replay ten times faster.
+    """
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+    def __init__(self, kind="fixed", params=(0.0,), scale=DEFAULT_LATENCY_SCALE):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.params = tuple(float(param) for param in params)
+        self.scale = scale
+
+    @classmethod
+    def parse(cls, spec, scale=DEFAULT_LATENCY_SCALE):
+        """
+        Builds a model from a spec such as "lognormal:0.6,0.5". A bare number is
+        a fixed latency.
+        """
+        spec = str(spec).strip()
+        kind, _, params = spec.partition(":")
+        if not params:
+            return cls("fixed", (float(kind),), scale)
+        return cls(kind.strip().lower(), [param for param in params.split(",")], scale)
+
+    def sample(self, rng):
+        if self.kind == "fixed":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(self.params[0], self.params[1])
+        elif self.kind == "normal":
+            value = rng.gauss(self.params[0], self.params[1])
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(math.log(max(self.params[0], 1e-9)), self.params[1])
+        else:
+            value = rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        return max(0.0, value * self.scale)
+
+    def __repr__(self):
+        return f"LatencyModel({self.kind!r}, {self.params!r}, scale={self.scale!r})"
+
+
+class Cassette:
+    """
+    Recorded LLM responses stored as JSON lines, one request per line:
+
+        {"provider": "openai", "model": "gpt-4o", "temperature": 0.7,
+         "prompt": "...", "structured": false, "response": "...", "latency": 1.84}
+
+    Structured responses hold the parsed object (or its JSON text) in
+    ``response``. A request is matched on model, temperature, prompt and whether
+    it is structured, falling back to the prompt alone, so a cassette recorded
+    against one provider replays under another and hand-written entries only
+    need a prompt and a response. Several entries for the same request are
+    served in turn.
+
+    :param path: Cassette file; it is created on the first recorded response.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None
+        self._served = {}
+
+    @staticmethod
+    def request_key(model, temperature, prompt, structured):
+        material = json.dumps([model, temperature, hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+                               bool(structured)])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def prompt_key(prompt, structured):
+        return Cassette.request_key(None, None, prompt, structured)
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return sum(len(entries) for key, entries in self._entries.items() if key[0] == "request")
+
+    def lookup(self, model, temperature, prompt, structured=False):
+        """
+        Returns the next recorded entry for a request, or None if there is none.
+        """
+        with self._lock:
+            self._load()
+            for key in (("request", self.request_key(model, temperature, prompt, structured)),
+                        ("prompt", self.prompt_key(prompt, structured))):
+                entries = self._entries.get(key)
+                if entries:
+                    served = self._served.get(key, 0)
+                    self._served[key] = served + 1
+                    return entries[served % len(entries)]
+        return None
+
+    def record(self, provider, model, temperature, prompt, response, latency=None, structured=False):
+        """
+        Appends a response to the cassette file and makes it available for lookup.
+        """
+        entry = {
+            "provider": provider,
+            "model": model,
+            "temperature": temperature,
+            "prompt": prompt,
+            "structured": bool(structured),
+            "response": json.loads(response) if structured else response,
+            "latency": None if latency is None else round(latency, 4),
+            "recorded_at": time.time(),
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as cassette_file:
+                cassette_file.write(line + "\n")
+            if self._entries is not None:
+                self._add(entry)
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as cassette_file:
+            for line in cassette_file:
+                line = line.strip()
+                if line:
+                    self._add(json.loads(line))
+
+    def _add(self, entry):
+        structured = entry.get("structured", False)
+        keys = [("prompt", self.prompt_key(entry["prompt"], structured))]
+        if "model" in entry:
+            keys.append(("request", self.request_key(entry["model"], entry.get("temperature"),
+                                                     entry["prompt"], structured)))
+        for key in keys:
+            self._entries.setdefault(key, []).append(entry)
+
+
+class MockProvider:
+    """
+    A network-free LLM provider for load tests and benchmarks.
+
+    'mock' answers every request: from the cassette when it has a matching
+    entry, otherwise with a deterministic response derived from the prompt
+    (structured requests get a schema-valid instance of the response model).
+    'replay' only serves the cassette and fails with CassetteMiss otherwise.
+
+    Each attempt sleeps for a latency drawn from ``latency`` (replayed entries
+    use their recorded latency, times the model's scale) and fails with a
+    retryable MockProviderError at ``error_rate``. Attempts slower than the
+    scheduler's timeout fail with a 408, like a real request timing out.
+
+    The cassette is consulted once per logical call: pass the result of
+    ``lookup`` as ``entry`` so that retries of a call serve the same response
+    instead of advancing through the cassette.
+
+    :param name: 'mock' or 'replay'.
+    :param cassette: Cassette path, or None for none.
+    :param latency: LatencyModel or spec string.
+    :param error_rate: Probability in [0, 1] that an attempt fails.
+    :param error_statuses: HTTP statuses simulated failures pick from.
+    :param seed: Seed for latencies and failures; None for non-reproducible runs.
+    :param cache_responses: Whether calls use the response cache like live providers.
+    """
+
+    def __init__(self, name="mock", cassette=DEFAULT_CASSETTE_PATH, latency=DEFAULT_LATENCY,
+                 error_rate=DEFAULT_ERROR_RATE, error_statuses=DEFAULT_ERROR_STATUSES, seed=DEFAULT_SEED,
+                 cache_responses=DEFAULT_CACHE_RESPONSES):
+        self.name = name
+        self.cassette = Cassette(cassette) if isinstance(cassette, str) else cassette
+        self.latency = latency if isinstance(latency, LatencyModel) else LatencyModel.parse(latency)
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.cache_responses = cache_responses
+        self.calls = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def complete(self, prompt, model, temperature, timeout=None, entry=LOOKUP):
+        """
+        Returns the text response to a prompt after a simulated latency.
+        """
+        if entry is LOOKUP:
+            entry = self.lookup(prompt, model, temperature, structured=False)
+        response = entry["response"] if entry is not None else mock_text(prompt, model)
+        self._attempt(entry, timeout)
+        return response
+
+    def complete_json(self, prompt, event, model, temperature, timeout=None, entry=LOOKUP):
+        """
+        Returns a structured response as an instance of the pydantic model ``event``.
+        """
+        if entry is LOOKUP:
+            entry = self.lookup(prompt, model, temperature, structured=True)
+        self._attempt(entry, timeout)
+        if entry is None:
+            return mock_instance(event, prompt)
+        response = entry["response"]
+        if isinstance(response, str):
+            return event.model_validate_json(response)
+        return event.model_validate(response)
+
+    async def acomplete(self, prompt, model, temperature, timeout=None, entry=LOOKUP):
+        """
+        Async variant of complete that waits without blocking the event loop.
+        """
+        if entry is LOOKUP:
+            entry = self.lookup(prompt, model, temperature, structured=False)
+        response = entry["response"] if entry is not None else mock_text(prompt, model)
+        await self._aattempt(entry, timeout)
+        return response
+
+    async def acomplete_json(self, prompt, event, model, temperature, timeout=None, entry=LOOKUP):
+        """
+        Async variant of complete_json.
+        """
+        if entry is LOOKUP:
+            entry = self.lookup(prompt, model, temperature, structured=True)
+        await self._aattempt(entry, timeout)
+        if entry is None:
+            return mock_instance(event, prompt)
+        response = entry["response"]
+        if isinstance(response, str):
+            return event.model_validate_json(response)
+        return event.model_validate(response)
+
+    def open_stream(self, prompt, model, temperature, timeout=None, entry=LOOKUP):
+        """
+        Simulates opening a streamed response: waits until the first chunk and
+        returns an iterator of text chunks that spreads the rest of the latency
+        over the remaining chunks.
+        """
+        if entry is LOOKUP:
+            entry = self.lookup(prompt, model, temperature, structured=False)
+        response = entry["response"] if entry is not None else mock_text(prompt, model)
+        total = self._attempt(entry, timeout, fraction=FIRST_CHUNK_FRACTION)
+        chunks = _split_chunks(response)
+        delay = total * (1 - FIRST_CHUNK_FRACTION) / max(1, len(chunks) - 1)
+        return _iter_chunks(chunks, delay)
+
+    def stats(self):
+        return {"calls": self.calls, "failures": self.failures}
+
+    def lookup(self, prompt, model, temperature, structured=False):
+        """
+        Returns the cassette entry serving a request, or None to generate the
+        response. Each lookup advances through repeated entries for the request.
+        """
+        entry = None
+        if self.cassette is not None:
+            entry = self.cassette.lookup(model, temperature, prompt, structured)
+        if entry is None and self.name == "replay":
+            raise CassetteMiss("No recorded response for this request in the cassette"
+                               + (f" {self.cassette.path}" if self.cassette is not None else "") + ".")
+        return entry
+
+    def _attempt(self, entry, timeout, fraction=1.0):
+        """
+        Sleeps for ``fraction`` of one attempt's latency, or raises a simulated
+        failure, and returns the attempt's full latency.
+        """
+        wait, error, latency = self._draw(entry, timeout, fraction)
+        time.sleep(wait)
+        if error is not None:
+            raise error
+        return latency
+
+    async def _aattempt(self, entry, timeout, fraction=1.0):
+        wait, error, latency = self._draw(entry, timeout, fraction)
+        await asyncio.sleep(wait)
+        if error is not None:
+            raise error
+        return latency
+
+    def _draw(self, entry, timeout, fraction):
+        """
+        Draws one attempt's outcome: (seconds to wait, error to raise or None,
+        full latency).
+        """
+        with self._lock:
+            self.calls += 1
+            if entry is not None and entry.get("latency") is not None:
+                latency = entry["latency"] * self.latency.scale
+            else:
+                latency = self.latency.sample(self._rng)
+            failed = self._rng.random() < self.error_rate
+            status = self._rng.choice(self.error_statuses) if failed and self.error_statuses else 503
+            if failed:
+                self.failures += 1
+        if timeout is not None and latency * fraction > timeout:
+            error = MockProviderError(408, f"Simulated {self.name} request timed out after {timeout:.1f}s.")
+            return timeout, error, latency
+        if failed:
+            # Failures are usually quicker than full responses.
+            error = MockProviderError(status, f"Simulated {self.name} error {status}.",
+                                      retry_after=1 if status == 429 else None)
+            return latency * fraction / 4, error, latency
+        return latency * fraction, None, latency
+
+
+def _split_chunks(text):
+    # Word-sized chunks, keeping the whitespace so the chunks join back to the text.
+    chunks = []
+    start = 0
+    for index in range(1, len(text)):
+        if text[index] == " " and text[index - 1] != " ":
+            chunks.append(text[start:index])
+            start = index
+    chunks.append(text[start:])
+    return chunks
+
+
+def _iter_chunks(chunks, delay):
+    for index, chunk in enumerate(chunks):
+        if index and delay:
+            time.sleep(delay)
+        yield chunk
+
+
+def mock_text(prompt, model=None):
+    """
+    Returns a deterministic placeholder response to a prompt.
+    """
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+    words = prompt.split()
+    topic = " ".join(words[-8:]) if words else "the request"
+    return (f"Mock response {digest}: a concise answer about {topic}. "
+            f"It states the key point first, then supports it with a short example.")
+
+
+def mock_instance(event, prompt=""):
+    """
+    Builds a deterministic, schema-valid instance of the pydantic model ``event``.
+    Integer fields of list items take the item's position, so index fields such
+    as ``slide_index`` line up with the first items of a batch.
+    """
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+    return event.model_validate(_mock_value(event, f"mock-{digest}", 0))
+
+
+def _mock_value(annotation, label, position):
+    import typing
+    from pydantic import BaseModel
+
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return {name: _mock_value(field.annotation, f"{label} {name}", position)
+                for name, field in annotation.model_fields.items()}
+    if origin in (list, tuple, set, frozenset):
+        item = args[0] if args else str
+        return [_mock_value(item, f"{label} {index + 1}", index) for index in range(MOCK_LIST_LENGTH)]
+    if origin is dict:
+        value = args[1] if len(args) > 1 else str
+        return {f"key{index + 1}": _mock_value(value, label, index) for index in range(MOCK_LIST_LENGTH)}
+    if origin is typing.Literal:
+        return args[0]
+    if args:
+        # Optional[X] and other unions: use the first non-None member.
+        members = [arg for arg in args if arg is not type(None)]
+        return _mock_value(members[0], label, position) if members else None
+    if annotation is bool:
+        return position % 2 == 0
+    if annotation is int:
+        return position
+    if annotation is float:
+        return float(position)
+    return label
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+_recorder = None
+
+
+def get_mock_provider(name="mock"):
+    """
+    Returns the process-wide simulated provider of that name, configured from
+    the SLIDECRAFT_LLM_CASSETTE and SLIDECRAFT_MOCK_* variables on first use.
+    """
+    name = name.lower()
+    provider = _providers.get(name)
+    if provider is None:
+        with _providers_lock:
+            provider = _providers.get(name)
+            if provider is None:
+                provider = MockProvider(name)
+                _providers[name] = provider
+    return provider
+
+
+def configure_mock_provider(name="mock", **kwargs):
+    """
+    Replaces a simulated provider with one using the given cassette, latency,
+    error rate and seed (see MockProvider).
+    """
+    name = name.lower()
+    if name not in MOCK_PROVIDERS:
+        raise ValueError(f"Unknown simulated provider: {name}")
+    provider = MockProvider(name, **kwargs)
+    with _providers_lock:
+        _providers[name] = provider
+    return provider
+
+
+def record_response(provider, model, temperature, prompt, response, latency=None, structured=False):
+    """
+    Appends a live response to the SLIDECRAFT_LLM_RECORD cassette, if set.
+    Responses of the simulated providers are never recorded.
+    """
+    global _recorder
+    if not RECORD_PATH or provider.lower() in MOCK_PROVIDERS:
+        return
+    with _providers_lock:
+        if _recorder is None:
+            _recorder = Cassette(RECORD_PATH)
+    _recorder.record(provider.lower(), model, temperature, prompt, response, latency, structured)
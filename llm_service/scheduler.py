@@ -0,0 +1,383 @@
+import os
+import sys
+import time
+import asyncio
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+# Default (requests per minute, tokens per minute) per provider. Override with
+# SLIDECRAFT_<PROVIDER>_RPM and SLIDECRAFT_<PROVIDER>_TPM, e.g. SLIDECRAFT_OPENAI_RPM=5000.
+DEFAULT_RATE_LIMITS = {
+    "openai": (500, 30000),
+    "huggingface": (300, 100000),
+    "claude": (50, 40000),
+    "gemini": (60, 32000),
+    # Simulated providers (llm_service.mock) are unlimited unless configured.
+    "mock": (0, 0),
+    "replay": (0, 0),
+}
+FALLBACK_RATE_LIMITS = (60, 30000)
+
+DEFAULT_MAX_RETRIES = int(os.getenv("SLIDECRAFT_LLM_MAX_RETRIES", "4"))
+DEFAULT_BASE_DELAY = float(os.getenv("SLIDECRAFT_LLM_BACKOFF_BASE", "1.0"))
+DEFAULT_MAX_DELAY = float(os.getenv("SLIDECRAFT_LLM_BACKOFF_MAX", "60"))
+
+# Buckets hold this fraction of a minute's quota, bounding bursts.
+BURST_FRACTION = 0.1
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when an LLM call cannot complete before its deadline.
+    """
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at ``rate_per_minute``.
+    Takes larger than the bucket leave it in debt, which later takes wait off.
+
+    :param rate_per_minute: Refill rate; None or 0 disables the limit.
+    :param capacity: Maximum stored tokens (burst size).
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = capacity or max(1.0, (rate_per_minute or 0) * BURST_FRACTION)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1, deadline=None):
+        """
+        Blocks until ``amount`` tokens are available and takes them.
+        Requests larger than the bucket wait for a full bucket and take all of
+        ``amount`` from it, so the rate holds for them too.
+
+        :param deadline: Absolute ``time.monotonic()`` limit; raises DeadlineExceeded past it.
+        """
+        if not self.rate_per_minute:
+            return
+        while True:
+            wait = self._take(amount, deadline)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, amount=1, deadline=None):
+        """
+        Async variant of acquire that waits without blocking the event loop.
+        """
+        if not self.rate_per_minute:
+            return
+        while True:
+            wait = self._take(amount, deadline)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, amount):
+        """
+        Returns tokens taken earlier but not used, up to the bucket's capacity.
+        """
+        if not self.rate_per_minute or amount <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def _take(self, amount, deadline):
+        """
+        Takes the tokens if available and returns 0, otherwise returns the
+        seconds to wait before trying again.
+        """
+        # The balance may be negative: what earlier takes borrowed beyond the bucket.
+        needed = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity,
+                               self._tokens + (now - self._updated) * self.rate_per_minute / 60.0)
+            self._updated = now
+            if self._tokens >= needed:
+                self._tokens -= amount
+                return 0
+            wait = (needed - self._tokens) * 60.0 / self.rate_per_minute
+        if deadline is not None and time.monotonic() + wait > deadline:
+            raise DeadlineExceeded("Rate limit wait would exceed the call deadline.")
+        return wait
+
+
+class ProviderScheduler:
+    """
+    Paces and retries the requests made to one provider.
+
+    Each attempt first takes one request from the requests-per-minute bucket and
+    the estimated token count from the tokens-per-minute bucket. Responses with
+    a retryable status (429/5xx) and transient connection errors are retried
+    with exponential backoff and full jitter, honouring ``Retry-After``. A 429
+    pauses every caller of the provider until the advertised retry time, so
+    concurrent workers back off together instead of hammering the endpoint.
+
+    :param provider: Provider name, used in error messages.
+    :param requests_per_minute: Request budget; None disables the limit.
+    :param tokens_per_minute: Token budget; None disables the limit.
+    :param max_retries: Retries after the first attempt.
+    :param base_delay: Backoff delay of the first retry in seconds.
+    :param max_delay: Cap on a single backoff delay in seconds.
+    """
+
+    def __init__(self, provider, requests_per_minute=None, tokens_per_minute=None,
+                 max_retries=DEFAULT_MAX_RETRIES, base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def run(self, send, tokens=1, deadline=None, timeout=None):
+        """
+        Calls ``send(timeout)`` under the provider's rate limits, retrying as needed.
+
+        :param send: Callable performing one attempt. It receives the timeout in
+                     seconds for that attempt and returns a ``requests.Response``
+                     or an SDK result, or raises.
+        :param tokens: Estimated tokens consumed by the request.
+        :param deadline: Absolute ``time.monotonic()`` limit for the whole call, including retries.
+        :param timeout: Per-attempt timeout in seconds, shortened to fit the deadline.
+        :return: The last result of ``send``. A response that still has a retryable
+                 status after all retries is returned so the caller can report it.
+        """
+        attempt = 0
+        while True:
+            wait = self._pause_wait(deadline)
+            if wait:
+                time.sleep(wait)
+            self.requests.acquire(1, deadline)
+            self.tokens.acquire(tokens, deadline)
+            try:
+                result = send(self._attempt_timeout(timeout, deadline))
+            except Exception as e:
+                delay = self._retry_delay(attempt, deadline, error=e)
+            else:
+                delay = self._retry_delay(attempt, deadline, result=result)
+                if delay is None:
+                    return result
+                _close_response(result)
+            time.sleep(delay)
+            attempt += 1
+
+    async def arun(self, send, tokens=1, deadline=None, timeout=None):
+        """
+        Async variant of run: ``send(timeout)`` returns an awaitable, and rate
+        limit, pause and backoff waits do not block the event loop. Sync and
+        async callers of a provider share its limits.
+        """
+        attempt = 0
+        while True:
+            wait = self._pause_wait(deadline)
+            if wait:
+                await asyncio.sleep(wait)
+            await self.requests.aacquire(1, deadline)
+            await self.tokens.aacquire(tokens, deadline)
+            try:
+                result = await send(self._attempt_timeout(timeout, deadline))
+            except Exception as e:
+                delay = self._retry_delay(attempt, deadline, error=e)
+            else:
+                delay = self._retry_delay(attempt, deadline, result=result)
+                if delay is None:
+                    return result
+                await _aclose_response(result)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def refund(self, charged, used):
+        """
+        Returns to the tokens-per-minute bucket what a request was charged
+        beyond the tokens its response reported using.
+
+        :param charged: The ``tokens`` passed to run or arun.
+        :param used: Prompt plus completion tokens from the response's usage.
+        """
+        self.tokens.release(charged - used)
+
+    def _attempt_timeout(self, timeout, deadline):
+        if deadline is None:
+            return timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{self.provider} call exceeded its deadline.")
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def _retry_delay(self, attempt, deadline, result=None, error=None):
+        """
+        Decides whether an attempt is retried. Returns the backoff delay in
+        seconds, or None when ``result`` should be returned; re-raises ``error``
+        when it is not retried.
+        """
+        if error is not None:
+            if attempt >= self.max_retries or not _is_retryable_error(error):
+                raise error
+            status, retry_after = _error_status(error), _retry_after(_error_headers(error))
+        else:
+            status = getattr(result, "status_code", None)
+            if not _is_http_response(result) or status not in RETRYABLE_STATUS_CODES:
+                return None
+            if attempt >= self.max_retries:
+                return None
+            retry_after = _retry_after(result.headers)
+
+        delay = self._backoff(attempt, retry_after)
+        if status == 429:
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        if deadline is not None and time.monotonic() + delay > deadline:
+            if error is not None:
+                raise error
+            return None
+        return delay
+
+    def _backoff(self, attempt, retry_after):
+        if retry_after is not None:
+            return min(self.max_delay, retry_after) + random.uniform(0, self.base_delay / 4)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _pause_wait(self, deadline):
+        wait = self._paused_until - time.monotonic()
+        if wait <= 0:
+            return 0
+        if deadline is not None and time.monotonic() + wait > deadline:
+            raise DeadlineExceeded(f"{self.provider} is rate limited beyond the call deadline.")
+        return wait
+
+
+def _is_http_response(result):
+    # requests and httpx are only loaded by the providers that use them; if
+    # neither was imported, the result cannot be an HTTP response.
+    requests = sys.modules.get("requests")
+    if requests is not None and isinstance(result, requests.Response):
+        return True
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(result, httpx.Response)
+
+
+def _close_response(response):
+    # A retried response is dropped; closing it returns its pooled connection,
+    # which a stream=True response would otherwise hold.
+    close = getattr(response, "close", None)
+    if close is not None:
+        close()
+
+
+async def _aclose_response(response):
+    aclose = getattr(response, "aclose", None)
+    if aclose is not None:
+        await aclose()
+    else:
+        _close_response(response)
+
+
+def _is_retryable_error(error):
+    requests = sys.modules.get("requests")
+    if requests is not None and isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    httpx = sys.modules.get("httpx")
+    if httpx is not None and isinstance(error, httpx.TransportError):
+        return True
+    status = _error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    # OpenAI SDK connection and timeout errors carry no status code.
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def _error_status(error):
+    status = getattr(error, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _error_headers(error):
+    response = getattr(error, "response", None)
+    return getattr(response, "headers", None) or {}
+
+
+def _retry_after(headers):
+    """
+    Parses Retry-After (seconds or HTTP date) or retry-after-ms into seconds.
+    """
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _limits_for(provider):
+    rpm, tpm = DEFAULT_RATE_LIMITS.get(provider, FALLBACK_RATE_LIMITS)
+    rpm = int(os.getenv(f"SLIDECRAFT_{provider.upper()}_RPM", rpm))
+    tpm = int(os.getenv(f"SLIDECRAFT_{provider.upper()}_TPM", tpm))
+    return rpm, tpm
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(provider):
+    """
+    Returns the process-wide scheduler for a provider, creating it on first use.
+    """
+    provider = provider.lower()
+    scheduler = _schedulers.get(provider)
+    if scheduler is None:
+        with _schedulers_lock:
+            scheduler = _schedulers.get(provider)
+            if scheduler is None:
+                rpm, tpm = _limits_for(provider)
+                scheduler = ProviderScheduler(provider, requests_per_minute=rpm, tokens_per_minute=tpm)
+                _schedulers[provider] = scheduler
+    return scheduler
+
+
+def configure_scheduler(provider, requests_per_minute=None, tokens_per_minute=None, **kwargs):
+    """
+    Replaces a provider's scheduler with one using the given limits and retry settings.
+    """
+    provider = provider.lower()
+    default_rpm, default_tpm = _limits_for(provider)
+    scheduler = ProviderScheduler(
+        provider,
+        requests_per_minute=requests_per_minute if requests_per_minute is not None else default_rpm,
+        tokens_per_minute=tokens_per_minute if tokens_per_minute is not None else default_tpm,
+        **kwargs
+    )
+    with _schedulers_lock:
+        _schedulers[provider] = scheduler
+    return scheduler
+
+
+def compute_deadline(seconds):
+    """
+    Converts a relative deadline in seconds into an absolute ``time.monotonic()`` value.
+    """
+    return None if seconds is None else time.monotonic() + seconds
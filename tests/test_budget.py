@@ -0,0 +1,112 @@
+import re
+import sys
+import types
+
+import pytest
+
+from llm_service import budget
+from llm_service.budget import (
+    MIN_OUTPUT_TOKENS,
+    compact_text,
+    count_tokens,
+    fit_context,
+    max_output_tokens,
+    truncate_tokens,
+)
+
+
+def long_text():
+    sentences = [f"Remark w{index}a w{index}b w{index}c w{index}d." for index in range(600)]
+    sentences.insert(300, "Revenue grew twelve percent in the third quarter.")
+    return " ".join(sentences)
+
+
+def test_contexts_within_budget_are_unchanged():
+    assert fit_context("A short context.", max_tokens=100) == "A short context."
+    assert fit_context("", max_tokens=100) == ""
+
+
+def test_oversized_contexts_are_compacted_to_the_budget():
+    text = long_text()
+    compacted = fit_context(text, max_tokens=200, query="revenue quarter")
+    assert count_tokens(compacted) <= 200
+    assert "Revenue grew twelve percent in the third quarter." in compacted
+
+
+def test_reserved_tokens_shrink_the_budget():
+    text = long_text()
+    compacted = fit_context(text, model="unknown-model", reserved_tokens=8192 - 100, max_tokens=None)
+    assert count_tokens(compacted) <= 100
+
+
+def test_truncation_keeps_the_beginning():
+    text = long_text()
+    truncated = compact_text(text, 50, mode="truncate")
+    assert text.startswith(truncated)
+    assert count_tokens(truncated) <= 50
+    assert truncate_tokens(text, 0) == ""
+
+
+def test_max_output_tokens_has_headroom_and_limits():
+    assert max_output_tokens(0) == MIN_OUTPUT_TOKENS
+    assert max_output_tokens(1000) == 1250
+    assert max_output_tokens(10 ** 6) == 16384
+    assert max_output_tokens(10 ** 6, model="unknown-model") == 4096
+
+
+class WordEncoding:
+    """
+    Stands in for a tiktoken encoding: every word with its leading space is a token.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def encode(self, text, disallowed_special=()):
+        return re.findall(r"\s*\S+", text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+@pytest.fixture
+def tiktoken_stub(monkeypatch):
+    requested = []
+
+    def encoding_for_model(model):
+        requested.append(model)
+        if model != "gpt-4o":
+            raise KeyError(model)
+        return WordEncoding("o200k_base")
+
+    stub = types.SimpleNamespace(encoding_for_model=encoding_for_model, get_encoding=WordEncoding)
+    monkeypatch.setitem(sys.modules, "tiktoken", stub)
+    monkeypatch.setattr(budget, "_encodings", {})
+    return requested
+
+
+def test_tokens_are_counted_with_the_tiktoken_encoding(tiktoken_stub):
+    assert count_tokens("Revenue grew twelve percent", "gpt-4o") == 4
+    assert budget._get_encoding("unknown-model").name == budget.FALLBACK_ENCODING
+    # Encodings are looked up once per model.
+    count_tokens("again", "gpt-4o")
+    assert tiktoken_stub == ["gpt-4o", "unknown-model"]
+
+
+def test_tiktoken_truncation_and_compaction_fit_the_budget(tiktoken_stub):
+    text = long_text()
+    # The cut ends at a word boundary, so the last token's word is dropped in case it was split.
+    assert truncate_tokens(text, 8, "gpt-4o") == "Remark w0a w0b w0c w0d. Remark w1a"
+    compacted = fit_context(text, model="gpt-4o", max_tokens=200, query="revenue quarter")
+    assert count_tokens(compacted, "gpt-4o") <= 200
+    assert "Revenue grew twelve percent in the third quarter." in compacted
+
+
+def test_unloadable_encodings_fall_back_to_the_estimate(monkeypatch):
+    def unavailable(name):
+        raise OSError("offline")
+
+    stub = types.SimpleNamespace(encoding_for_model=unavailable, get_encoding=unavailable)
+    monkeypatch.setitem(sys.modules, "tiktoken", stub)
+    monkeypatch.setattr(budget, "_encodings", {})
+    assert count_tokens("x" * 40, "gpt-4o") == 11
@@ -0,0 +1,89 @@
+import sqlite3
+
+import pytest
+
+from llm_service import cache as cache_module
+from llm_service.cache import LLMResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def summed_size(cache):
+    return cache._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+
+def test_get_and_set_count_hits_and_misses():
+    cache = LLMResponseCache(":memory:")
+    assert cache.get("a") is None
+    cache.set("a", "response")
+    assert cache.get("a") == "response"
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1, "bytes": len("response")}
+
+
+def test_keys_cover_the_request_and_schema():
+    key = LLMResponseCache.make_key("OpenAI", "gpt-4o", 0.7, "prompt")
+    assert key == LLMResponseCache.make_key("openai", "gpt-4o", 0.7, "prompt")
+    assert key != LLMResponseCache.make_key("openai", "gpt-4o", 0.2, "prompt")
+    assert key != LLMResponseCache.make_key("openai", "gpt-4o", 0.7, "prompt", schema={"type": "object"})
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = LLMResponseCache(":memory:", ttl=60)
+    cache.set("a", "old")
+    clock[0] += 30
+    assert cache.get("a") == "old"
+    clock[0] += 31
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(clock):
+    cache = LLMResponseCache(":memory:", ttl=None, max_bytes=30)
+    for key in ("a", "b", "c"):
+        clock[0] += 1
+        cache.set(key, "x" * 10)
+    clock[0] += 1
+    cache.get("a")
+    clock[0] += 1
+    cache.set("d", "x" * 10)
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in ("a", "c", "d"))
+    assert cache.stats()["bytes"] == 30
+
+
+def test_values_larger_than_the_cache_are_not_stored():
+    cache = LLMResponseCache(":memory:", max_bytes=5)
+    cache.set("a", "too long")
+    assert cache.get("a") is None
+
+
+def test_running_total_tracks_replaces_deletes_and_other_connections(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = LLMResponseCache(path, ttl=None, max_bytes=1000)
+    cache.set("a", "x" * 10)
+    cache.set("a", "x" * 20)
+    cache.set("b", "y" * 30)
+    other = LLMResponseCache(path, ttl=None, max_bytes=1000)
+    other.set("c", "z" * 5)
+    assert cache.stats()["bytes"] == summed_size(cache) == 55
+    cache.clear()
+    assert other.stats()["bytes"] == 0
+
+
+def test_databases_without_a_running_total_are_summed_on_open(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                 " created_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+    conn.execute("INSERT INTO responses VALUES ('a', 'abc', 3, 0, 0)")
+    conn.commit()
+    conn.close()
+    cache = LLMResponseCache(path, ttl=None)
+    assert cache.stats()["bytes"] == 3
+    cache.set("b", "de")
+    assert cache.stats()["bytes"] == summed_size(cache) == 5
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pptx import Presentation
+from pptx.chart.data import XyChartData
+from pptx.util import Inches
+
+from PPT_Maker.charts import (
+    ChartPartCache,
+    add_chart,
+    bin_xy,
+    bucket_reduce,
+    build_chart_data,
+    load_chart_table,
+    lttb,
+    table_digest,
+)
+
+
+def test_lttb_keeps_endpoints_and_threshold_points():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 50)
+    kept = lttb(x, y, 50)
+    assert len(kept) == 50
+    assert kept[0] == 0 and kept[-1] == 999
+    assert np.all(np.diff(kept) > 0)
+
+
+def test_lttb_keeps_a_lone_peak():
+    x = np.arange(500, dtype=np.float64)
+    y = np.zeros(500)
+    y[321] = 100.0
+    assert 321 in lttb(x, y, 20)
+
+
+def test_lttb_skips_nans_when_choosing_points():
+    x = np.arange(100, dtype=np.float64)
+    y = np.where(np.arange(100) % 2 == 0, np.nan, np.arange(100, dtype=np.float64))
+    kept = lttb(x, y, 10)
+    assert all(np.isfinite(y[index]) for index in kept[1:-1])
+
+
+def test_lttb_returns_everything_below_the_threshold():
+    x = np.arange(10, dtype=np.float64)
+    assert list(lttb(x, x, 20)) == list(range(10))
+    assert list(lttb(x, x, 2)) == list(range(10))
+
+
+def test_bin_xy_bounds_the_point_count():
+    rng = np.random.default_rng(0)
+    x, y = rng.normal(size=10000), rng.normal(size=10000)
+    bx, by = bin_xy(x, y, 100)
+    assert 0 < len(bx) <= 100
+    assert len(bx) == len(by)
+    assert x.min() <= bx.min() and bx.max() <= x.max()
+    assert y.min() <= by.min() and by.max() <= y.max()
+
+
+def test_bin_xy_drops_nans_and_keeps_small_inputs():
+    x = np.array([1.0, np.nan, 3.0])
+    y = np.array([1.0, 2.0, np.inf])
+    bx, by = bin_xy(x, y, 10)
+    assert list(bx) == [1.0] and list(by) == [1.0]
+
+
+def test_bucket_reduce_sum_preserves_the_total():
+    values = np.arange(1, 1001, dtype=np.float64)
+    sums, starts = bucket_reduce(values, 7, how="sum")
+    assert len(sums) == len(starts) == 7
+    assert sums.sum() == values.sum()
+    means, _ = bucket_reduce(np.array([1.0, np.nan, 3.0, 5.0]), 2)
+    assert list(means) == [1.0, 4.0]
+
+
+def test_build_chart_data_downsamples_long_series():
+    table = pd.DataFrame({"t": np.arange(5000), "a": np.random.default_rng(1).normal(size=5000)})
+    line = build_chart_data("LINE", table, max_points=200)
+    assert len(line.categories) <= 200
+    column = build_chart_data("COLUMN_CLUSTERED", table, max_points=100)
+    assert len(column.categories) == 100
+    scatter = build_chart_data("XY_SCATTER", table, max_points=100)
+    assert isinstance(scatter, XyChartData)
+    assert 0 < len(scatter[0]) <= 100
+
+
+def test_build_chart_data_requires_numeric_columns():
+    with pytest.raises(ValueError):
+        build_chart_data("LINE", b"name,label\na,b\nc,d\n")
+
+
+def test_load_chart_table_accepts_arrays_and_csv_bytes():
+    table = load_chart_table(np.array([[1, 10], [2, 20]]))
+    assert list(table.columns) == ["x", "Series 1"]
+    assert load_chart_table(b"a,b\n1,2\n")["b"].tolist() == [2]
+
+
+def test_table_digest_follows_contents():
+    first = pd.DataFrame({"a": [1, 2]})
+    assert table_digest(first) == table_digest(pd.DataFrame({"a": [1, 2]}))
+    assert table_digest(first) != table_digest(pd.DataFrame({"a": [1, 3]}))
+    assert table_digest(first) != table_digest(pd.DataFrame({"b": [1, 2]}))
+
+
+def test_chart_cache_key_follows_file_contents(tmp_path, monkeypatch):
+    monkeypatch.setattr("PPT_Maker.charts._cache", ChartPartCache())
+    path = tmp_path / "data.csv"
+    slide = Presentation().slides.add_slide(Presentation().slide_layouts[6])
+
+    def chart_values():
+        frame = add_chart(slide.shapes, "LINE", Inches(1), Inches(1), Inches(4), Inches(3), str(path))
+        return list(frame.chart.plots[0].series[0].values)
+
+    path.write_text("month,sales\nJan,1\nFeb,2\n")
+    assert chart_values() == [1.0, 2.0]
+    path.write_text("month,sales\nJan,5\nFeb,6\n")
+    assert chart_values() == [5.0, 6.0]
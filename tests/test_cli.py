@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+from PIL import Image
+from pptx import Presentation
+
+from PPT_Maker.cli import main
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SPEC = {
+    "presentation_title": "Quarterly Review",
+    "author": "Jane Doe",
+    "title_bg": "cover.png",
+    "sections_data": [
+        {"section_title": "Results", "section_header_bg": None,
+         "slides": [{"layout": 1, "content": "Revenue grew 12%"}, {"layout": "blank", "content": "Outlook"}]},
+    ],
+}
+
+
+@pytest.fixture
+def spec_dir(tmp_path):
+    Image.new("RGB", (64, 48), "teal").save(tmp_path / "cover.png")
+    return tmp_path
+
+
+def slide_count(path):
+    return len(Presentation(str(path)).slides)
+
+
+def test_build_renders_a_json_spec(spec_dir):
+    spec = spec_dir / "deck.json"
+    spec.write_text(json.dumps(SPEC), encoding="utf-8")
+    output = spec_dir / "out" / "deck.pptx"
+    completed = subprocess.run([sys.executable, "-m", "PPT_Maker", "build", str(spec), "-o", str(output)],
+                               cwd=REPO_ROOT, capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+    assert f"-> {output}" in completed.stdout
+    prs = Presentation(str(output))
+    assert len(prs.slides) == 4
+    assert prs.slides[0].shapes.title.text == "Quarterly Review"
+
+
+def test_build_renders_yaml_specs_in_a_directory(spec_dir):
+    yaml = pytest.importorskip("yaml")
+    (spec_dir / "first.yaml").write_text(yaml.safe_dump(SPEC), encoding="utf-8")
+    (spec_dir / "second.yml").write_text(yaml.safe_dump(SPEC["sections_data"]), encoding="utf-8")
+    output = spec_dir / "decks"
+    assert main(["build", str(spec_dir), "-o", str(output), "--jobs", "2"]) == 0
+    assert slide_count(output / "first.pptx") == 4
+    assert slide_count(output / "second.pptx") == 4
+
+
+def test_a_bad_spec_fails_without_stopping_the_others(spec_dir, capsys):
+    (spec_dir / "good.json").write_text(json.dumps(SPEC), encoding="utf-8")
+    (spec_dir / "broken.json").write_text("{not json", encoding="utf-8")
+    missing_image = dict(SPEC, title_bg="missing.png")
+    (spec_dir / "missing.json").write_text(json.dumps(missing_image), encoding="utf-8")
+    output = spec_dir / "decks"
+    assert main(["build", str(spec_dir), "-o", str(output)]) == 1
+    errors = capsys.readouterr().err
+    assert "broken.json" in errors and "missing.json" in errors
+    assert slide_count(output / "good.pptx") == 4
+    assert not (output / "broken.pptx").exists()
+
+
+def test_no_specs_is_an_error(tmp_path):
+    with pytest.raises(SystemExit, match="No spec files found"):
+        main(["build", str(tmp_path)])
@@ -0,0 +1,70 @@
+import os
+import sys
+import json
+import asyncio
+import subprocess
+
+from llm_service.clients import ProviderClientRegistry
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_repeated_lookups_return_the_pooled_client():
+    registry = ProviderClientRegistry(pool_connections=2, pool_maxsize=5, timeout=9)
+    session = registry.get_session("Claude")
+    assert registry.get_session("claude") is session
+    assert registry.get_session("gemini") is not session
+    adapter = session.get_adapter("https://api.anthropic.com")
+    assert (adapter._pool_connections, adapter._pool_maxsize) == (2, 5)
+
+    client = registry.get_openai_client("key")
+    assert registry.get_openai_client("key") is client
+    assert registry.get_openai_client("other key") is not client
+    # Retries are left to the scheduler.
+    assert client.max_retries == 0 and client.timeout == 9
+    registry.close()
+
+
+def test_configure_rebuilds_clients_with_the_new_settings():
+    registry = ProviderClientRegistry()
+    session = registry.get_session("claude")
+    registry.configure(pool_maxsize=3)
+    rebuilt = registry.get_session("claude")
+    assert rebuilt is not session
+    assert rebuilt.get_adapter("https://api.anthropic.com")._pool_maxsize == 3
+    registry.close()
+
+
+def test_pool_settings_are_read_from_the_environment():
+    # The defaults are read at import, so they are checked in a fresh interpreter.
+    script = (
+        "import json\n"
+        "from llm_service.clients import get_registry\n"
+        "registry = get_registry()\n"
+        "adapter = registry.get_session('claude').get_adapter('https://api.anthropic.com')\n"
+        "client = registry.get_openai_client('key')\n"
+        "print(json.dumps([adapter._pool_connections, adapter._pool_maxsize, client.timeout,\n"
+        "                  registry.async_pool_maxsize]))\n"
+    )
+    env = dict(os.environ, SLIDECRAFT_LLM_POOL_CONNECTIONS="3", SLIDECRAFT_LLM_POOL_MAXSIZE="7",
+               SLIDECRAFT_LLM_TIMEOUT="12", SLIDECRAFT_LLM_ASYNC_POOL_MAXSIZE="21")
+    completed = subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, env=env,
+                               capture_output=True, text=True, check=True)
+    assert json.loads(completed.stdout) == [3, 7, 12.0, 21]
+
+
+def test_async_clients_are_kept_per_event_loop():
+    registry = ProviderClientRegistry(async_pool_maxsize=6)
+
+    async def lookup():
+        clients = registry.get_async_clients()
+        assert registry.get_async_clients() is clients
+        http_client = clients.get_http_client("claude")
+        assert clients.get_http_client("Claude") is http_client
+        await http_client.aclose()
+        return asyncio.get_running_loop(), clients
+
+    (first_loop, first), (second_loop, second) = asyncio.run(lookup()), asyncio.run(lookup())
+    assert first is not second
+    assert first.pool_maxsize == second.pool_maxsize == 6
+    assert registry._async_clients[first_loop] is first and registry._async_clients[second_loop] is second
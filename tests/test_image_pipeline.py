@@ -0,0 +1,89 @@
+import io
+import random
+
+import pytest
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+
+from PPT_Maker import image_pipeline
+from PPT_Maker.image_pipeline import prepare_image, prepare_images
+from PPT_Maker.rendering import create_presentation
+
+
+def encode(image, format):
+    buffer = io.BytesIO()
+    image.save(buffer, format)
+    return buffer.getvalue()
+
+
+def photo(width, height, seed=0):
+    # Noise has far more colours than a graphic, so it is treated as a photo.
+    rng = random.Random(seed)
+    return Image.frombytes("RGB", (width, height), bytes(rng.getrandbits(8) for _ in range(width * height * 3)))
+
+
+def decode(image_bytes):
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image.load()
+        return image
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    image_pipeline.get_image_cache().clear()
+    yield
+    image_pipeline.get_image_cache().clear()
+
+
+def test_images_are_downscaled_to_fill_their_box():
+    # A 2 x 1 inch box at 100 DPI is 200 x 100 pixels.
+    prepared = decode(prepare_image(encode(photo(800, 800), "PNG"), Inches(2), Inches(1), dpi=100))
+    assert prepared.size == (200, 200)
+    prepared = decode(prepare_image(encode(photo(800, 400), "PNG"), Inches(2), dpi=100))
+    assert prepared.size == (200, 100)
+
+
+def test_small_images_are_not_upscaled():
+    source = encode(photo(40, 30), "JPEG")
+    assert decode(prepare_image(source, Inches(4), Inches(3), dpi=150)).size == (40, 30)
+
+
+def test_photos_become_jpeg_and_graphics_stay_png():
+    assert decode(prepare_image(encode(photo(400, 300), "PNG"), Inches(1), dpi=100)).format == "JPEG"
+    graphic = Image.new("RGB", (400, 300), "navy")
+    assert decode(prepare_image(encode(graphic, "PNG"), Inches(1), dpi=100)).format == "PNG"
+
+
+def test_transparency_is_kept():
+    image = photo(400, 300).convert("RGBA")
+    image.putpixel((0, 0), (0, 0, 0, 0))
+    prepared = decode(prepare_image(encode(image, "PNG"), Inches(1), dpi=100))
+    assert prepared.format == "PNG"
+    assert prepared.mode == "RGBA"
+    assert prepared.getchannel("A").getextrema()[0] < 255
+
+
+def test_repeated_requests_are_prepared_once(monkeypatch):
+    calls = []
+    original = image_pipeline._prepare_job
+    monkeypatch.setattr(image_pipeline, "_prepare_job", lambda job: calls.append(job) or original(job))
+    request = (encode(photo(400, 300), "PNG"), Inches(1), None)
+    first = prepare_images([request, request], dpi=100, max_workers=1)
+    second = prepare_images([request], dpi=100, max_workers=1)
+    assert len(calls) == 1
+    assert first[request] == second[request]
+
+
+def test_identical_images_share_one_media_part():
+    image = encode(photo(300, 200), "PNG")
+    sections_data = [{"section_title": "Section", "section_header_bg": None, "slides": [
+        {"layout": "blank", "image": [image, image], "image_type": "foreground"},
+        {"layout": "blank", "image": [image], "image_type": "foreground"},
+    ]}]
+    output = io.BytesIO()
+    create_presentation("Title", "Description", "Author", None, None, sections_data, output=output)
+    prs = Presentation(io.BytesIO(output.getvalue()))
+    assert sum(len(slide.shapes) for slide in list(prs.slides)[2:]) == 3
+    media = {part.partname for part in prs.part.package.iter_parts() if part.partname.startswith("/ppt/media/")}
+    assert len(media) == 1
@@ -0,0 +1,84 @@
+import io
+
+import pandas as pd
+from pptx import Presentation
+
+from PPT_Maker.incremental import RenderedSlideCache, fingerprint, slide_fingerprint
+from PPT_Maker.rendering import create_presentation
+
+
+class Snapshot:
+    def __init__(self, size):
+        self.size = size
+
+
+def sections(contents, chart_data=None):
+    return [{"section_title": "Section", "section_header_bg": None, "slides": [
+        {"layout": "title_content", "content": content, "chart_type": "Line" if chart_data else None,
+         "chart_data": chart_data}
+        for content in contents
+    ]}]
+
+
+def render(sections_data, slide_cache=None, warnings=None):
+    output = io.BytesIO()
+    create_presentation("Title", "Description", "Author", None, None, sections_data, output=output,
+                        slide_cache=slide_cache, warnings=warnings)
+    return Presentation(io.BytesIO(output.getvalue()))
+
+
+def slide_texts(prs):
+    return [[shape.text_frame.text for shape in slide.shapes if shape.has_text_frame] for slide in prs.slides]
+
+
+def test_fingerprints_hash_bytes_and_tables_by_content():
+    assert fingerprint("a", b"image") == fingerprint("a", b"image")
+    assert fingerprint("a", b"image") != fingerprint("a", b"other")
+    assert fingerprint(pd.DataFrame({"a": [1]})) == fingerprint(pd.DataFrame({"a": [1]}))
+    assert fingerprint(pd.DataFrame({"a": [1]})) != fingerprint(pd.DataFrame({"a": [2]}))
+
+
+def test_slide_fingerprint_follows_the_chart_file(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n")
+    slide_data = {"content": "x", "chart_type": "Line", "chart_data": str(path)}
+    before = slide_fingerprint(slide_data)
+    assert slide_fingerprint(dict(slide_data)) == before
+    path.write_text("a,b\n1,3\n")
+    assert slide_fingerprint(slide_data) != before
+    assert slide_fingerprint(dict(slide_data, content="y")) != slide_fingerprint(slide_data)
+
+
+def test_rendered_slide_cache_is_bounded_and_retains_current_slides():
+    cache = RenderedSlideCache(max_bytes=100)
+    for key in "abc":
+        cache.set(key, Snapshot(40))
+    assert "a" not in cache and len(cache) == 2 and cache.size == 80
+    cache.get("b")
+    cache.set("d", Snapshot(40))
+    assert "c" not in cache and "b" in cache
+    cache.retain({"d"})
+    assert list(cache._slides) == ["d"] and cache.size == 40
+
+
+def test_cached_renders_match_full_renders():
+    cache = RenderedSlideCache()
+    first = sections(["one", "two", "three"])
+    assert slide_texts(render(first, slide_cache=cache)) == slide_texts(render(first))
+    assert len(cache) == 4
+    edited = sections(["one", "TWO", "three"])
+    assert slide_texts(render(edited, slide_cache=cache)) == slide_texts(render(edited))
+    # The replaced slide is dropped along with its old fingerprint.
+    assert len(cache) == 4
+
+
+def test_unusable_chart_data_is_reported_per_slide():
+    for slide_cache in (None, RenderedSlideCache()):
+        warnings = []
+        prs = render(sections(["one"], chart_data=b"name,label\na,b\n"), slide_cache=slide_cache, warnings=warnings)
+        assert len(prs.slides) == 3
+        assert not any(shape.has_chart for slide in prs.slides for shape in slide.shapes)
+        assert warnings == ["Section - Slide 1: chart left out (Chart data has no numeric columns to plot.)"]
+        if slide_cache is not None:
+            # Slides rendered with a warning are not cached, so the warning is raised again.
+            assert len(slide_cache) == 1
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+from pptx import Presentation
+
+from llm_service.metrics import finish_run, start_run
+from PPT_Maker import jobs
+from PPT_Maker.incremental import SlideMemo
+from PPT_Maker.jobs import GenerationJob, render_deck
+
+
+def sections(count, chart_data=None):
+    return [{"section_title": "Section", "section_header_bg": None, "slides": [
+        {"layout": "title_content", "content": f"Slide {index}", "chart_type": "Line" if chart_data else None,
+         "chart_data": chart_data}
+        for index in range(count)
+    ]}]
+
+
+def render_job(memo, sections_data):
+    total = sum(len(section["slides"]) for section in sections_data)
+    job = GenerationJob("job")
+    job.start_stage("render", "Rendering", total=total)
+    progress = []
+    job.set_done = lambda name, done: progress.append(done)
+    run = start_run("generate")
+    try:
+        deck_path, warnings = render_deck(job, memo.id, "Title", "Description", "Author", None, None, sections_data)
+    finally:
+        finish_run(run, export=False)
+    stages = {item["stage"]: item for item in run.summary()["stages"]}
+    return deck_path, warnings, progress, stages
+
+
+@pytest.mark.parametrize("processes", [0, 1])
+def test_render_deck_reports_each_slide_and_the_render_stages(monkeypatch, processes):
+    monkeypatch.setattr(jobs, "DEFAULT_RENDER_PROCESSES", processes)
+    memo = SlideMemo()
+    deck_path, warnings, progress, stages = render_job(memo, sections(5, chart_data=b"name,label\na,b\n"))
+    try:
+        assert len(Presentation(deck_path).slides) == 7
+        assert warnings == [f"Section - Slide {index}: chart left out (Chart data has no numeric columns to plot.)"
+                            for index in range(1, 6)]
+        assert progress == [1, 2, 3, 4, 5]
+        assert stages["render.sections"]["labels"] == {"path": "incremental"}
+        assert stages["render.save"]["count"] == 1
+    finally:
+        os.remove(deck_path)
+
+
+def test_rendered_slides_are_kept_per_session(monkeypatch):
+    monkeypatch.setattr(jobs, "DEFAULT_RENDER_PROCESSES", 0)
+    monkeypatch.setattr(jobs, "_slide_caches", jobs.OrderedDict())
+    monkeypatch.setattr(jobs, "RENDER_SESSIONS_PER_PROCESS", 1)
+    first, second = SlideMemo(), SlideMemo()
+    for memo in (first, first, second):
+        deck_path, _, progress, _ = render_job(memo, sections(3))
+        os.remove(deck_path)
+    # The second render of the first session took every slide from its cache at once.
+    assert list(jobs._slide_caches) == [second.id]
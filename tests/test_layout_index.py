@@ -0,0 +1,40 @@
+from pptx import Presentation
+from pptx.enum.shapes import PP_PLACEHOLDER
+
+from PPT_Maker.layout_index import DEFAULT_LAYOUT_ROLES, LayoutIndex
+
+
+def test_default_template_roles_match_legacy_indexes():
+    index = LayoutIndex.from_presentation(Presentation())
+    for position, role in enumerate(DEFAULT_LAYOUT_ROLES):
+        assert index.resolve(role).index == position
+        assert index.resolve(position).index == position
+
+
+def test_layouts_resolve_by_name_and_unknown_values_fall_back_to_blank():
+    index = LayoutIndex.from_presentation(Presentation())
+    assert index.resolve("Title Only").index == 5
+    assert index.resolve("no such layout") == index.resolve("blank")
+    assert index.resolve(42) == index.resolve("blank")
+
+
+def test_entries_carry_title_and_body_placeholders():
+    index = LayoutIndex.from_presentation(Presentation())
+    entry = index.resolve("title_content")
+    assert entry.title_idx == 0
+    assert entry.body_idx == 1
+    blank = index.resolve("blank")
+    assert blank.title_idx is None and blank.body_idx is None
+
+
+def test_roles_are_assigned_by_placeholders_and_fallbacks():
+    index = LayoutIndex([
+        ("Cover", [(0, PP_PLACEHOLDER.CENTER_TITLE), (1, PP_PLACEHOLDER.SUBTITLE)]),
+        ("Text page", [(0, PP_PLACEHOLDER.TITLE), (1, PP_PLACEHOLDER.OBJECT)]),
+        ("Nothing", []),
+    ])
+    assert index.resolve("title").name == "Cover"
+    assert index.resolve("title_content").name == "Text page"
+    assert index.resolve("blank").name == "Nothing"
+    # No section header layout: falls back to the title layout.
+    assert index.resolve("section_header").name == "Cover"
@@ -0,0 +1,125 @@
+import json
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from llm_service import async_generator
+from llm_service import cache as cache_module
+from llm_service import mock as mock_module
+from llm_service import scheduler as scheduler_module
+from llm_service.async_generator import agenerate_llm_responses_batch
+from llm_service.cache import LLMResponseCache
+from llm_service.llm_generator import (
+    generate_llm_json,
+    generate_llm_response,
+    generate_llm_responses_batch,
+    is_error_response,
+    stream_llm_responses_batch,
+)
+from llm_service.mock import configure_mock_provider, mock_text
+from llm_service.scheduler import configure_scheduler
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    """
+    Fresh simulated providers, schedulers and response cache for every test.
+    """
+    monkeypatch.setattr(mock_module, "_providers", {})
+    monkeypatch.setattr(scheduler_module, "_schedulers", {})
+    monkeypatch.setattr(cache_module, "CACHE_ENABLED", True)
+    monkeypatch.setattr(cache_module, "_cache", LLMResponseCache(":memory:"))
+    for provider in mock_module.MOCK_PROVIDERS:
+        configure_scheduler(provider, base_delay=0.01, max_delay=0.01)
+
+
+def write_cassette(path, entries):
+    with open(path, "w", encoding="utf-8") as cassette_file:
+        for prompt, response in entries:
+            cassette_file.write(json.dumps({"prompt": prompt, "response": response}) + "\n")
+    return str(path)
+
+
+def test_batch_preserves_order_and_reports_progress():
+    configure_mock_provider("mock", latency="uniform:0,0.02", seed=1)
+    prompts = [f"prompt {index}" for index in range(12)]
+    progress = []
+    results = generate_llm_responses_batch(prompts, provider="mock", max_concurrency=4,
+                                           progress_callback=lambda done, total: progress.append((done, total)))
+    assert results == [mock_text(prompt, "gpt-4o") for prompt in prompts]
+    assert progress == [(done, 12) for done in range(1, 13)]
+
+
+def test_batch_isolates_failing_items(tmp_path):
+    cassette = write_cassette(tmp_path / "cassette.jsonl", [("known 1", "one"), ("known 2", "two")])
+    configure_mock_provider("replay", cassette=cassette, latency="fixed:0")
+    results = generate_llm_responses_batch(["known 1", "unknown", "known 2"], provider="replay")
+    assert results[0] == "one" and results[2] == "two"
+    assert is_error_response(results[1])
+
+
+def test_retries_replay_the_same_cassette_entry(tmp_path):
+    cassette = write_cassette(tmp_path / "cassette.jsonl", [("p", "first"), ("p", "second"), ("p", "third")])
+    mock = configure_mock_provider("replay", cassette=cassette, latency="fixed:0", error_rate=0.5, seed=7)
+    assert [generate_llm_response("p", provider="replay", deadline=None) for _ in range(3)] == [
+        "first", "second", "third"]
+    assert mock.stats()["failures"] > 0
+
+
+def test_simulated_responses_skip_the_cache_unless_enabled():
+    configure_mock_provider("mock", latency="fixed:0")
+    generate_llm_response("p", provider="mock")
+    generate_llm_response("p", provider="mock")
+    assert cache_module._cache.stats()["entries"] == 0
+    configure_mock_provider("mock", latency="fixed:0", cache_responses=True)
+    generate_llm_response("p", provider="mock")
+    generate_llm_response("p", provider="mock")
+    assert cache_module._cache.stats()["hits"] == 1
+
+
+def test_stream_batch_yields_every_item_and_terminates_each():
+    configure_mock_provider("mock", latency="fixed:0")
+    prompts = ["alpha", "beta", "gamma"]
+    chunks = {index: [] for index in range(len(prompts))}
+    finished = []
+    for index, chunk in stream_llm_responses_batch(prompts, provider="mock", max_concurrency=2):
+        if chunk is None:
+            finished.append(index)
+        else:
+            chunks[index].append(chunk)
+    assert sorted(finished) == [0, 1, 2]
+    assert ["".join(chunks[index]) for index in range(3)] == [mock_text(prompt, "gpt-4o") for prompt in prompts]
+
+
+def test_async_batch_retries_and_preserves_order():
+    configure_mock_provider("mock", latency="uniform:0,0.01", error_rate=0.3, seed=3)
+    prompts = [f"prompt {index}" for index in range(10)]
+    results = asyncio.run(agenerate_llm_responses_batch(prompts, provider="mock"))
+    assert results == [mock_text(prompt, "gpt-4o") for prompt in prompts]
+
+
+def test_structured_output_from_an_unknown_provider_is_an_error():
+    class Answer(BaseModel):
+        text: str
+
+    result = generate_llm_json("p", Answer, provider="nonexistent")
+    assert result == "LLM Error: Unknown provider specified."
+
+
+def test_async_batch_limits_items_in_progress(monkeypatch):
+    in_progress = []
+    peak = []
+
+    async def fake_response(prompt, *args):
+        in_progress.append(prompt)
+        peak.append(len(in_progress))
+        await asyncio.sleep(0.01)
+        in_progress.remove(prompt)
+        return prompt.upper()
+
+    monkeypatch.setattr(async_generator, "agenerate_llm_response", fake_response)
+    prompts = [f"prompt {index}" for index in range(9)]
+    results = asyncio.run(agenerate_llm_responses_batch(prompts, provider="mock", max_concurrency=3))
+    assert results == [prompt.upper() for prompt in prompts]
+    assert max(peak) == 3
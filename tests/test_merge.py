@@ -0,0 +1,121 @@
+import io
+
+from PIL import Image
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.util import Inches
+
+from PPT_Maker.merge import R_NAMESPACE, DeckMerger, SlideSnapshot, merge_packages, remove_slides
+
+
+def png(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 30), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def make_source():
+    """
+    A deck whose second slide has a picture, a chart, a hyperlink and notes.
+    """
+    prs = Presentation()
+    prs.slides.add_slide(prs.slide_layouts[6]).shapes.add_picture(io.BytesIO(png("blue")), 0, 0)
+    slide = prs.slides.add_slide(prs.slide_layouts[1])
+    slide.shapes.title.text = "Results"
+    slide.shapes.add_picture(io.BytesIO(png("red")), Inches(1), Inches(1))
+    chart_data = CategoryChartData()
+    chart_data.categories = ["A", "B"]
+    chart_data.add_series("Sales", (3, 4))
+    slide.shapes.add_chart(XL_CHART_TYPE.COLUMN_CLUSTERED, Inches(2), Inches(2), Inches(4), Inches(3), chart_data)
+    box = slide.shapes.add_textbox(Inches(1), Inches(5), Inches(3), Inches(1))
+    run = box.text_frame.paragraphs[0].add_run()
+    run.text = "link"
+    run.hyperlink.address = "https://example.com/report"
+    slide.notes_slide.notes_text_frame.text = "Speaker notes"
+    return prs
+
+
+def make_target():
+    prs = Presentation()
+    prs.slides.add_slide(prs.slide_layouts[6]).shapes.add_picture(io.BytesIO(png("red")), 0, 0)
+    return prs
+
+
+def reopen(prs):
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return Presentation(io.BytesIO(buffer.getvalue()))
+
+
+def assert_rIds_resolve(part):
+    prefix = "{%s}" % R_NAMESPACE
+    for node in part._element.iter():
+        for name, value in node.attrib.items():
+            if name.startswith(prefix):
+                assert value in part.rels, f"{part.partname} refers to missing {value}"
+
+
+def image_partnames(slide):
+    return {rel.target_part.partname for rel in slide.part.rels.values() if rel.reltype == RT.IMAGE}
+
+
+def test_append_remaps_relationships():
+    source, target = make_source(), make_target()
+    assert DeckMerger(target).append(source) == 2
+    merged = reopen(target)
+    assert len(merged.slides) == 3
+    for slide in merged.slides:
+        assert_rIds_resolve(slide.part)
+    slide = merged.slides[2]
+    assert merged.slide_layouts.index(slide.slide_layout) == 1
+    assert slide.shapes.title.text == "Results"
+    chart = next(shape.chart for shape in slide.shapes if shape.has_chart)
+    assert list(chart.plots[0].series[0].values) == [3.0, 4.0]
+    assert slide.notes_slide.notes_text_frame.text == "Speaker notes"
+    assert_rIds_resolve(slide.notes_slide.part)
+    external = [rel for rel in slide.part.rels.values() if rel.is_external]
+    assert [rel.target_ref for rel in external] == ["https://example.com/report"]
+
+
+def test_identical_images_are_shared():
+    source, target = make_source(), make_target()
+    DeckMerger(target).append(source)
+    merged = reopen(target)
+    # The red picture already in the target is reused rather than copied.
+    assert image_partnames(merged.slides[2]) == image_partnames(merged.slides[0])
+    assert image_partnames(merged.slides[1]) != image_partnames(merged.slides[0])
+
+
+def test_snapshot_outlives_its_deck_and_can_be_appended_twice():
+    source = make_source()
+    snapshot = SlideSnapshot(source.slides[1])
+    del source
+    target = make_target()
+    merger = DeckMerger(target)
+    merger.append_snapshot(snapshot)
+    merger.append_snapshot(snapshot)
+    merged = reopen(target)
+    assert len(merged.slides) == 3
+    first, second = merged.slides[1], merged.slides[2]
+    for slide in (first, second):
+        assert_rIds_resolve(slide.part)
+        assert slide.notes_slide.notes_text_frame.text == "Speaker notes"
+    charts = [rel.target_part.partname for slide in (first, second)
+              for rel in slide.part.rels.values() if rel.reltype == RT.CHART]
+    assert len(set(charts)) == 2
+    assert image_partnames(first) == image_partnames(second)
+
+
+def test_merge_packages_and_remove_slides():
+    source = make_source()
+    buffer = io.BytesIO()
+    source.save(buffer)
+    target = make_target()
+    remove_slides(target)
+    assert len(target.slides) == 0
+    assert merge_packages(target, [buffer.getvalue(), buffer.getvalue()]) == 4
+    merged = reopen(target)
+    assert [slide.shapes.title.text for slide in merged.slides if slide.shapes.title is not None] == [
+        "Results", "Results"]
@@ -0,0 +1,69 @@
+import io
+
+from PIL import Image
+from pptx import Presentation
+from pptx.oxml.ns import qn
+
+from PPT_Maker.rendering import create_presentation
+
+
+def png(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def has_background(element):
+    return element.cSld.bg is not None
+
+
+def test_common_background_skips_layouts_shared_with_title_and_section_slides():
+    sections_data = [{"section_title": "Section", "section_header_bg": None, "slides": [
+        {"layout": layout, "content": "text"} for layout in ("title", "section_header", "blank")
+    ]}]
+    output = io.BytesIO()
+    create_presentation("Title", "Description", "Author", None, png("red"), sections_data, output=output)
+    prs = Presentation(io.BytesIO(output.getvalue()))
+    title, header, on_title, on_header, on_blank = prs.slides
+    for slide in (title, header):
+        assert not has_background(slide._element)
+        assert not has_background(slide.slide_layout._element)
+    # Content slides on shared layouts carry the picture themselves.
+    assert has_background(on_title._element) and has_background(on_header._element)
+    assert has_background(on_blank.slide_layout._element) and not has_background(on_blank._element)
+    media = {part.partname for part in prs.part.package.iter_parts() if part.partname.startswith("/ppt/media/")}
+    assert len(media) == 1
+
+
+def test_layout_roles_and_notes():
+    sections_data = [{"section_title": "Section", "section_header_bg": None, "slides": [
+        {"layout": 1, "content": "Body text", "improvement_tips": "Tip"},
+    ]}]
+    output = io.BytesIO()
+    create_presentation("Title", "Description", "Author", None, None, sections_data, output=output)
+    prs = Presentation(io.BytesIO(output.getvalue()))
+    assert [slide.slide_layout.name for slide in prs.slides] == ["Title Slide", "Section Header", "Title and Content"]
+    slide = prs.slides[2]
+    assert slide.shapes.title.text == "Section - Slide 1"
+    assert slide.placeholders[1].text == "Body text"
+    assert slide.notes_slide.notes_text_frame.text == "Tip"
+
+
+def test_text_style_is_set_once_in_the_list_style():
+    sections_data = [{"section_title": "Section", "section_header_bg": None, "slides": [
+        {"layout": 1, "content": "First line\nSecond line", "font_size": 18, "font_type": "Georgia"},
+        {"layout": "blank", "content": "Text box", "font_size": 30, "font_type": "Arial"},
+    ]}]
+    output = io.BytesIO()
+    create_presentation("Title", "Description", "Author", None, None, sections_data, output=output,
+                        theme_choice="Creative")
+    prs = Presentation(io.BytesIO(output.getvalue()))
+    for slide, size, typeface in ((prs.slides[2], "1800", "Georgia"), (prs.slides[3], "3000", "Arial")):
+        txBody = next(shape for shape in slide.shapes
+                      if shape.has_text_frame and shape.text_frame.text.startswith(("First", "Text")))._element.txBody
+        def_rpr = txBody.find(qn("a:lstStyle")).find(qn("a:lvl1pPr")).find(qn("a:defRPr"))
+        assert def_rpr.get("sz") == size
+        assert def_rpr.find(qn("a:latin")).get("typeface") == typeface
+        assert def_rpr.find(qn("a:solidFill")).find(qn("a:srgbClr")).get("val") == "4B0082"
+        # Runs inherit the style rather than overriding it.
+        assert txBody.findall(".//" + qn("a:r")) and not txBody.findall(".//" + qn("a:rPr"))
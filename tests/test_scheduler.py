@@ -0,0 +1,168 @@
+import io
+import time
+import asyncio
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from llm_service import scheduler
+from llm_service.scheduler import DeadlineExceeded, ProviderScheduler, TokenBucket, _retry_after
+
+
+class FakeError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def make_response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response.raw = io.BytesIO(b"")
+    return response
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(scheduler.time, "sleep", recorded.append)
+    return recorded
+
+
+def sequence(*results):
+    results = list(results)
+    calls = []
+
+    def send(timeout):
+        calls.append(timeout)
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    send.calls = calls
+    return send
+
+
+def test_retryable_statuses_are_retried_with_capped_exponential_backoff(sleeps):
+    first, second, ok = make_response(503), make_response(500), make_response(200)
+    send = sequence(first, second, ok)
+    result = ProviderScheduler("test", base_delay=0.5, max_delay=60).run(send)
+    assert result is ok
+    assert len(send.calls) == 3
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 0.5
+    assert 0 <= sleeps[1] <= 1.0
+
+
+def test_retried_responses_are_closed(sleeps):
+    retried, ok = make_response(503), make_response(200)
+    ProviderScheduler("test", base_delay=0.1).run(sequence(retried, ok))
+    assert retried.raw.closed
+    assert not ok.raw.closed
+
+
+def test_retry_after_sets_the_delay_and_pauses_the_provider(sleeps):
+    limited, ok = make_response(429, {"Retry-After": "2"}), make_response(200)
+    provider = ProviderScheduler("test", base_delay=0.4)
+    assert provider.run(sequence(limited, ok)) is ok
+    assert 2.0 <= sleeps[0] <= 2.1
+    # Time does not advance under the patched sleep, so the next attempt waits out the pause.
+    assert provider._paused_until > time.monotonic()
+
+
+def test_non_retryable_status_is_returned_at_once(sleeps):
+    bad_request = make_response(400)
+    send = sequence(bad_request)
+    assert ProviderScheduler("test").run(send) is bad_request
+    assert len(send.calls) == 1
+    assert sleeps == []
+    assert not bad_request.raw.closed
+
+
+def test_last_response_is_returned_when_retries_run_out(sleeps):
+    responses = [make_response(503) for _ in range(3)]
+    result = ProviderScheduler("test", max_retries=2, base_delay=0.1).run(sequence(*responses))
+    assert result is responses[-1]
+    assert not result.raw.closed
+    assert all(response.raw.closed for response in responses[:-1])
+
+
+def test_errors_are_retried_only_when_retryable(sleeps):
+    ok = make_response(200)
+    assert ProviderScheduler("test", base_delay=0.1).run(sequence(FakeError(503), ok)) is ok
+    with pytest.raises(FakeError):
+        ProviderScheduler("test", base_delay=0.1).run(sequence(FakeError(400)))
+    with pytest.raises(FakeError):
+        ProviderScheduler("test", max_retries=1, base_delay=0.1).run(sequence(FakeError(503), FakeError(503)))
+
+
+def test_backoff_past_the_deadline_returns_the_response(sleeps):
+    limited = make_response(429, {"Retry-After": "30"})
+    send = sequence(limited)
+    result = ProviderScheduler("test").run(send, deadline=time.monotonic() + 5)
+    assert result is limited
+    assert len(send.calls) == 1
+
+
+def test_attempt_timeout_is_shortened_to_the_deadline(sleeps):
+    send = sequence(make_response(200))
+    ProviderScheduler("test").run(send, deadline=time.monotonic() + 5, timeout=60)
+    assert 0 < send.calls[0] <= 5
+
+
+def test_retry_after_formats():
+    assert _retry_after({"retry-after-ms": "1500"}) == 1.5
+    assert _retry_after({"retry-after": "7"}) == 7.0
+    assert 8 <= _retry_after({"retry-after": formatdate(time.time() + 10, usegmt=True)}) <= 10
+    assert _retry_after({"retry-after": "soon"}) is None
+    assert _retry_after({}) is None
+
+
+def test_token_bucket_wait_beyond_deadline_raises():
+    bucket = TokenBucket(60, capacity=1)
+    bucket.acquire(1)
+    with pytest.raises(DeadlineExceeded):
+        bucket.acquire(1, deadline=time.monotonic() + 0.1)
+
+
+def test_refund_returns_the_unused_charge():
+    provider = ProviderScheduler("test", tokens_per_minute=6000)
+    provider.run(lambda timeout: "ok", tokens=500)
+    assert provider.tokens._tokens == pytest.approx(100, abs=1)
+    provider.refund(500, 200)
+    assert provider.tokens._tokens == pytest.approx(400, abs=1)
+    # Refunds never overfill the bucket.
+    provider.refund(500, 0)
+    assert provider.tokens._tokens == provider.tokens.capacity
+
+
+def test_requests_larger_than_the_bucket_are_charged_in_full():
+    # 600 tokens per minute: a bucket of 60, refilled at 10 per second.
+    provider = ProviderScheduler("test", tokens_per_minute=600)
+    provider.run(lambda timeout: "ok", tokens=200)
+    assert provider.tokens._tokens == pytest.approx(-140, abs=1)
+    # The debt is waited off before the next request: (10 + 140) tokens at 10 per second.
+    assert provider.tokens._take(10, None) == pytest.approx(15, abs=0.1)
+    provider.refund(200, 150)
+    assert provider.tokens._tokens == pytest.approx(-90, abs=1)
+
+
+def test_arun_retries_without_blocking(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(scheduler.asyncio, "sleep", fake_sleep)
+    retried, ok = make_response(503), make_response(200)
+    results = [retried, ok]
+
+    async def send(timeout):
+        return results.pop(0)
+
+    assert asyncio.run(ProviderScheduler("test", base_delay=0.1).arun(send)) is ok
+    assert retried.raw.closed
+    assert len(delays) == 1
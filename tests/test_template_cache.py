@@ -0,0 +1,40 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from pptx import Presentation
+
+from PPT_Maker.template_cache import TemplateCache
+
+
+def saved(prs):
+    output = io.BytesIO()
+    prs.save(output)
+    return output.getvalue()
+
+
+def test_clones_are_independent_copies_of_the_template():
+    cache = TemplateCache()
+    template = cache.get()
+    first, second = template.clone(), template.clone()
+    first.slides.add_slide(first.slide_layouts[template.layout_index.resolve("title").index])
+    first.slide_layouts[0].name = "Renamed"
+    assert len(second.slides) == 0 and len(template.clone().slides) == 0
+    assert second.slide_layouts[0].name == "Title Slide"
+    reopened = Presentation(io.BytesIO(saved(first)))
+    assert len(reopened.slides) == 1 and reopened.slide_width == template.slide_width
+
+
+def test_uploaded_templates_are_parsed_once_and_cloned_across_threads():
+    cache = TemplateCache()
+    template_bytes = saved(Presentation())
+    cache.get(template_bytes)
+
+    def render(index):
+        prs = cache.open(io.BytesIO(template_bytes))
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = f"Deck {index}"
+        return Presentation(io.BytesIO(saved(prs))).slides[0].shapes.title.text
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert list(executor.map(render, range(8))) == [f"Deck {index}" for index in range(8)]
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 8